@@ -1,8 +1,418 @@
-from app.settings import AppState, Settings
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel, ConfigDict
+
+from app.settings import Settings
+from infrastructure.cache.collection_pool import CollectionPool
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.embeddings.provider import EmbeddingsProvider
+from infrastructure.jobs.job_queue import Job, JobQueue
+from infrastructure.lexical.bm25_index import BM25Index
+from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from infrastructure.loaders.pdf_loader import PDFLoaderAdapter
+from infrastructure.manifest.ingest_manifest import IngestManifest
 from infrastructure.observability.langsmith import enable_langsmith
+from infrastructure.rerank.cross_encoder import CrossEncoderReranker
+from infrastructure.rerank.fake import FakeReranker
+from infrastructure.rerank.lexical import LexicalOverlapReranker
+from infrastructure.vectorstores.chroma_store import (
+    ChromaVectorStore,
+    build_chroma_client,
+    has_collection,
+)
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore
+from infrastructure.vectorstores.sharded_store import ShardedVectorStore
+from use_cases.bulk_ingest import BulkIngestUseCase
+from use_cases.ingest_documents import IngestDocumentsUseCase
+from use_cases.query_rag import QueryRAGUseCase
+
+logger = logging.getLogger(__name__)
+
+WARMUP_PROBE = "warm-up"
+
+VectorStoreBackend = ChromaVectorStore | NumpyVectorStore | ShardedVectorStore
+
+
+class CollectionServices(BaseModel):
+    """Store, índices e casos de uso de uma coleção (tenant); o resto é compartilhado."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    store: VectorStoreBackend
+    manifest: IngestManifest
+    lexical_index: BM25Index | None
+    query_rag: QueryRAGUseCase
+    ingest_documents: IngestDocumentsUseCase
+    bulk_ingest: BulkIngestUseCase
+
+    def warm_up(self) -> None:
+        self.store.warm_up()
+
+
+class AppState(BaseModel):
+    """Container de dependências do processo (construído uma vez por app)."""
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    settings: Settings
+    embeddings: EmbeddingsProvider
+    store: VectorStoreBackend
+    llm: LangChainLLMProvider
+    loader: PDFLoaderAdapter
+    manifest: IngestManifest
+    lexical_index: BM25Index | None
+    reranker: LexicalOverlapReranker | CrossEncoderReranker | FakeReranker | None
+    retrieval_cache: RetrievalCache | None
+    query_rag: QueryRAGUseCase
+    ingest_documents: IngestDocumentsUseCase
+    bulk_ingest: BulkIngestUseCase
+    jobs: JobQueue
+    query_executor: ThreadPoolExecutor
+    rerank_executor: ThreadPoolExecutor | None
+    shard_executor: ThreadPoolExecutor | None  # fan-out das buscas/escritas entre shards
+    # Cliente compartilhado pelas coleções (backend chroma); com shards, um por diretório
+    chroma_client: Any | None
+    collections: CollectionPool[CollectionServices]
+
+    def collection(
+        self, name: str | None = None, *, create: bool = False, lease: bool = False
+    ) -> CollectionServices:
+        """Serviços da coleção `name` (None = CHROMA_COLLECTION), abertos sob demanda.
+
+        Só a ingestão (`create=True`) provisiona um tenant novo; para leituras, uma
+        coleção que não existe levanta UnknownCollectionError. Com `lease=True`, a
+        coleção fica fora da evicção até `collections.release` (ver `submit_job`).
+        """
+        name = name or self.settings.chroma_collection
+        return self.collections.get(name, create=create, lease=lease)
+
+    async def acollection(
+        self, name: str | None = None, *, create: bool = False, lease: bool = False
+    ) -> CollectionServices:
+        """Como `collection`, mas a abertura de uma coleção fria roda fora do event loop."""
+        name = name or self.settings.chroma_collection
+        services = self.collections.get_open(name, lease=lease)
+        if services is None:
+            services = await asyncio.to_thread(
+                self.collections.get, name, create=create, lease=lease
+            )
+        return services
+
+    def submit_job(
+        self,
+        services: CollectionServices,
+        kind: str,
+        fn: Callable[[Job], dict[str, Any]],
+        **kwargs: Any,
+    ) -> Job:
+        """Enfileira um job que grava em `services` (obtida com `lease=True`).
+
+        O lease volta ao pool quando o job termina, ou aqui mesmo se a fila o recusar.
+        """
+
+        def _run(job: Job) -> dict[str, Any]:
+            try:
+                return fn(job)
+            finally:
+                self.collections.release(services.name)
+
+        try:
+            return self.jobs.submit(kind, _run, **kwargs)
+        except BaseException:
+            self.collections.release(services.name)
+            raise
+
+    def warm_up(self) -> None:
+        """Abre a coleção e embeda um probe (o cliente do LLM já nasce no construtor).
+
+        Best-effort: uma falha aqui (ex.: Ollama fora do ar) não impede o startup;
+        o erro real aparece na primeira requisição que precisar do recurso.
+        """
+        try:
+            self.store.warm_up()
+            self.embeddings.instance.embed_query(WARMUP_PROBE)
+            hot = [n.strip() for n in self.settings.collection_warmup.split(",") if n.strip()]
+            self.collections.warm_up(hot, CollectionServices.warm_up)
+        except Exception:  # pragma: no cover - depende de serviços externos
+            logger.warning("Warm-up do container falhou; seguindo sem aquecimento.", exc_info=True)
+
+    def shutdown(self) -> None:
+        self.jobs.shutdown(wait=False)
+        self.loader.shutdown()
+        self.query_executor.shutdown(wait=False, cancel_futures=True)
+        if self.rerank_executor is not None:
+            self.rerank_executor.shutdown(wait=False, cancel_futures=True)
+        if self.shard_executor is not None:
+            self.shard_executor.shutdown(wait=False, cancel_futures=True)
 
 
-def build_app_state() -> AppState:
-    settings = Settings()
+def vector_store_dir(settings: Settings) -> str:
+    provider = settings.vector_store_provider.lower()
+    return settings.numpy_store_dir if provider == "numpy" else settings.chroma_dir
+
+
+def shard_dirs(base: str, shards: int) -> list[str]:
+    """Um diretório por shard; outro nº de shards usa outra árvore (exige reingestão)."""
+    return [str(Path(base) / f"shards_{shards}" / str(i)) for i in range(shards)]
+
+
+def build_chroma_clients(settings: Settings) -> Any | None:
+    """Cliente(s) do processo: um por diretório (com shards, uma lista na ordem dos shards)."""
+    if settings.vector_store_provider.lower() != "chroma":
+        return None
+    limit = settings.chroma_memory_limit_mb
+    if settings.vector_store_shards > 1:
+        dirs = shard_dirs(settings.chroma_dir, settings.vector_store_shards)
+        return [build_chroma_client(path, limit) for path in dirs]
+    return build_chroma_client(settings.chroma_dir, limit)
+
+
+def build_vector_store(
+    settings: Settings,
+    embeddings: EmbeddingsProvider,
+    collection: str | None = None,
+    client: Any | None = None,
+    shard_executor: ThreadPoolExecutor | None = None,
+) -> VectorStoreBackend:
+    """Com VECTOR_STORE_SHARDS > 1, `client` é a lista de clientes (um por shard)."""
+    collection = collection or settings.chroma_collection
+    base, shards = vector_store_dir(settings), settings.vector_store_shards
+    if shards <= 1:
+        return build_shard(settings, embeddings, collection, base, client)
+    dirs = shard_dirs(base, shards)
+    clients = client if client is not None else [None] * shards
+    return ShardedVectorStore(
+        [
+            build_shard(settings, embeddings, collection, path, shard_client)
+            for path, shard_client in zip(dirs, clients, strict=True)
+        ],
+        embeddings=embeddings,
+        executor=shard_executor,
+        collection_name=collection,
+        persist_dir=str(Path(dirs[0]).parent),
+    )
+
+
+def build_shard(
+    settings: Settings,
+    embeddings: EmbeddingsProvider,
+    collection: str,
+    persist_dir: str,
+    client: Any | None = None,
+) -> ChromaVectorStore | NumpyVectorStore:
+    provider = settings.vector_store_provider.lower()
+    if provider == "chroma":
+        # Shards em cosseno: o top-k de cada um usa a mesma métrica do merge (exato)
+        sharded = settings.vector_store_shards > 1
+        return ChromaVectorStore(
+            persist_dir=persist_dir,
+            collection_name=collection,
+            embeddings=embeddings,
+            client=client,
+            collection_metadata={"hnsw:space": "cosine"} if sharded else None,
+        )
+    if provider == "numpy":
+        return NumpyVectorStore(
+            persist_dir=persist_dir,
+            collection_name=collection,
+            embeddings=embeddings,
+            quantization=settings.numpy_store_quantization,
+            rescore_factor=settings.numpy_store_rescore_factor,
+        )
+    raise ValueError(f"VECTOR_STORE_PROVIDER desconhecido: {settings.vector_store_provider}")
+
+
+def collection_exists(settings: Settings, name: str, client: Any | None = None) -> bool:
+    """A coleção já foi provisionada? Só consulta o backend, nunca cria nada.
+
+    NumPy: o diretório nasce na primeira escrita. Chroma: a coleção aparece no cliente
+    (com shards, em qualquer um deles: cada shard só cria a sua ao receber chunks).
+    """
+    if name == settings.chroma_collection:
+        return True
+    provider = settings.vector_store_provider.lower()
+    base, shards = vector_store_dir(settings), settings.vector_store_shards
+    dirs = [base] if shards <= 1 else shard_dirs(base, shards)
+    if provider == "numpy":
+        return any((Path(path) / name).is_dir() for path in dirs)
+    if client is None:  # sem cliente do processo não há o que consultar
+        return True
+    clients = client if isinstance(client, list) else [client]
+    return any(has_collection(shard_client, name) for shard_client in clients)
+
+
+def build_reranker(
+    settings: Settings,
+) -> LexicalOverlapReranker | CrossEncoderReranker | FakeReranker | None:
+    provider = settings.rerank_provider.lower()
+    if provider == "none":
+        return None
+    if provider == "lexical":
+        return LexicalOverlapReranker()
+    if provider == "cross-encoder":
+        return CrossEncoderReranker(settings.rerank_model)
+    if provider == "fake":
+        return FakeReranker(delay=settings.rerank_fake_delay)
+    raise ValueError(f"RERANK_PROVIDER desconhecido: {settings.rerank_provider}")
+
+
+def manifest_path(settings: Settings) -> str:
+    """Com shards, o manifesto acompanha a árvore: outro nº de shards reingere tudo."""
+    if settings.ingest_manifest_path:
+        return settings.ingest_manifest_path
+    base = Path(settings.chroma_dir)
+    if settings.vector_store_shards > 1:
+        base = base / f"shards_{settings.vector_store_shards}"
+    return str(base / "ingest_manifest.sqlite")
+
+
+def lexical_index_path(settings: Settings, collection: str) -> str:
+    """LEXICAL_INDEX_PATH vale só para a coleção padrão; tenants ganham um arquivo cada."""
+    if collection == settings.chroma_collection and settings.lexical_index_path:
+        return settings.lexical_index_path
+    return str(Path(settings.chroma_dir) / f"lexical_{collection}.sqlite")
+
+
+def build_collection(
+    name: str,
+    settings: Settings,
+    *,
+    embeddings: EmbeddingsProvider,
+    llm: LangChainLLMProvider,
+    loader: PDFLoaderAdapter,
+    retrieval_cache: RetrievalCache | None,
+    query_executor: ThreadPoolExecutor,
+    reranker: LexicalOverlapReranker | CrossEncoderReranker | FakeReranker | None,
+    rerank_executor: ThreadPoolExecutor | None,
+    chroma_client: Any | None = None,
+    shard_executor: ThreadPoolExecutor | None = None,
+) -> CollectionServices:
+    store = build_vector_store(settings, embeddings, name, chroma_client, shard_executor)
+    manifest = IngestManifest(path=manifest_path(settings), collection=name)
+    lexical_index = (
+        BM25Index(lexical_index_path(settings, name)) if settings.lexical_index_enabled else None
+    )
+    return CollectionServices(
+        name=name,
+        store=store,
+        manifest=manifest,
+        lexical_index=lexical_index,
+        query_rag=QueryRAGUseCase(
+            settings=settings,
+            store=store,
+            llm=llm,
+            retrieval_cache=retrieval_cache,
+            executor=query_executor,
+            lexical_index=lexical_index,
+            reranker=reranker,
+            rerank_executor=rerank_executor,
+        ),
+        ingest_documents=IngestDocumentsUseCase(
+            settings=settings,
+            store=store,
+            loader=loader,
+            retrieval_cache=retrieval_cache,
+            manifest=manifest,
+            lexical_index=lexical_index,
+        ),
+        bulk_ingest=BulkIngestUseCase(
+            settings=settings,
+            store=store,
+            loader=loader,
+            retrieval_cache=retrieval_cache,
+            manifest=manifest,
+            lexical_index=lexical_index,
+        ),
+    )
+
+
+def build_app_state(settings: Settings | None = None) -> AppState:
+    settings = settings or Settings()
     enable_langsmith(settings)
-    return AppState(settings=settings)
+
+    embeddings = EmbeddingsProvider(settings)
+    llm = LangChainLLMProvider(settings)
+    loader = PDFLoaderAdapter(
+        workers=settings.pdf_loader_workers,
+        pages_per_task=settings.pdf_loader_pages_per_task,
+    )
+    retrieval_cache = (
+        RetrievalCache(
+            max_entries=settings.retrieval_cache_max_entries,
+            ttl_seconds=settings.retrieval_cache_ttl_seconds,
+        )
+        if settings.retrieval_cache_enabled
+        else None
+    )
+    query_executor = ThreadPoolExecutor(
+        max_workers=settings.query_executor_workers, thread_name_prefix="query"
+    )
+    reranker = build_reranker(settings)
+    rerank_executor = (
+        ThreadPoolExecutor(max_workers=settings.rerank_workers, thread_name_prefix="rerank")
+        if reranker is not None
+        else None
+    )
+    # Um cliente para todas as coleções: abrir um tenant não abre outro SQLite/sistema
+    chroma_client = build_chroma_clients(settings)
+    shard_executor = (
+        ThreadPoolExecutor(
+            max_workers=settings.vector_store_shard_workers, thread_name_prefix="shard"
+        )
+        if settings.vector_store_shards > 1
+        else None
+    )
+    shared = {
+        "embeddings": embeddings,
+        "llm": llm,
+        "loader": loader,
+        "query_executor": query_executor,
+        "reranker": reranker,
+        "rerank_executor": rerank_executor,
+        "chroma_client": chroma_client,
+        "shard_executor": shard_executor,
+    }
+    default = build_collection(
+        settings.chroma_collection, settings, retrieval_cache=retrieval_cache, **shared
+    )
+
+    def open_collection(name: str) -> CollectionServices:
+        cache = retrieval_cache.for_namespace(name) if retrieval_cache is not None else None
+        return build_collection(name, settings, retrieval_cache=cache, **shared)
+
+    return AppState(
+        settings=settings,
+        embeddings=embeddings,
+        store=default.store,
+        llm=llm,
+        loader=loader,
+        manifest=default.manifest,
+        lexical_index=default.lexical_index,
+        reranker=reranker,
+        retrieval_cache=retrieval_cache,
+        query_rag=default.query_rag,
+        ingest_documents=default.ingest_documents,
+        bulk_ingest=default.bulk_ingest,
+        jobs=JobQueue(
+            max_workers=settings.ingest_workers,
+            max_pending=settings.ingest_max_pending_jobs,
+        ),
+        query_executor=query_executor,
+        rerank_executor=rerank_executor,
+        shard_executor=shard_executor,
+        chroma_client=chroma_client,
+        collections=CollectionPool(
+            open_collection,
+            max_open=settings.collection_pool_size,
+            pinned={default.name: default},
+            exists=lambda name: collection_exists(settings, name, chroma_client),
+        ),
+    )
@@ -1,17 +1,40 @@
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
 
 from app.container import build_app_state
+from interface_adapters.web.api.metrics import router as metrics_router
+from interface_adapters.web.api.metrics import track_requests
+from interface_adapters.web.api.timing import server_timing
 from interface_adapters.web.api.v1.documents import router as documents_router
 from interface_adapters.web.api.v1.echo import router as echo_router
+from interface_adapters.web.api.v1.jobs import router as jobs_router
 from interface_adapters.web.api.v1.rag import router as rag_router
 
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Warm-up fora do event loop: abre Chroma (SQLite) e embeda um probe
+    await run_in_threadpool(app.state.container.warm_up)
+    yield
+    app.state.container.shutdown()
+
+
 def create_app() -> FastAPI:
-    app = FastAPI(title="rag-fastapi-lc", version="0.1.0")
+    app = FastAPI(title="rag-fastapi-lc", version="0.1.0", lifespan=lifespan)
     app.state.container = build_app_state()
     app.include_router(echo_router, prefix="/v1")
     app.include_router(documents_router, prefix="/v1")
     app.include_router(rag_router, prefix="/v1")
+    app.include_router(jobs_router, prefix="/v1")
+    settings = app.state.container.settings
+    if settings.metrics_enabled:
+        app.middleware("http")(track_requests)
+        app.include_router(metrics_router)
+    if settings.server_timing_enabled or settings.profiling_enabled:
+        app.middleware("http")(server_timing)
     return app
 
 
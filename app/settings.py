@@ -1,4 +1,3 @@
-from pydantic import BaseModel
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -9,26 +8,80 @@ class Settings(BaseSettings):
     langsmith_project: str = "rag-fastapi-lc"
 
     # VectorStore / Chroma
-    vector_store_provider: str = "chroma"
+    vector_store_provider: str = "chroma"  # chroma | numpy
     chroma_dir: str = ".chroma"
+    numpy_store_dir: str = ".numpy_store"  # backend "numpy": matriz mmap + sidecar
+    numpy_store_quantization: str = "none"  # none | int8 | binary (+ rescoring exato)
+    numpy_store_rescore_factor: int = 10  # candidatos = k * fator antes do rescoring
+    # >1: chunks particionados por hash do id em N diretórios; busca em paralelo + merge
+    vector_store_shards: int = 1  # mudar o nº exige reingestão (diretórios e manifesto novos)
+    vector_store_shard_workers: int = 32  # threads do fan-out (compartilhadas pelas coleções)
     raw_dir: str = "data/raw"
-    chroma_collection: str = "documents"
+    chroma_collection: str = "documents"  # coleção padrão (requisições sem `collection`)
+    # Multi-tenant: `collection` nas rotas abre a coleção do tenant sob demanda
+    collection_pool_size: int = 64  # coleções abertas ao mesmo tempo (LRU; a padrão é fixa)
+    tenants_raw_dir: str = "data/tenants"  # uploads por coleção: <dir>/<collection>/
+    collection_warmup: str = ""  # tenants quentes abertos no startup, separados por vírgula
+    chroma_memory_limit_mb: int = 0  # >0: Chroma descarrega índices de coleções frias (LRU)
+
+    # Ingestão em background (POST /v1/documents -> 202 + job)
+    ingest_workers: int = 2
+    ingest_max_pending_jobs: int = 32
+    ingest_batch_size: int = 64  # chunks por chamada de embedding/escrita
+    ingest_manifest_path: str | None = None  # padrão: <chroma_dir>/ingest_manifest.sqlite
+    pdf_loader_workers: int = 1  # >1 = extração em pool de processos; 0 = nº de CPUs
+    pdf_loader_pages_per_task: int = 32
+    bulk_embed_batch_size: int = 256  # chunks por lote na ingestão em massa
+    bulk_embed_concurrency: int = 4  # lotes simultâneos no backend de embeddings
+    chunk_size: int = 1000  # caracteres por chunk (escolha com scripts/sweep_retrieval.py)
+    chunk_overlap: int = 150
 
     # Embeddings
     embeddings_provider: str = "fake"  # fake | ollama | openai
     embeddings_model: str = "fake"  # e.g., nomic-embed-text (Ollama)
+    embeddings_cache_enabled: bool = True
+    embeddings_cache_path: str = ".cache/embeddings.sqlite"
+    embeddings_cache_max_entries: int = 200_000  # linhas no SQLite
+    embeddings_cache_memory_entries: int = 10_000  # tier LRU em memória
 
     # Query defaults
     retriever_search_type: str = "mmr"
     retriever_k: int = 5
+    retriever_fetch_k: int = 20  # MMR: candidatos antes da seleção
+    retriever_lambda_mult: float = 0.5  # MMR: 1 = só relevância, 0 = só diversidade
+    # Rerank (2º estágio): none | lexical | cross-encoder | fake
+    rerank_provider: str = "none"
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_top_n: int = 20  # candidatos do 1º estágio reordenados antes do corte em k
+    rerank_budget_ms: float = 250.0  # estourou: mantém a ordem do 1º estágio (0 = sem limite)
+    rerank_workers: int = 2
+    rerank_fake_delay: float = 0.0  # atraso do fake (simula modelo lento)
+    # search_type="hybrid": BM25 (SQLite FTS5) + denso, fundidos por RRF
+    lexical_index_enabled: bool = True
+    lexical_index_path: str | None = None  # padrão: <chroma_dir>/lexical_<collection>.sqlite
+    hybrid_fetch_k: int = 20  # candidatos de cada lado antes da fusão
+    hybrid_rrf_k: int = 60
+    query_executor_workers: int = 32  # threads p/ trabalho bloqueante das queries async
+    batch_max_items: int = 256  # perguntas por POST /v1/rag/query:batch
+    batch_generate_concurrency: int = 4  # gerações simultâneas num lote
+
+    # Cache de retrieval (pergunta normalizada, k, search_type, epoch do índice)
+    retrieval_cache_enabled: bool = True
+    retrieval_cache_max_entries: int = 1024
+    retrieval_cache_ttl_seconds: float = 300.0
+
+    # Observabilidade: GET /metrics (formato Prometheus) + latência por rota
+    metrics_enabled: bool = True
+    server_timing_enabled: bool = True  # header Server-Timing com os estágios da requisição
+    profiling_enabled: bool = False  # permite perfil por requisição com o header X-Profile: 1
+    profiling_dir: str = ".profiles"
+    profiling_interval_ms: float = 5.0  # intervalo de amostragem das pilhas
 
     # LLM Provider (Step 4)
     llm_provider: str = "fake"  # fake | openai | ollama
     llm_model: str = "fake"  # e.g., gpt-4o-mini | llama3.1
     llm_temperature: float = 0.0  # determinístico por padrão
+    llm_fake_stream_delay: float = 0.0  # atraso por token do fake (simula streaming real)
+    context_max_tokens: int = 3000  # orçamento (estimado) dos trechos no prompt
 
     model_config = SettingsConfigDict(env_file=".env", env_prefix="", extra="ignore")
-
-
-class AppState(BaseModel):
-    settings: Settings
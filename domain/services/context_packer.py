@@ -0,0 +1,133 @@
+import math
+from collections.abc import Callable, Sequence
+
+Snippet = tuple[str, dict]
+
+MIN_TRUNCATED_TOKENS = 32  # abaixo disso não vale a pena cortar um trecho para caber
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimativa barata (~4 caracteres por token), sem depender do tokenizer do modelo."""
+    return math.ceil(len(text) / 4)
+
+
+def _truncate(text: str, tokens: int, count_tokens: Callable[[str], int]) -> str:
+    """Corta `text` no último espaço que ainda caiba em `tokens`."""
+    cut = text[: max(1, len(text) * tokens // max(1, count_tokens(text)))]
+    while cut and count_tokens(cut) > tokens:
+        cut = cut[: len(cut) * 9 // 10]
+    space = cut.rfind(" ")
+    return cut[:space] if space > len(cut) // 2 else cut
+
+
+def _uncovered(start: int, end: int, spans: list[tuple[int, int]]) -> int:
+    """Caracteres de [start, end) fora dos intervalos já escolhidos (disjuntos)."""
+    covered = sum(max(0, min(end, e) - max(start, s)) for s, e in spans)
+    return end - start - covered
+
+
+def _add_span(spans: list[tuple[int, int]], start: int, end: int) -> None:
+    """Insere [start, end) mantendo a lista ordenada e sem sobreposições."""
+    merged: list[tuple[int, int]] = []
+    for s, e in sorted([*spans, (start, end)]):
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(e, merged[-1][1]))
+        else:
+            merged.append((s, e))
+    spans[:] = merged
+
+
+def pack_context(
+    snippets: Sequence[Snippet],
+    max_tokens: int,
+    *,
+    count_tokens: Callable[[str], int] = estimate_tokens,
+    max_gap: int = 2,
+) -> list[Snippet]:
+    """
+    Empacota os trechos recuperados (em ordem de relevância) num orçamento de tokens.
+
+    1. Seleção gulosa por relevância: cada trecho paga só os caracteres que ainda não
+       estão cobertos por trechos já escolhidos da mesma (source, page), usando o
+       `start_index` do splitter; trechos totalmente repetidos (overlap) saem de graça.
+       O primeiro que não couber é cortado no espaço restante e a seleção para.
+    2. Trechos escolhidos da mesma página que se sobrepõem ou encostam (até `max_gap`
+       caracteres de distância) viram um bloco só, sem o texto repetido.
+
+    Blocos saem na ordem do seu trecho mais relevante; o metadata é o desse trecho,
+    com `start_index` do início do bloco e `merged_chunks` quando houve fusão.
+    """
+    remaining = max_tokens
+    seen_texts: set[str] = set()
+    covered: dict[tuple, list[tuple[int, int]]] = {}
+    chosen: list[tuple[int, str, dict]] = []  # (rank, texto, metadata)
+
+    for rank, (text, meta) in enumerate(snippets):
+        if not text or remaining <= 0:
+            continue
+        start = meta.get("start_index")
+        positioned = isinstance(start, int) and start >= 0
+        if positioned:
+            spans = covered.setdefault((meta.get("source"), meta.get("page")), [])
+            new = _uncovered(start, start + len(text), spans)
+            if new == 0:
+                continue
+            cost = math.ceil(count_tokens(text) * new / len(text))
+        else:
+            if text in seen_texts:
+                continue
+            cost = count_tokens(text)
+
+        if cost > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                break
+            # Sobreposições já pagas voltam a contar aqui: corte conservador
+            text = _truncate(text, remaining, count_tokens)
+            cost = remaining
+        chosen.append((rank, text, meta))
+        seen_texts.add(text)
+        if positioned:
+            _add_span(spans, start, start + len(text))
+        remaining -= cost
+
+    return [(text, meta) for _, text, meta in _merge_adjacent(chosen, max_gap)]
+
+
+def _merge_adjacent(
+    chosen: list[tuple[int, str, dict]], max_gap: int
+) -> list[tuple[int, str, dict]]:
+    groups: dict[tuple, list[tuple[int, str, dict]]] = {}
+    blocks: list[tuple[int, str, dict]] = []
+    for item in chosen:
+        start = item[2].get("start_index")
+        if isinstance(start, int) and start >= 0:
+            groups.setdefault((item[2].get("source"), item[2].get("page")), []).append(item)
+        else:
+            blocks.append(item)
+
+    for items in groups.values():
+        items.sort(key=lambda it: it[2]["start_index"])
+        rank, text, meta = items[0]
+        block_start, end, count = meta["start_index"], meta["start_index"] + len(text), 1
+        for r, t, m in items[1:]:
+            s = m["start_index"]
+            if s > end + max_gap:
+                blocks.append((rank, text, _block_meta(meta, block_start, count)))
+                rank, text, meta, block_start, end, count = r, t, m, s, s + len(t), 1
+                continue
+            if s + len(t) > end:
+                text += t[end - s :] if s <= end else "\n" + t
+                end = s + len(t)
+            if r < rank:
+                rank, meta = r, m
+            count += 1
+        blocks.append((rank, text, _block_meta(meta, block_start, count)))
+
+    blocks.sort(key=lambda b: b[0])
+    return blocks
+
+
+def _block_meta(meta: dict, start: int, count: int) -> dict:
+    if count == 1 and meta.get("start_index") == start:
+        return meta
+    return {**meta, "start_index": start, "merged_chunks": count}
@@ -1,3 +1,4 @@
+from collections.abc import AsyncIterator, Iterator
 from typing import Protocol
 
 
@@ -6,3 +7,19 @@ class LLMProvider(Protocol):
         self, question: str, context_snippets: list[tuple[str, dict]] | None = None
     ) -> str:  # pragma: no cover
         ...
+
+    def stream(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> Iterator[str]:  # pragma: no cover
+        """Mesma resposta de `generate`, entregue em fragmentos à medida que chegam."""
+        ...
+
+    async def agenerate(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> str:  # pragma: no cover
+        ...
+
+    def astream(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> AsyncIterator[str]:  # pragma: no cover
+        ...
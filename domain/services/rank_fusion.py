@@ -0,0 +1,21 @@
+from collections.abc import Callable, Hashable, Sequence
+
+
+def reciprocal_rank_fusion[T](
+    rankings: Sequence[Sequence[T]],
+    key: Callable[[T], Hashable],
+    k: int = 60,
+) -> list[tuple[T, float]]:
+    """
+    Reciprocal Rank Fusion: score(d) = Σ 1 / (k + rank_i(d)), rank a partir de 1.
+    Itens repetidos entre rankings são unidos por `key`; mantém a 1ª ocorrência.
+    """
+    scores: dict[Hashable, float] = {}
+    items: dict[Hashable, T] = {}
+    for ranking in rankings:
+        for rank, item in enumerate(ranking, start=1):
+            kk = key(item)
+            items.setdefault(kk, item)
+            scores[kk] = scores.get(kk, 0.0) + 1.0 / (k + rank)
+    order = sorted(scores, key=lambda kk: scores[kk], reverse=True)
+    return [(items[kk], scores[kk]) for kk in order]
@@ -0,0 +1,11 @@
+from typing import Protocol
+
+
+class Reranker(Protocol):
+    """Segundo estágio do retrieval: pontua candidatos contra a pergunta."""
+
+    name: str
+
+    def score(self, question: str, texts: list[str]) -> list[float]:  # pragma: no cover
+        """Um score por texto (maior = mais relevante), na mesma ordem de `texts`."""
+        ...
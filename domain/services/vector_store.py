@@ -0,0 +1,56 @@
+from typing import Any, Protocol
+
+from langchain_core.documents import Document
+
+
+class VectorStore(Protocol):
+    """Contrato comum dos backends (Chroma, NumPy) usado pelos casos de uso."""
+
+    def warm_up(self) -> None:  # pragma: no cover
+        ...
+
+    def add_documents(
+        self, documents: list[Document], ids: list[str] | None = None
+    ) -> int:  # pragma: no cover
+        """Com `ids`, upsert: reingestão não duplica vetores."""
+        ...
+
+    def delete(self, ids: list[str]) -> int:  # pragma: no cover
+        ...
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:  # pragma: no cover
+        ...
+
+    def similarity_search_by_vectors(
+        self, vectors: list[list[float]], k: int
+    ) -> list[list[Document]]:  # pragma: no cover
+        ...
+
+    def similarity_search_with_embeddings(
+        self, vectors: list[list[float]], k: int
+    ) -> list[tuple[list[Document], Any]]:  # pragma: no cover
+        """Hits e a matriz (hits x D) dos seus vetores: merge entre shards e MMR."""
+        ...
+
+    def mmr_search_by_vector(
+        self,
+        vector: list[float],
+        k: int,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:  # pragma: no cover
+        """Hits com `mmr_relevance` e `mmr_diversity` nos metadados."""
+        ...
+
+    def as_retriever(
+        self,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> Any:  # pragma: no cover
+        """Objeto com `invoke(question) -> list[Document]`; fetch_k/lambda_mult só no MMR."""
+        ...
+
+    def stats(self) -> dict:  # pragma: no cover
+        ...
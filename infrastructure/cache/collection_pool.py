@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass
+
+
+class UnknownCollectionError(LookupError):
+    """Coleção ainda não provisionada (só a ingestão cria coleções)."""
+
+
+@dataclass
+class CollectionUsage:
+    """Uso de uma coleção desde o início do processo (sobrevive à evicção do handle)."""
+
+    requests: int = 0
+    opens: int = 0
+    evictions: int = 0
+    open_seconds: float = 0.0  # tempo gasto abrindo (cliente, SQLite, índice)
+    last_used: float = 0.0
+
+
+class CollectionPool[T]:
+    """
+    Handles abertos por coleção (tenant), limitados por LRU.
+
+    `factory(name)` abre o handle na primeira requisição da coleção; as seguintes
+    reaproveitam o mesmo objeto. Acima de `max_open`, o menos usado recentemente sai do
+    pool: quem ainda o segura (requisição) continua funcionando, e os recursos são
+    liberados quando a última referência cai. `pinned` nunca sai.
+
+    Jobs de escrita pegam o handle com `lease=True` e o devolvem com `release`: coleção
+    com lease não é evictada (senão o próximo `get` abriria um segundo store no mesmo
+    diretório enquanto o job ainda grava pelo primeiro). O pool pode passar de
+    `max_open` enquanto todas as abertas estiverem em uso; o excesso sai no `release`.
+
+    Com `exists`, `get(name, create=False)` não chama o factory para uma coleção que
+    ainda não existe (levanta UnknownCollectionError): leituras não provisionam tenants.
+
+    Aberturas concorrentes da mesma coleção esperam uma única chamada ao factory.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[str], T],
+        max_open: int = 64,
+        pinned: dict[str, T] | None = None,
+        exists: Callable[[str], bool] | None = None,
+    ) -> None:
+        self.factory = factory
+        self.exists = exists
+        self.max_open = max(1, max_open)
+        self.pinned = dict(pinned or {})
+        self._open: OrderedDict[str, T] = OrderedDict()
+        self._opening: dict[str, threading.Lock] = {}
+        self._usage: dict[str, CollectionUsage] = {}
+        self._leases: dict[str, int] = {}  # jobs em andamento por coleção
+        self._lock = threading.Lock()
+
+    def _touch(self, name: str, lease: bool = False) -> CollectionUsage:
+        """Sob o lock: conta o uso (e o lease, no mesmo passo em que o handle é entregue)."""
+        usage = self._usage.setdefault(name, CollectionUsage())
+        usage.requests += 1
+        usage.last_used = time.time()
+        if lease:
+            self._leases[name] = self._leases.get(name, 0) + 1
+        return usage
+
+    def _evict_idle(self) -> None:
+        """Sob o lock: fecha as menos usadas até `max_open`, pulando as que têm lease."""
+        for name in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            if name not in self._leases:
+                del self._open[name]
+                self._usage[name].evictions += 1
+
+    def get_open(self, name: str, *, lease: bool = False) -> T | None:
+        """O handle, se já estiver aberto; nunca chama o factory (não bloqueia)."""
+        with self._lock:
+            handle = self.pinned.get(name)
+            if handle is None:
+                handle = self._open.get(name)
+                if handle is not None:
+                    self._open.move_to_end(name)
+            if handle is not None:
+                self._touch(name, lease)
+            return handle
+
+    def get(self, name: str, *, create: bool = True, lease: bool = False) -> T:
+        """Handle da coleção, aberto sob demanda; com `lease=True`, devolva com `release`."""
+        handle = self.get_open(name, lease=lease)
+        if handle is not None:
+            return handle
+        with self._lock:
+            opening = self._opening.setdefault(name, threading.Lock())
+
+        with opening:
+            with self._lock:
+                handle = self._open.get(name)
+                if handle is not None:  # aberto por outra thread enquanto esperávamos
+                    self._open.move_to_end(name)
+                    self._touch(name, lease)
+                    return handle
+            started = time.perf_counter()
+            try:
+                if not create and self.exists is not None and not self.exists(name):
+                    raise UnknownCollectionError(name)
+                handle = self.factory(name)
+            except BaseException:
+                with self._lock:
+                    self._opening.pop(name, None)
+                raise
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                usage = self._touch(name, lease)
+                usage.opens += 1
+                usage.open_seconds += elapsed
+                self._open[name] = handle
+                self._evict_idle()
+                self._opening.pop(name, None)
+        return handle
+
+    def release(self, name: str) -> None:
+        """Devolve um lease de `get(..., lease=True)`; sem leases, a coleção pode sair."""
+        with self._lock:
+            left = self._leases.get(name, 0) - 1
+            if left > 0:
+                self._leases[name] = left
+                return
+            self._leases.pop(name, None)
+            self._evict_idle()
+
+    def warm_up(self, names: Iterable[str], warm: Callable[[T], None] | None = None) -> None:
+        """Abre as coleções quentes antes do tráfego (no máximo `max_open`; só as que existem)."""
+        for name in list(names)[: self.max_open]:
+            try:
+                handle = self.get(name, create=False)
+            except UnknownCollectionError:
+                continue
+            if warm is not None:
+                warm(handle)
+
+    def stats(self) -> dict:
+        with self._lock:
+            open_names = set(self._open) | set(self.pinned)
+            usage = {name: asdict(u) for name, u in self._usage.items()}
+            return {
+                "open": len(self._open),
+                "pinned": len(self.pinned),
+                "leased": len(self._leases),
+                "max_open": self.max_open,
+                "known": len(usage),
+                "opens": sum(u["opens"] for u in usage.values()),
+                "evictions": sum(u["evictions"] for u in usage.values()),
+                "collections": {
+                    name: {**u, "open": name in open_names} for name, u in usage.items()
+                },
+            }
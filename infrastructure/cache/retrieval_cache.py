@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+RetrievalKey = tuple[str, int, str, int, str, tuple]
+
+
+def normalize_question(question: str) -> str:
+    """Normaliza a pergunta para a chave do cache (caixa e espaços)."""
+    return " ".join(question.split()).casefold()
+
+
+class RetrievalCache:
+    """
+    Cache LRU + TTL de resultados de retrieval.
+
+    A chave inclui o `epoch` do índice: toda ingestão que adiciona vetores chama
+    `bump_epoch()`, tornando inalcançáveis as entradas antigas (que saem por LRU/TTL).
+
+    Com várias coleções, cada uma usa uma visão (`for_namespace`) do mesmo LRU: limite
+    de memória único para todos os tenants, mas epoch por coleção.
+    """
+
+    def __init__(
+        self, max_entries: int = 1024, ttl_seconds: float = 300.0, namespace: str = ""
+    ) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._epochs: dict[str, int] = {}
+        self._data: OrderedDict[RetrievalKey, tuple[float, list[Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._root = self  # acumula hits/misses de todas as visões
+
+    def for_namespace(self, namespace: str) -> RetrievalCache:
+        """Visão que compartilha entradas, limite e lock, com epoch própria."""
+        view = copy.copy(self)
+        view.namespace = namespace
+        view.hits = view.misses = 0
+        return view
+
+    @property
+    def epoch(self) -> int:
+        return self._epochs.get(self.namespace, 0)
+
+    def key(self, question: str, k: int, search_type: str, options: tuple = ()) -> RetrievalKey:
+        """`options`: parâmetros que mudam o resultado (ex.: fetch_k/lambda_mult do MMR)."""
+        return (self.namespace, self.epoch, normalize_question(question), k, search_type, options)
+
+    def _count(self, hit: bool) -> None:
+        for owner in (self,) if self._root is self else (self, self._root):
+            if hit:
+                owner.hits += 1
+            else:
+                owner.misses += 1
+
+    def get(self, key: RetrievalKey) -> list[Any] | None:
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[0] < time.monotonic():
+                del self._data[key]
+                item = None
+            self._count(item is not None)
+            if item is None:
+                return None
+            self._data.move_to_end(key)
+            return list(item[1])
+
+    def put(self, key: RetrievalKey, docs: list[Any]) -> None:
+        if key[1] != self._epochs.get(key[0], 0):
+            return  # índice mudou durante a busca; resultado já nasce obsoleto
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl_seconds, list(docs))
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def bump_epoch(self) -> int:
+        """Invalida só a coleção desta visão."""
+        with self._lock:
+            epoch = self._epochs[self.namespace] = self.epoch + 1
+            for key in [k for k in self._data if k[0] == self.namespace]:
+                del self._data[key]
+            return epoch
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "epoch": self.epoch,
+            "entries": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+        }
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+# Limite de parâmetros por consulta no SQLite (SQLITE_MAX_VARIABLE_NUMBER antigo = 999)
+_SQL_BATCH = 500
+# Hits no disco acumulam o novo last_access em memória e gravam em lote: leitura não vira escrita
+_TOUCH_BATCH = 1_000
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wrapper de embeddings com cache em dois níveis:
+      - memória: LRU (OrderedDict) limitado por `memory_entries`
+      - disco:   SQLite em `path`, limitado por `max_entries` (evicta por último acesso)
+
+    Chave = sha256(provider, model, tipo, texto); tipo separa query de documento,
+    pois alguns modelos embedam os dois de forma diferente.
+    Vetores são persistidos como float32.
+
+    O nº de linhas no disco é contado uma vez na abertura e mantido em memória (sem
+    `COUNT(*)` por escrita). Os `last_access` dos hits são gravados em lotes de
+    `_TOUCH_BATCH` e sempre antes de uma evicção, que assim vê a ordem LRU atual.
+    Com vários processos no mesmo arquivo, `max_entries` vira um limite aproximado.
+    """
+
+    def __init__(
+        self,
+        inner: Embeddings,
+        *,
+        provider: str,
+        model: str,
+        path: str,
+        max_entries: int = 100_000,
+        memory_entries: int = 10_000,
+    ) -> None:
+        self.inner = inner
+        self.provider = provider
+        self.model = model
+        self.path = path
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY, vector BLOB NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_access ON embeddings(last_access)"
+        )
+        self._conn.commit()
+        (self._disk_entries,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        self._touched: dict[str, float] = {}  # last_access ainda não gravado
+
+    # ------------------------------------------------------------------ keys
+    def _key(self, kind: str, text: str) -> str:
+        raw = f"{self.provider}\x00{self.model}\x00{kind}\x00{text}".encode()
+        return hashlib.sha256(raw).hexdigest()
+
+    @staticmethod
+    def _encode(vector: list[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _decode(blob: bytes) -> list[float]:
+        arr = array("f")
+        arr.frombytes(blob)
+        return arr.tolist()
+
+    # ---------------------------------------------------------------- memory
+    def _memory_get(self, key: str) -> list[float] | None:
+        vec = self._memory.get(key)
+        if vec is not None:
+            self._memory.move_to_end(key)
+        return vec
+
+    def _memory_put(self, key: str, vector: list[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ------------------------------------------------------------------ disk
+    def _disk_get_many(self, keys: list[str]) -> dict[str, list[float]]:
+        found: dict[str, list[float]] = {}
+        for i in range(0, len(keys), _SQL_BATCH):
+            batch = keys[i : i + _SQL_BATCH]
+            marks = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({marks})", batch
+            ).fetchall()
+            found.update((k, self._decode(v)) for k, v in rows)
+        if found:
+            now = time.time()
+            self._touched.update(dict.fromkeys(found, now))
+            if len(self._touched) >= _TOUCH_BATCH:
+                self._flush_touches()
+                self._conn.commit()
+        return found
+
+    def _flush_touches(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE embeddings SET last_access = ? WHERE key = ?",
+                [(t, k) for k, t in self._touched.items()],
+            )
+            self._touched.clear()
+
+    def _disk_put_many(self, items: dict[str, list[float]]) -> None:
+        now = time.time()
+        # Mesma chave => mesmo vetor: IGNORE deixa o rowcount contar só as linhas novas
+        cur = self._conn.executemany(
+            "INSERT OR IGNORE INTO embeddings(key, vector, last_access) VALUES (?, ?, ?)",
+            [(k, self._encode(v), now) for k, v in items.items()],
+        )
+        self._disk_entries += max(cur.rowcount, 0)
+        overflow = self._disk_entries - self.max_entries
+        if overflow > 0:
+            self._flush_touches()
+            cur = self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN ("
+                " SELECT key FROM embeddings ORDER BY last_access ASC LIMIT ?)",
+                (overflow,),
+            )
+            self._disk_entries -= max(cur.rowcount, 0)
+
+    # ----------------------------------------------------------------- core
+    def _embed(
+        self, kind: str, texts: list[str], *, batch_queries: bool = False
+    ) -> list[list[float]]:
+        keys = [self._key(kind, t) for t in texts]
+        resolved: dict[str, list[float]] = {}
+
+        with self._lock:
+            for key in keys:
+                vec = self._memory_get(key)
+                if vec is not None:
+                    resolved[key] = vec
+            pending = [k for k in dict.fromkeys(keys) if k not in resolved]
+            if pending:
+                for key, vec in self._disk_get_many(pending).items():
+                    resolved[key] = vec
+                    self._memory_put(key, vec)
+
+            # Textos repetidos dentro do mesmo lote são embedados uma vez só
+            missing = {k: t for k, t in zip(keys, texts, strict=True) if k not in resolved}
+            n_missing = sum(1 for k in keys if k in missing)
+            self.hits += len(keys) - n_missing
+            self.misses += n_missing
+
+        if missing:
+            miss_keys = list(missing)
+            miss_texts = [missing[k] for k in miss_keys]
+            if kind == "query" and not batch_queries:
+                vectors = [self.inner.embed_query(t) for t in miss_texts]
+            else:
+                vectors = self.inner.embed_documents(miss_texts)
+            fresh = {k: list(v) for k, v in zip(miss_keys, vectors, strict=True)}
+            with self._lock:
+                self._disk_put_many(fresh)
+                self._conn.commit()
+                for key, vec in fresh.items():
+                    self._memory_put(key, vec)
+            resolved.update(fresh)
+
+        return [resolved[k] for k in keys]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self._embed("doc", list(texts))
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._embed("query", [text])[0]
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """
+        Várias perguntas com um único `embed_documents` para as que faltam no cache.
+        Pressupõe embed_query(t) == embed_documents([t])[0] (vale p/ OpenAI e Ollama).
+        """
+        return self._embed("query", list(texts), batch_queries=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._disk_entries
+            memory = len(self._memory)
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / total) if total else 0.0,
+            "memory_entries": memory,
+            "disk_entries": int(entries),
+        }
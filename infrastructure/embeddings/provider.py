@@ -1,29 +1,66 @@
 from __future__ import annotations
 
+import threading
+from typing import ClassVar
+
 from langchain_community.embeddings import FakeEmbeddings
+from langchain_core.embeddings import Embeddings
 from langchain_ollama.embeddings import OllamaEmbeddings
 from langchain_openai import OpenAIEmbeddings
 
 from app.settings import Settings
+from infrastructure.embeddings.cache import CachedEmbeddings
 
 
 class EmbeddingsProvider:
     """Provider centralizado de embeddings, com cache e fallback."""
 
-    _instance = None
+    # Cache no nível da classe: um cliente por (provider, model, cache_path) no processo
+    _instances: ClassVar[dict[tuple[str, str, str | None], Embeddings]] = {}
+    _lock = threading.Lock()
 
     def __init__(self, settings: Settings | None = None):
         self.settings = settings or Settings()
 
     @property
-    def instance(self):
-        if self._instance is None:
-            self._instance = self._build()
-        return self._instance
-
-    def _build(self):
-        provider = (self.settings.embeddings_provider or "fake").lower()
-        model = self.settings.embeddings_model or "fake"
+    def provider(self) -> str:
+        return (self.settings.embeddings_provider or "fake").lower()
+
+    @property
+    def model(self) -> str:
+        return self.settings.embeddings_model or "fake"
+
+    @property
+    def instance(self) -> Embeddings:
+        cache_path = (
+            self.settings.embeddings_cache_path if self.settings.embeddings_cache_enabled else None
+        )
+        key = (self.provider, self.model, cache_path)
+        inst = self._instances.get(key)
+        if inst is None:
+            with self._lock:
+                inst = self._instances.get(key)
+                if inst is None:
+                    inst = self._build()
+                    if cache_path:
+                        inst = CachedEmbeddings(
+                            inst,
+                            provider=self.provider,
+                            model=self.model,
+                            path=cache_path,
+                            max_entries=self.settings.embeddings_cache_max_entries,
+                            memory_entries=self.settings.embeddings_cache_memory_entries,
+                        )
+                    self._instances[key] = inst
+        return inst
+
+    def cache_stats(self) -> dict | None:
+        inst = self.instance
+        return inst.stats() if isinstance(inst, CachedEmbeddings) else None
+
+    def _build(self) -> Embeddings:
+        provider = self.provider
+        model = self.model
 
         if provider == "openai":
             return OpenAIEmbeddings(model=model)
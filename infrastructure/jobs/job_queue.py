@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from infrastructure.observability.timing import RequestTimings, end_request, start_request
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """Fila de jobs cheia (backpressure para o cliente tentar mais tarde)."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    payload: dict[str, Any]
+    progress: Any = None
+    # Estágios medidos por stage_timer enquanto o job roda (embed, vector_write, ...)
+    timings: RequestTimings = field(default_factory=RequestTimings)
+    status: str = "queued"  # queued | running | succeeded | failed
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+class JobQueue:
+    """
+    Pool de workers limitado para trabalho pesado fora do event loop.
+
+    - `max_workers` threads executam os jobs; `max_pending` limita os que aguardam
+      (acima disso `submit` levanta JobQueueFullError).
+    - Mantém em memória os últimos `max_history` jobs para consulta de status.
+    """
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, max_history: int = 1000):
+        self.max_pending = max_pending
+        self.max_history = max_history
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        kind: str,
+        fn: Callable[[Job], dict[str, Any]],
+        *,
+        payload: dict[str, Any] | None = None,
+        progress: Any = None,
+    ) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, payload=payload or {}, progress=progress)
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError("Fila de ingestão cheia; tente novamente mais tarde.")
+            self._pending += 1
+            self._jobs[job.id] = job
+            self._trim_history()
+        self._executor.submit(self._run, job, fn)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict[str, int]:
+        """Jobs aguardando e em execução (para as métricas)."""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == "running")
+            return {"queued": self._pending - running, "running": running}
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run(self, job: Job, fn: Callable[[Job], dict[str, Any]]) -> None:
+        job.status = "running"
+        job.started_at = datetime.now(UTC)
+        _, token = start_request(job.timings)
+        try:
+            job.result = fn(job)
+            job.status = "succeeded"
+        except Exception as exc:
+            logger.exception("Job %s (%s) falhou", job.id, job.kind)
+            job.error = f"{type(exc).__name__}: {exc}"
+            job.status = "failed"
+        finally:
+            end_request(token)
+            job.finished_at = datetime.now(UTC)
+            with self._lock:
+                self._pending -= 1
+
+    def _trim_history(self) -> None:
+        # Descarta os jobs finalizados mais antigos; nunca os que ainda vão rodar
+        overflow = len(self._jobs) - self.max_history
+        for job_id in list(self._jobs):
+            if overflow <= 0:
+                break
+            if self._jobs[job_id].finished_at is not None:
+                del self._jobs[job_id]
+                overflow -= 1
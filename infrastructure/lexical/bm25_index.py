@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import unicodedata
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+# Termos da pergunta: palavras e códigos (ex.: "art. 5º", "ISO-9001", "CID10")
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Palavras funcionais do PT-BR (já sem acento, como o tokenizer indexa): aparecem em
+# quase todo chunk, então cada uma no OR percorre uma posting list do tamanho do índice
+# sem mudar o ranking.
+# fmt: off
+_STOPWORDS = frozenset({
+    "a", "ao", "aos", "as", "ate", "com", "como", "da", "das", "de", "dela", "dele", "deles",
+    "do", "dos", "e", "ela", "elas", "ele", "eles", "em", "entre", "era", "essa", "esse",
+    "esta", "este", "eu", "foi", "ha", "isso", "isto", "ja", "lhe", "mais", "mas", "me",
+    "mesmo", "meu", "minha", "muito", "na", "nao", "nas", "nem", "no", "nos", "nossa", "nosso",
+    "num", "numa", "o", "os", "ou", "para", "pela", "pelas", "pelo", "pelos", "por", "qual",
+    "quando", "que", "quem", "se", "sem", "ser", "seu", "sua", "suas", "seus", "so", "sobre",
+    "tambem", "te", "tem", "teu", "tu", "um", "uma", "umas", "uns", "voce", "voces",
+})
+# fmt: on
+# Termos em mais que essa fração dos chunks quase não discriminam (idf ~ 0) e custam
+# caro; descartados, a menos que a pergunta só tenha termos assim.
+_MAX_DF_RATIO = 0.5
+# Limite de termos no OR (os mais raros): perguntas longas não viram varreduras longas.
+_MAX_TERMS = 16
+
+
+def _normalize(term: str) -> str:
+    """Mesma normalização do tokenizer (unicode61 remove_diacritics 2)."""
+    decomposed = unicodedata.normalize("NFD", term.casefold())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def query_terms(question: str) -> list[str]:
+    """Termos distintos da pergunta, normalizados e sem stopwords."""
+    terms = dict.fromkeys(_normalize(t) for t in _TOKEN_RE.findall(question))
+    return [t for t in terms if t not in _STOPWORDS]
+
+
+def to_match_query(terms: list[str]) -> str:
+    """Termos → query FTS5 segura (OR dos termos entre aspas)."""
+    return " OR ".join(f'"{t}"' for t in terms)
+
+
+class BM25Index:
+    """
+    Índice invertido em disco (SQLite FTS5, ranking bm25) espelhando os chunks do
+    vector store. Escritas são upserts por chunk_id, então pode ser mantido de forma
+    incremental pela ingestão; a busca usa o índice do FTS5 (ms mesmo com milhões).
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                content, content='chunks', content_rowid='rowid',
+                tokenize='unicode61 remove_diacritics 2'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_ai AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts(rowid, content) VALUES (new.rowid, new.content);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_ad AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, content)
+                VALUES ('delete', old.rowid, old.content);
+            END;
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_vocab USING fts5vocab(chunks_fts, 'row');
+            """
+        )
+        self._conn.commit()
+        # Contagem em memória: COUNT(*) por busca varreria a tabela inteira
+        (self._rows,) = self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()
+
+    def upsert(self, documents: list[Document], ids: list[str]) -> int:
+        rows = [
+            (cid, d.page_content, json.dumps(d.metadata, ensure_ascii=False, default=str))
+            for d, cid in zip(documents, ids, strict=True)
+        ]
+        with self._lock, self._conn:
+            deleted = self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?", [(r[0],) for r in rows]
+            ).rowcount
+            self._conn.executemany(
+                "INSERT INTO chunks(chunk_id, content, metadata) VALUES (?, ?, ?)", rows
+            )
+            self._rows += len(rows) - max(deleted, 0)
+        return len(rows)
+
+    def delete(self, ids: list[str]) -> int:
+        if not ids:
+            return 0
+        with self._lock, self._conn:
+            deleted = self._conn.executemany(
+                "DELETE FROM chunks WHERE chunk_id = ?", [(i,) for i in ids]
+            ).rowcount
+            self._rows -= max(deleted, 0)
+        return len(ids)
+
+    def _select_terms(self, terms: list[str]) -> list[str]:
+        """
+        Filtra pela frequência nos documentos (fts5vocab): some com termos ausentes do
+        índice, descarta os de df alto e fica com os _MAX_TERMS mais raros.
+        """
+        placeholders = ",".join("?" * len(terms))
+        df = dict(
+            self._conn.execute(
+                f"SELECT term, doc FROM chunks_vocab WHERE term IN ({placeholders})", terms
+            ).fetchall()
+        )
+        present = sorted(df, key=df.__getitem__)
+        selective = [t for t in present if df[t] <= _MAX_DF_RATIO * self._rows]
+        return (selective or present)[:_MAX_TERMS]
+
+    def search(self, question: str, k: int) -> list[Document]:
+        terms = query_terms(question)
+        if not terms:
+            return []
+        with self._lock:
+            terms = self._select_terms(terms)
+            if not terms:
+                return []
+            query = to_match_query(terms)
+            rows = self._conn.execute(
+                "SELECT c.chunk_id, c.content, c.metadata, chunks_fts.rank"
+                " FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid"
+                " WHERE chunks_fts MATCH ? ORDER BY chunks_fts.rank LIMIT ?",
+                (query, k),
+            ).fetchall()
+        docs = []
+        for cid, content, meta, rank in rows:
+            metadata = json.loads(meta)
+            metadata.setdefault("chunk_id", cid)
+            metadata["bm25_score"] = -rank  # rank do FTS5 é bm25 negativo (menor = melhor)
+            docs.append(Document(page_content=content, metadata=metadata))
+        return docs
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._rows)
@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Iterator
+
 from langchain_core.language_models.fake_chat_models import FakeListChatModel
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
 
 from app.settings import Settings
+from domain.services.context_packer import estimate_tokens, pack_context
 from domain.services.llm_provider import LLMProvider
+from infrastructure.observability.metrics import LLM_TOKENS, stage_timer
 
 try:
     from langchain_openai import ChatOpenAI  # type: ignore
@@ -44,24 +48,28 @@ class LangChainLLMProvider(LLMProvider):
             # Base URL padrão é http://localhost:11434; se precisar customizar, exportear OLLAMA_BASE_URL
             return ChatOllama(model=model, temperature=temperature)
         else:
-            # Fake determinístico para testes unitários
-            return FakeListChatModel(responses=["This is a fake LLM answer."])
+            # Fake determinístico para testes unitários (stream: 1 caractere por chunk)
+            return FakeListChatModel(
+                responses=["This is a fake LLM answer."],
+                sleep=self.settings.llm_fake_stream_delay or None,
+            )
 
-    def generate(
+    def _build_messages(
         self, question: str, context_snippets: list[tuple[str, dict]] | None = None
-    ) -> str:
+    ) -> list[BaseMessage]:
         ctx_texts = []
         pages = []
         if context_snippets:
-            for text, meta in context_snippets[:10]:
+            # Sem texto repetido do overlap entre chunks; corta no orçamento por relevância
+            with stage_timer("pack"):
+                packed = pack_context(context_snippets, self.settings.context_max_tokens)
+            for text, meta in packed:
                 ctx_texts.append(text)
                 p = meta.get("page")
                 if p is not None:
                     pages.append(p)
 
-        context_text = "CONTEXT (use apenas o que segue):\n" + "\n\n---\n\n".join(
-            t[:1200] for t in ctx_texts
-        )
+        context_text = "CONTEXT (use apenas o que segue):\n" + "\n\n---\n\n".join(ctx_texts)
         available = (
             f"PÁGINAS DISPONÍVEIS NOS TRECHOS: {sorted(set(pages))}"
             if pages
@@ -73,9 +81,68 @@ class LangChainLLMProvider(LLMProvider):
             "Para pedidos de RESUMO: produza um resumo apenas com o que estiver no contexto.\n"
             "Se faltar informação relevante, ainda assim entregue o melhor resumo possível e liste 'Limitações' no final."
         )
-        messages = [
+        return [
             SystemMessage(content=system),
             HumanMessage(content=f"{available}\n\n{context_text}\n\nPERGUNTA: {question}"),
         ]
-        out = self._llm.invoke(messages)
-        return getattr(out, "content", str(out))
+
+    @staticmethod
+    def _count_tokens(messages: list[BaseMessage], answer: str, usage: dict | None) -> None:
+        """Tokens do `usage_metadata` quando o provider informa; senão, estimativa."""
+        if usage:
+            LLM_TOKENS.inc(usage.get("input_tokens", 0), kind="prompt", source="reported")
+            LLM_TOKENS.inc(usage.get("output_tokens", 0), kind="completion", source="reported")
+            return
+        prompt = sum(estimate_tokens(str(m.content)) for m in messages)
+        LLM_TOKENS.inc(prompt, kind="prompt", source="estimated")
+        LLM_TOKENS.inc(estimate_tokens(answer), kind="completion", source="estimated")
+
+    def generate(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> str:
+        messages = self._build_messages(question, context_snippets)
+        with stage_timer("llm"):
+            out = self._llm.invoke(messages)
+        answer = getattr(out, "content", str(out))
+        self._count_tokens(messages, answer, getattr(out, "usage_metadata", None))
+        return answer
+
+    def stream(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> Iterator[str]:
+        messages = self._build_messages(question, context_snippets)
+        parts: list[str] = []
+        usage = None
+        with stage_timer("llm"):
+            for chunk in self._llm.stream(messages):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text = getattr(chunk, "content", str(chunk))
+                if text:
+                    parts.append(text)
+                    yield text
+        self._count_tokens(messages, "".join(parts), usage)
+
+    async def agenerate(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> str:
+        messages = self._build_messages(question, context_snippets)
+        with stage_timer("llm"):
+            out = await self._llm.ainvoke(messages)
+        answer = getattr(out, "content", str(out))
+        self._count_tokens(messages, answer, getattr(out, "usage_metadata", None))
+        return answer
+
+    async def astream(
+        self, question: str, context_snippets: list[tuple[str, dict]] | None = None
+    ) -> AsyncIterator[str]:
+        messages = self._build_messages(question, context_snippets)
+        parts: list[str] = []
+        usage = None
+        with stage_timer("llm"):
+            async for chunk in self._llm.astream(messages):
+                usage = getattr(chunk, "usage_metadata", None) or usage
+                text = getattr(chunk, "content", str(chunk))
+                if text:
+                    parts.append(text)
+                    yield text
+        self._count_tokens(messages, "".join(parts), usage)
@@ -1,10 +1,133 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+
+import fitz  # PyMuPDF
 from langchain_community.document_loaders import PyMuPDFLoader
 from langchain_core.documents import Document
 
 
+def _extract_page_range(filepath: str, start: int, stop: int) -> list[str]:
+    """Executado no worker: extrai o texto das páginas [start, stop).
+
+    Mesma extração do PyMuPDFParser em modo "page" (get_text padrão + strip).
+    """
+    with fitz.open(filepath) as doc:
+        return [doc[i].get_text().strip() for i in range(start, stop)]
+
+
+def _load_file(filepath: str) -> list[Document]:
+    return PyMuPDFLoader(filepath).load()
+
+
+def _page_count(filepath: str) -> int:
+    with fitz.open(filepath) as doc:
+        return doc.page_count
+
+
 class PDFLoaderAdapter:
-    """Adapter de loader de PDF usando LangChain (PyMuPDFLoader)."""
+    """
+    Adapter de loader de PDF usando LangChain (PyMuPDFLoader).
+
+    Com `workers > 1`, PDFs maiores que `pages_per_task` são fatiados em faixas de
+    páginas extraídas num pool de processos (extração de texto é CPU-bound e segura
+    o GIL). A ordem das páginas e os metadados do PyMuPDFLoader são preservados:
+    a primeira página vem do próprio loader e serve de base para as demais.
+    """
+
+    def __init__(self, workers: int = 1, pages_per_task: int = 32) -> None:
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task)
+        self._pool: ProcessPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    # spawn: fork dentro de um servidor com threads é inseguro
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+        return self._pool
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
 
     def load(self, filepath: str) -> list[Document]:
-        loader = PyMuPDFLoader(filepath)
-        return loader.load()
+        return list(self.lazy_load(filepath))
+
+    def lazy_load(self, filepath: str) -> Iterator[Document]:
+        """Uma página por vez: memória independe do tamanho do PDF."""
+        pages = PyMuPDFLoader(filepath).lazy_load()
+        if self.workers <= 1:
+            yield from pages
+            return
+
+        total = _page_count(filepath)
+        if total <= self.pages_per_task:
+            yield from pages
+            return
+
+        first = next(pages, None)
+        if first is None:
+            return
+        pages.close()
+        yield first
+
+        base = {k: v for k, v in first.metadata.items() if k != "page"}
+        ranges = [
+            (s, min(s + self.pages_per_task, total)) for s in range(1, total, self.pages_per_task)
+        ]
+        pool = self._ensure_pool()
+        futures = [pool.submit(_extract_page_range, filepath, s, e) for s, e in ranges]
+        for (start, _), fut in zip(ranges, futures, strict=True):
+            for offset, text in enumerate(fut.result()):
+                yield Document(page_content=text, metadata={**base, "page": start + offset})
+
+    def load_many(self, filepaths: Iterable[str]) -> list[Document]:
+        """Vários PDFs: arquivos inteiros distribuídos no pool, resultado em ordem."""
+        return [d for _, docs in self.iter_files(filepaths) for d in docs]
+
+    def iter_files(
+        self, filepaths: Iterable[str], *, return_exceptions: bool = False
+    ) -> Iterator[tuple[str, list[Document] | Exception]]:
+        """
+        Como `load_many`, mas entrega (arquivo, páginas) à medida que ficam prontos,
+        em ordem e com no máximo 2x`workers` arquivos em voo (memória limitada).
+
+        Com `return_exceptions`, um PDF que falha vira (arquivo, exceção) e os demais
+        seguem (como em `asyncio.gather`); sem ele, a exceção interrompe a iteração.
+        """
+
+        def _result(path: str, load: Callable[[], list[Document]]):
+            try:
+                return path, load()
+            except Exception as exc:
+                if not return_exceptions:
+                    raise
+                return path, exc
+
+        if self.workers <= 1:
+            for path in filepaths:
+                yield _result(path, lambda path=path: self.load(path))
+            return
+        pool = self._ensure_pool()
+        window = 2 * self.workers
+        in_flight: deque[tuple[str, Future[list[Document]]]] = deque()
+        for path in filepaths:
+            in_flight.append((path, pool.submit(_load_file, path)))
+            if len(in_flight) >= window:
+                done_path, fut = in_flight.popleft()
+                yield _result(done_path, fut.result)
+        while in_flight:
+            done_path, fut = in_flight.popleft()
+            yield _result(done_path, fut.result)
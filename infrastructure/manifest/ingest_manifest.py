@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+
+class IngestManifest:
+    """
+    Manifesto de ingestão em SQLite (por coleção):
+      - files:  source → hash do conteúdo do arquivo
+      - chunks: source → {chunk_id: hash do conteúdo do chunk}
+
+    Permite pular arquivos inalterados e, quando mudam, aplicar só o diff
+    (upsert dos chunks novos/alterados, delete dos que sumiram).
+    """
+
+    def __init__(self, path: str, collection: str) -> None:
+        self.path = path
+        self.collection = collection
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " collection TEXT NOT NULL, source TEXT NOT NULL, file_hash TEXT NOT NULL,"
+            " updated_at REAL NOT NULL, PRIMARY KEY (collection, source))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " collection TEXT NOT NULL, source TEXT NOT NULL, chunk_id TEXT NOT NULL,"
+            " content_hash TEXT NOT NULL, PRIMARY KEY (collection, source, chunk_id))"
+        )
+        self._conn.commit()
+
+    def file_hash(self, source: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT file_hash FROM files WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            ).fetchone()
+        return row[0] if row else None
+
+    def chunks(self, source: str) -> dict[str, str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT chunk_id, content_hash FROM chunks WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            ).fetchall()
+        return dict(rows)
+
+    def replace(self, source: str, file_hash: str, chunks: dict[str, str]) -> None:
+        """Registra o estado final do arquivo (chamar só após escrever no vector store)."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM chunks WHERE collection = ? AND source = ?",
+                (self.collection, source),
+            )
+            self._conn.executemany(
+                "INSERT INTO chunks(collection, source, chunk_id, content_hash)"
+                " VALUES (?, ?, ?, ?)",
+                [(self.collection, source, cid, h) for cid, h in chunks.items()],
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files(collection, source, file_hash, updated_at)"
+                " VALUES (?, ?, ?, ?)",
+                (self.collection, source, file_hash, time.time()),
+            )
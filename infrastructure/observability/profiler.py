@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from types import FrameType
+
+
+def _stack(frame: FrameType | None) -> str:
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{Path(code.co_filename).name}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SamplingProfiler:
+    """
+    Amostra as pilhas de todas as threads a cada `interval` segundos, numa thread própria.
+
+    Todas as threads porque o trabalho de uma query se espalha (event loop, executor de
+    busca, pool do rerank); numa réplica ocupada entram também outras requisições. Saída
+    no formato "collapsed" (`pilha;...;folha N` por linha), aberto por speedscope ou
+    flamegraph.pl.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack = _stack(frame)
+                if stack:
+                    self.samples[f"{names.get(ident, ident)};{stack}"] += 1
+
+    def start(self) -> SamplingProfiler:
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, directory: str | Path, name: str) -> Path:
+        out = Path(directory)
+        out.mkdir(parents=True, exist_ok=True)
+        path = out / f"{time.strftime('%Y%m%dT%H%M%S')}-{name}.collapsed"
+        lines = (f"{stack} {n}\n" for stack, n in self.samples.most_common())
+        path.write_text("".join(lines), encoding="utf-8")
+        return path
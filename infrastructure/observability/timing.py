@@ -0,0 +1,56 @@
+"""
+Tempos por estágio da requisição corrente, para o header `Server-Timing`.
+
+O acumulador vive num ContextVar: cada requisição HTTP (e cada job da JobQueue) instala
+o seu e os estágios medidos por `stage_timer` (metrics.py) somam nele. Trabalho enviado a executores
+precisa rodar com `contextvars.copy_context().run` para continuar contando.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from contextvars import ContextVar, Token
+
+_CURRENT: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+_TOKEN_CHARS = re.compile(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]")
+
+
+class RequestTimings:
+    """Soma dos tempos por estágio (thread-safe: busca densa e BM25 rodam em paralelo)."""
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def snapshot(self) -> dict[str, float]:
+        """Cópia dos tempos (s) até agora: o job ainda pode estar somando."""
+        with self._lock:
+            return {stage: round(sec, 6) for stage, sec in self.stages.items()}
+
+    def header(self, total: float | None = None) -> str:
+        """Valor do `Server-Timing` (durações em ms), na ordem em que os estágios ocorreram."""
+        with self._lock:
+            items = list(self.stages.items())
+        if total is not None:
+            items.append(("total", total))
+        return ", ".join(f"{_TOKEN_CHARS.sub('_', s)};dur={sec * 1000:.2f}" for s, sec in items)
+
+
+def start_request(timings: RequestTimings | None = None) -> tuple[RequestTimings, Token]:
+    timings = timings if timings is not None else RequestTimings()
+    return timings, _CURRENT.set(timings)
+
+
+def end_request(token: Token) -> None:
+    _CURRENT.reset(token)
+
+
+def record_stage(stage: str, seconds: float) -> None:
+    timings = _CURRENT.get()
+    if timings is not None:
+        timings.add(stage, seconds)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+
+class CrossEncoderReranker:
+    """
+    Cross-encoder local (sentence-transformers), ex.: cross-encoder/ms-marco-MiniLM-L-6-v2.
+    Dependência opcional: `pip install -e .[rerank]`.
+    """
+
+    name = "cross-encoder"
+
+    def __init__(self, model_name: str, batch_size: int = 32) -> None:
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as exc:  # pragma: no cover - depende do extra instalado
+            raise RuntimeError(
+                "RERANK_PROVIDER=cross-encoder requer sentence-transformers "
+                "(pip install -e .[rerank])."
+            ) from exc
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model = CrossEncoder(model_name)
+
+    def score(self, question: str, texts: list[str]) -> list[float]:
+        if not texts:
+            return []
+        pairs = [(question, t) for t in texts]
+        return [float(s) for s in self._model.predict(pairs, batch_size=self.batch_size)]
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+import hashlib
+import time
+
+
+class FakeReranker:
+    """Scores determinísticos (hash de pergunta + texto); `delay` simula um modelo lento."""
+
+    name = "fake"
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+
+    def score(self, question: str, texts: list[str]) -> list[float]:
+        if self.delay:
+            time.sleep(self.delay)
+        out = []
+        for text in texts:
+            digest = hashlib.sha256(f"{question}\x00{text}".encode()).digest()
+            out.append(int.from_bytes(digest[:4], "big") / 2**32)
+        return out
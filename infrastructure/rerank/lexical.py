@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import math
+import re
+import unicodedata
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(text: str) -> set[str]:
+    # Mesmo espírito do tokenizer do BM25Index (unicode61 remove_diacritics)
+    folded = unicodedata.normalize("NFKD", text.casefold())
+    return set(_TOKEN_RE.findall("".join(c for c in folded if not unicodedata.combining(c))))
+
+
+class LexicalOverlapReranker:
+    """
+    Cobertura dos termos da pergunta, ponderada por IDF calculado entre os próprios
+    candidatos: termo presente em todos eles não ajuda a separar ninguém.
+    Sem modelo e sem I/O; serve de baseline barato para o cross-encoder.
+    """
+
+    name = "lexical"
+
+    def score(self, question: str, texts: list[str]) -> list[float]:
+        query = _terms(question)
+        docs = [_terms(t) for t in texts]
+        if not query or not docs:
+            return [0.0] * len(texts)
+        n = len(docs)
+        idf = {t: math.log(1 + n / (1 + sum(t in d for d in docs))) for t in query}
+        total = sum(idf.values())
+        return [sum(idf[t] for t in query & d) / total for d in docs]
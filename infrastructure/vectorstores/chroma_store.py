@@ -1,33 +1,233 @@
 from __future__ import annotations
 
+import threading
+import uuid
+from typing import Any
+
+import chromadb
+import numpy as np
+from chromadb.api import ClientAPI
+from chromadb.config import Settings as ChromaSettings
+from chromadb.errors import NotFoundError
 from langchain_chroma import Chroma
+from langchain_core.documents import Document
 
 from infrastructure.embeddings.provider import EmbeddingsProvider
+from infrastructure.observability.metrics import VECTORS_ADDED, stage_timer
+from infrastructure.vectorstores.mmr import MMR_FETCH_K, MMR_LAMBDA, mmr_documents
+from infrastructure.vectorstores.retriever import StoreRetriever
+
+
+def build_chroma_client(persist_dir: str, memory_limit_mb: int = 0) -> ClientAPI:
+    """
+    Cliente persistente compartilhado pelas coleções do processo (um SQLite, um sistema).
+
+    Com `memory_limit_mb`, o Chroma descarrega da memória os índices das coleções
+    menos usadas (política LRU de segmentos) em vez de manter todas carregadas.
+    """
+    options: dict = {"anonymized_telemetry": False, "is_persistent": True}
+    if memory_limit_mb > 0:
+        options["chroma_segment_cache_policy"] = "LRU"
+        options["chroma_memory_limit_bytes"] = memory_limit_mb * 1024 * 1024
+    return chromadb.PersistentClient(path=persist_dir, settings=ChromaSettings(**options))
+
+
+def has_collection(client: ClientAPI, name: str) -> bool:
+    """
+    A coleção existe no cliente? Um get_collection por nome, em vez de listar todas
+    (list_collections cresce com o número de coleções do cliente).
+    """
+    try:
+        client.get_collection(name)
+    except (NotFoundError, ValueError):  # chromadb < 1.0 levanta ValueError
+        return False
+    return True
 
 
 class ChromaVectorStore:
-    def __init__(self, persist_dir: str, collection_name: str = "documents") -> None:
+    def __init__(
+        self,
+        persist_dir: str,
+        collection_name: str = "documents",
+        embeddings: EmbeddingsProvider | None = None,
+        client: ClientAPI | None = None,
+        collection_metadata: dict | None = None,
+    ) -> None:
         self.persist_dir = persist_dir
         self.collection_name = collection_name
+        self.embeddings = embeddings or EmbeddingsProvider()
+        # Cliente compartilhado (várias coleções); None = o Chroma abre um próprio
+        self.client = client
+        # Só vale na criação da coleção (ex.: {"hnsw:space": "cosine"}); o padrão do Chroma é L2
+        self.collection_metadata = collection_metadata
         self._vs: Chroma | None = None
+        self._lock = threading.Lock()
 
     def _ensure_vs(self) -> Chroma:
         if self._vs is None:
-            embeddings = EmbeddingsProvider().instance
-            self._vs = Chroma(
-                collection_name=self.collection_name,
-                persist_directory=self.persist_dir,
-                embedding_function=embeddings,
-            )
+            # Rotas sync rodam no threadpool: evita abrir dois clientes no primeiro acesso
+            with self._lock:
+                if self._vs is None:
+                    location = (
+                        {"client": self.client}
+                        if self.client is not None
+                        else {"persist_directory": self.persist_dir}
+                    )
+                    self._vs = Chroma(
+                        collection_name=self.collection_name,
+                        embedding_function=self.embeddings.instance,
+                        collection_metadata=self.collection_metadata,
+                        **location,
+                    )
         return self._vs
 
-    def add_documents(self, documents):
-        vs = self._ensure_vs()
-        vs.add_documents(documents)
-        return len(documents)
+    def warm_up(self) -> None:
+        """Abre o cliente/coleção antecipadamente (SQLite + índice)."""
+        self._ensure_vs()
+
+    def add_embeddings(
+        self,
+        vectors: list[list[float]] | np.ndarray,
+        texts: list[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> int:
+        """Grava vetores já calculados (upsert por id), como o `add_texts` do LangChain."""
+        if len(texts) == 0:
+            return 0
+        col = self._ensure_vs()._collection
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        # Chroma recusa metadata vazio: esses vão num upsert separado, sem metadatas
+        with stage_timer("vector_write"):
+            for with_meta in (True, False):
+                rows = [i for i, m in enumerate(metadatas) if bool(m) is with_meta]
+                if not rows:
+                    continue
+                col.upsert(
+                    ids=[ids[i] for i in rows],
+                    embeddings=[vectors[i] for i in rows],
+                    documents=[texts[i] for i in rows],
+                    metadatas=[metadatas[i] for i in rows] if with_meta else None,
+                )
+        VECTORS_ADDED.inc(len(texts), backend="chroma")
+        return len(texts)
+
+    def add_documents(self, documents, ids: list[str] | None = None):
+        """Com `ids`, a escrita é um upsert (reingestão não duplica vetores)."""
+        if not documents:
+            return 0
+        texts = [d.page_content for d in documents]
+        with stage_timer("embed"):
+            vectors = self.embeddings.instance.embed_documents(texts)
+        return self.add_embeddings(vectors, texts, [dict(d.metadata) for d in documents], ids)
 
-    def as_retriever(self, search_type: str = "mmr", k: int = 5):
-        return self._ensure_vs().as_retriever(search_type=search_type, search_kwargs={"k": k})
+    def delete(self, ids: list[str]) -> int:
+        if ids:
+            self._ensure_vs().delete(ids=ids)
+        return len(ids)
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embeda várias perguntas numa única chamada ao backend de embeddings."""
+        emb = self.embeddings.instance
+        batch = getattr(emb, "embed_queries", None)
+        with stage_timer("embed"):
+            return batch(texts) if batch is not None else emb.embed_documents(texts)
+
+    def similarity_search_by_vectors(
+        self, vectors: list[list[float]], k: int
+    ) -> list[list[Document]]:
+        """Várias buscas por similaridade numa única query do Chroma."""
+        if not vectors:
+            return []
+        col = self._ensure_vs()._collection
+        with stage_timer("vector_search"):
+            res = col.query(
+                query_embeddings=vectors, n_results=k, include=["documents", "metadatas"]
+            )
+        return [
+            [Document(page_content=d, metadata=m or {}) for d, m in zip(docs, metas, strict=True)]
+            for docs, metas in zip(res["documents"], res["metadatas"], strict=True)
+        ]
+
+    def similarity_search_with_embeddings(
+        self, vectors: list[list[float]], k: int
+    ) -> list[tuple[list[Document], np.ndarray]]:
+        """Como `similarity_search_by_vectors`, devolvendo também os vetores dos hits."""
+        if not vectors:
+            return []
+        col = self._ensure_vs()._collection
+        with stage_timer("vector_search"):
+            res = col.query(
+                query_embeddings=vectors,
+                n_results=k,
+                include=["documents", "metadatas", "embeddings"],
+            )
+        out = []
+        for docs, metas, embs in zip(
+            res["documents"], res["metadatas"], res["embeddings"], strict=True
+        ):
+            hits = [
+                Document(page_content=d, metadata=m or {}) for d, m in zip(docs, metas, strict=True)
+            ]
+            out.append((hits, np.asarray(embs, dtype=np.float32)))
+        return out
+
+    def mmr_search_by_vector(
+        self,
+        vector: list[float],
+        k: int,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        """
+        MMR nativo: uma query traz os `fetch_k` candidatos já com seus embeddings e a
+        seleção roda vetorizada (mmr.py). Relevância/diversidade voltam nos metadados.
+        """
+        docs, embeddings = self.similarity_search_with_embeddings(
+            [vector], max(k, fetch_k or MMR_FETCH_K)
+        )[0]
+        if not docs:
+            return []
+        return mmr_documents(
+            vector, embeddings, docs, k, MMR_LAMBDA if lambda_mult is None else lambda_mult
+        )
+
+    def search(
+        self,
+        question: str,
+        *,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        with stage_timer("embed"):
+            vector = self.embeddings.instance.embed_query(question)
+        if search_type == "similarity":
+            return self.similarity_search_by_vectors([vector], k)[0]
+        if search_type == "mmr":
+            return self.mmr_search_by_vector(vector, k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+        raise ValueError(f"search_type não suportado: {search_type}")
+
+    def as_retriever(
+        self,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+        **extra: Any,
+    ):
+        if search_type not in ("similarity", "mmr"):
+            # Outros tipos (ex.: similarity_score_threshold) ficam com o retriever do LangChain
+            return self._ensure_vs().as_retriever(
+                search_type=search_type, search_kwargs={"k": k, **extra}
+            )
+        # Tudo passa pelo `search()`: embedding e busca medidos em estágios separados
+        search_kwargs = {}
+        if search_type == "mmr":
+            search_kwargs = {"fetch_k": fetch_k, "lambda_mult": lambda_mult}
+        return StoreRetriever(store=self, search_type=search_type, k=k, search_kwargs=search_kwargs)
 
     def stats(self) -> dict:
         """Estatísticas básicas da coleção persistida."""
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import numpy as np
+from langchain_core.documents import Document
+
+MMR_FETCH_K = 20
+MMR_LAMBDA = 0.5
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(
+    query: np.ndarray, candidates: np.ndarray, k: int, lambda_mult: float = MMR_LAMBDA
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MMR guloso vetorizado: devolve (índices, relevância, diversidade) na ordem escolhida.
+
+    Relevância = cosseno com a query; diversidade = 1 - maior cosseno com os já
+    escolhidos no momento da escolha (1.0 para o primeiro). Cada passo é um único
+    produto candidatos x escolhido, sem recalcular a matriz de similaridade.
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k <= 0:
+        empty = np.empty(0)
+        return empty.astype(np.int64), empty, empty
+    cands = _unit(np.asarray(candidates, dtype=np.float32))
+    relevance = cands @ _unit(np.asarray(query, dtype=np.float32))
+    available = np.ones(n, dtype=bool)
+    picked = np.empty(k, dtype=np.int64)
+    diversity = np.ones(k, dtype=np.float32)
+
+    first = int(np.argmax(relevance))
+    picked[0], available[first] = first, False
+    redundancy = cands @ cands[first]  # maior cosseno com algum já escolhido
+    for step in range(1, k):
+        score = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        score[~available] = -np.inf
+        i = int(np.argmax(score))
+        picked[step], available[i] = i, False
+        diversity[step] = 1.0 - redundancy[i]
+        np.maximum(redundancy, cands @ cands[i], out=redundancy)
+    return picked, relevance[picked], diversity
+
+
+def mmr_documents(
+    query: list[float] | np.ndarray,
+    candidates: np.ndarray,
+    docs: list[Document],
+    k: int,
+    lambda_mult: float = MMR_LAMBDA,
+) -> list[Document]:
+    """Seleciona `k` de `docs` por MMR e anota os scores nos metadados."""
+    picked, relevance, diversity = mmr_select(np.asarray(query), candidates, k, lambda_mult)
+    return [
+        Document(
+            page_content=docs[i].page_content,
+            metadata={
+                **docs[i].metadata,
+                "mmr_relevance": round(float(rel), 6),
+                "mmr_diversity": round(float(div), 6),
+            },
+        )
+        for i, rel, div in zip(picked, relevance, diversity, strict=True)
+    ]
@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from infrastructure.embeddings.provider import EmbeddingsProvider
+from infrastructure.observability.metrics import VECTORS_ADDED, stage_timer
+from infrastructure.vectorstores.mmr import MMR_FETCH_K, MMR_LAMBDA, mmr_documents
+from infrastructure.vectorstores.retriever import StoreRetriever
+
+# Arquivos da coleção (em <persist_dir>/<collection>/)
+_META = "meta.json"  # {"dim": D}
+_VECTORS = "vectors.f32"  # matriz N x D float32, linhas normalizadas (L2 = 1)
+_ALIVE = "alive.u8"  # 1 byte por linha: 0 = removida/substituída (tombstone)
+_OFFSETS = "offsets.u64"  # offset de cada linha em docs.jsonl
+_DOCS = "docs.jsonl"  # {"id", "text", "metadata"} por linha
+# Índice quantizado opcional (a matriz float32 continua em disco para o rescoring)
+_CODES = {"int8": "codes.i8", "binary": "codes.b1"}
+_SCALES = "scales.f32"  # escala por dimensão do int8
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+_BLOCK = 65_536  # linhas por bloco na varredura quantizada (limita memória temporária)
+# int8: linhas normalizadas têm |x_d| <= 1, então a escala nunca passa de 1/127. Ao alargar
+# uma dimensão, sobra folga para que lotes seguintes raramente forcem outra reescrita
+_MAX_SCALE = 1 / 127
+_SCALE_HEADROOM = 1.5
+_POPCOUNT = np.array([i.bit_count() for i in range(256)], dtype=np.uint8)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def int8_scales(vectors: np.ndarray) -> np.ndarray:
+    """Escala por dimensão: o maior |x_d| vira 127."""
+    return (np.maximum(np.abs(vectors).max(axis=0), 1e-6) / 127).astype(np.float32)
+
+
+def quantize(vectors: np.ndarray, mode: str, scales: np.ndarray | None = None) -> np.ndarray:
+    if mode == "int8":
+        return np.clip(np.rint(vectors / scales), -127, 127).astype(np.int8)
+    return np.packbits(vectors > 0, axis=1)  # binary: 1 bit de sinal por dimensão
+
+
+def top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Índices dos k maiores scores, em ordem decrescente (argpartition + sort de k)."""
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    idx = np.argpartition(-scores, k - 1)[:k]
+    return idx[np.argsort(-scores[idx], kind="stable")]
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """
+    Visão imutável da coleção num instante: os mmaps de uma mesma geração dos arquivos.
+
+    Publicada com uma única atribuição; cada busca lê `self._snapshot` uma vez e usa só
+    ela. `compact()` troca os arquivos por `os.replace` (inodes novos), então uma busca
+    em andamento continua lendo a geração antiga até soltar a referência.
+    """
+
+    signature: tuple[int, int]
+    vectors: np.ndarray
+    alive: np.ndarray
+    offsets: np.ndarray
+    codes: np.ndarray
+    scales: np.ndarray | None = None
+    docs: mmap.mmap | None = None  # docs.jsonl até o fim da última linha
+
+    @property
+    def count(self) -> int:
+        return len(self.vectors)
+
+
+_EMPTY = _Snapshot(
+    signature=(-1, -1),
+    vectors=np.empty((0, 0), dtype=np.float32),
+    alive=np.empty(0, dtype=np.uint8),
+    offsets=np.empty(0, dtype=np.uint64),
+    codes=np.empty((0, 0), dtype=np.uint8),
+)
+
+
+class NumpyVectorStore:
+    """
+    Vector store em arquivos planos, para réplicas de leitura.
+
+    Vetores ficam numa matriz float32 memory-mapped com linhas já normalizadas:
+    a busca por cosseno vira um produto matriz-vetor seguido de argpartition.
+    Texto e metadados ficam num sidecar JSONL lido só para os hits (offsets
+    também memory-mapped), então abrir a coleção não desserializa nada.
+
+    Escritas são append-only: upsert marca a linha antiga como removida no
+    `alive.u8` e acrescenta a nova; `compact()` reescreve sem as removidas.
+    Leitores em outros processos percebem escritas pelo tamanho/mtime dos arquivos.
+    """
+
+    def __init__(
+        self,
+        persist_dir: str,
+        collection_name: str = "documents",
+        embeddings: EmbeddingsProvider | None = None,
+        quantization: str = "none",
+        rescore_factor: int = 10,
+    ) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"Quantização desconhecida: {quantization}")
+        self.persist_dir = persist_dir
+        self.collection_name = collection_name
+        self.embeddings = embeddings or EmbeddingsProvider()
+        self.path = Path(persist_dir) / collection_name
+        self._lock = threading.Lock()  # escritas e troca de snapshot
+        self._dim: int | None = None
+        self._snapshot = _EMPTY
+        self._ids: dict[str, int] | None = None  # id -> linha viva (só no caminho de escrita)
+        # Com quantização, a varredura usa só os códigos (int8 = 1/4, binary = 1/32 do
+        # float32) e os k * rescore_factor melhores são reordenados com os vetores exatos
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self._scales: np.ndarray | None = None
+
+    # ------------------------------------------------------------------ files
+    def _file(self, name: str) -> Path:
+        return self.path / name
+
+    def _read_dim(self) -> int | None:
+        meta = self._file(_META)
+        if not meta.exists():
+            return None
+        return int(json.loads(meta.read_text())["dim"])
+
+    def _current_signature(self) -> tuple[int, int]:
+        try:
+            size = self._file(_VECTORS).stat().st_size
+            alive_mtime = self._file(_ALIVE).stat().st_mtime_ns
+        except FileNotFoundError:
+            return (0, 0)
+        return (size, alive_mtime)
+
+    def _refresh(self) -> _Snapshot:
+        """Snapshot atual; remapeia (sob o lock) se outro escritor (ou este) mudou a coleção."""
+        snapshot = self._snapshot
+        if self._current_signature() == snapshot.signature:
+            return snapshot
+        with self._lock:
+            if self._current_signature() != self._snapshot.signature:
+                self._remap()
+            return self._snapshot
+
+    def _remap(self) -> None:
+        """Sob o lock: mapeia a geração atual dos arquivos e publica o snapshot."""
+        signature = self._current_signature()
+        self._dim = self._dim or self._read_dim()
+        # O número de linhas vem de vectors.f32, gravado por último no append:
+        # sidecar e tombstones sempre cobrem pelo menos essas linhas
+        n = signature[0] // (4 * self._dim) if self._dim else 0
+        if n == 0:
+            self._snapshot = _Snapshot(
+                signature=signature,
+                vectors=np.empty((0, self._dim or 0), dtype=np.float32),
+                alive=np.empty(0, dtype=np.uint8),
+                offsets=np.empty(0, dtype=np.uint64),
+                codes=self._map_codes(0),
+                scales=self._scales,
+            )
+            return
+        offsets = np.memmap(self._file(_OFFSETS), dtype=np.uint64, mode="r", shape=(n,))
+        with open(self._file(_DOCS), "rb") as f:
+            f.seek(int(offsets[-1]))
+            docs_end = int(offsets[-1]) + len(f.readline())
+            docs = mmap.mmap(f.fileno(), docs_end, access=mmap.ACCESS_READ)
+        self._snapshot = _Snapshot(
+            signature=signature,
+            vectors=np.memmap(
+                self._file(_VECTORS), dtype=np.float32, mode="r", shape=(n, self._dim)
+            ),
+            alive=np.memmap(self._file(_ALIVE), dtype=np.uint8, mode="r", shape=(n,)),
+            offsets=offsets,
+            codes=self._map_codes(n),
+            scales=self._scales,
+            docs=docs,
+        )
+
+    # ------------------------------------------------------------ quantização
+    def _code_width(self) -> int:
+        assert self._dim is not None
+        return self._dim if self.quantization == "int8" else (self._dim + 7) // 8
+
+    def _code_rows(self) -> int:
+        codes = self._file(_CODES[self.quantization])
+        return codes.stat().st_size // self._code_width() if codes.exists() else 0
+
+    def _map_codes(self, n: int) -> np.ndarray:
+        dtype = np.int8 if self.quantization == "int8" else np.uint8
+        if self.quantization == "none" or not self._dim:
+            return np.empty((0, 0), dtype=dtype)
+        # Códigos podem estar à frente de vectors.f32 (append em curso) ou atrás
+        # (modo recém-ativado): usa-se o prefixo comum e o resto vai direto ao float32
+        rows = min(self._code_rows(), n)
+        scales = self._file(_SCALES)
+        if self.quantization == "int8" and scales.exists():
+            self._scales = np.fromfile(scales, dtype=np.float32)
+        if rows == 0:
+            return np.empty((0, self._code_width()), dtype=dtype)
+        return np.memmap(
+            self._file(_CODES[self.quantization]),
+            dtype=dtype,
+            mode="r",
+            shape=(rows, self._code_width()),
+        )
+
+    def _catch_up_codes(self) -> None:
+        """Sob o lock: alinha o arquivo de códigos às linhas de vectors.f32."""
+        if self.quantization == "none" or not self._dim:
+            return
+        snap, codes_file = self._snapshot, self._file(_CODES[self.quantization])
+        n, rows = snap.count, self._code_rows()
+        if rows > n:
+            # Só o excesso: snapshots publicados mapeiam no máximo n linhas de códigos
+            os.truncate(codes_file, n * self._code_width())
+        if rows >= n:
+            return
+        if self.quantization == "int8":
+            maxabs = np.zeros(self._dim, dtype=np.float32)
+            for s in range(rows, n, _BLOCK):
+                np.maximum(maxabs, np.abs(snap.vectors[s : s + _BLOCK]).max(axis=0), out=maxabs)
+            self._widen_scales(maxabs, rows)
+        with open(codes_file, "ab") as f:
+            for s in range(rows, n, _BLOCK):
+                block = snap.vectors[s : min(s + _BLOCK, n)]
+                quantize(block, self.quantization, self._scales).tofile(f)
+        self._remap()
+
+    def _widen_scales(self, maxabs: np.ndarray, coded: int) -> None:
+        """Sob o lock: escala int8 >= maxabs / 127 em toda dimensão (sem clipping).
+
+        Se alguma dimensão precisa alargar, as `coded` linhas já codificadas são
+        requantizadas num arquivo novo (`os.replace`): snapshots publicados seguem com os
+        códigos e as escalas antigos, coerentes entre si.
+        """
+        need = int8_scales(maxabs[None, :])
+        if self._scales is not None and bool((need <= self._scales).all()):
+            return
+        if self._scales is None:
+            self._scales = need
+        else:
+            wider = np.maximum(need, np.minimum(need * _SCALE_HEADROOM, _MAX_SCALE))
+            self._scales = np.where(need > self._scales, wider, self._scales).astype(np.float32)
+        if coded:
+            vectors = self._snapshot.vectors
+            codes_file = self._file(_CODES["int8"])
+            tmp = self._file(_CODES["int8"] + ".tmp")
+            with open(tmp, "wb") as f:
+                for s in range(0, coded, _BLOCK):
+                    quantize(vectors[s : min(s + _BLOCK, coded)], "int8", self._scales).tofile(f)
+            os.replace(tmp, codes_file)
+        tmp = self._file(_SCALES + ".tmp")
+        self._scales.tofile(tmp)
+        os.replace(tmp, self._file(_SCALES))
+
+    def _approx_scores(self, snap: _Snapshot, queries: np.ndarray) -> np.ndarray:
+        """Scores aproximados (Q x linhas codificadas), em blocos de `_BLOCK` linhas."""
+        codes = snap.codes
+        coded = len(codes)
+        out = np.empty((len(queries), coded), dtype=np.float32)
+        if self.quantization == "int8":
+            # (c * s) . q == c . (s * q): escala aplicada uma vez na query
+            scaled = (queries * snap.scales).T.astype(np.float32)
+            for s in range(0, coded, _BLOCK):
+                out[:, s : s + _BLOCK] = (codes[s : s + _BLOCK].astype(np.float32) @ scaled).T
+        else:
+            bits = quantize(queries, "binary")
+            for s in range(0, coded, _BLOCK):
+                block = codes[s : s + _BLOCK]
+                for i, qb in enumerate(bits):
+                    out[i, s : s + _BLOCK] = -_POPCOUNT[block ^ qb].sum(axis=1, dtype=np.int32)
+        return out
+
+    def _sync_for_write(self) -> None:
+        """Sob o lock: remapeia e invalida o mapa de ids se outro processo escreveu."""
+        if self._current_signature() != self._snapshot.signature:
+            self._ids = None
+            self._remap()
+
+    def _load_ids(self) -> dict[str, int]:
+        if self._ids is None:
+            ids: dict[str, int] = {}
+            docs = self._file(_DOCS)
+            if docs.exists():
+                with open(docs, "rb") as f:
+                    for row, line in enumerate(f):
+                        ids[json.loads(line)["id"]] = row
+            alive = self._snapshot.alive
+            self._ids = {i: r for i, r in ids.items() if r < len(alive) and alive[r]}
+        return self._ids
+
+    def _truncate_tail(self, n: int) -> None:
+        """Descarta sobras de um append interrompido (linhas além de vectors.f32).
+
+        Só corta depois da linha n - 1: os snapshots mapeiam no máximo até ela.
+        """
+        docs, offsets_file = self._file(_DOCS), self._file(_OFFSETS)
+        if not docs.exists():
+            return
+        n_offsets = offsets_file.stat().st_size // 8 if offsets_file.exists() else 0
+        if n_offsets > n:
+            end = int(np.fromfile(offsets_file, dtype=np.uint64, count=1, offset=8 * n)[0])
+        elif n:
+            last = int(np.fromfile(offsets_file, dtype=np.uint64, count=1, offset=8 * (n - 1))[0])
+            with open(docs, "rb") as f:
+                f.seek(last)
+                end = last + len(f.readline())
+        else:
+            end = 0
+        if docs.stat().st_size == end and n_offsets == n:
+            return
+        os.truncate(docs, end)
+        if offsets_file.exists():
+            os.truncate(offsets_file, 8 * n)
+        if self._file(_ALIVE).exists():
+            os.truncate(self._file(_ALIVE), n)
+        self._ids = None
+
+    def _tombstone(self, rows: list[int]) -> None:
+        if not rows:
+            return
+        alive = np.memmap(self._file(_ALIVE), dtype=np.uint8, mode="r+")
+        alive[rows] = 0
+        alive.flush()
+        del alive
+        os.utime(self._file(_ALIVE))  # garante mtime novo para os leitores
+
+    @staticmethod
+    def _read_docs(snap: _Snapshot, rows: np.ndarray) -> list[Document]:
+        out: list[Document] = []
+        docs = snap.docs
+        for row in rows:
+            start = int(snap.offsets[row])
+            rec = json.loads(docs[start : docs.find(b"\n", start)])
+            out.append(Document(page_content=rec["text"], metadata=rec["metadata"] or {}))
+        return out
+
+    # ----------------------------------------------------------------- writes
+    def warm_up(self) -> None:
+        """Mapeia os arquivos e toca as páginas do índice (leitura sequencial).
+
+        Com quantização, também gera os códigos que faltam (ex.: modo recém-ativado).
+        """
+        snap = self._refresh()
+        if self.quantization != "none":
+            with self._lock:
+                self._sync_for_write()
+                self._catch_up_codes()
+                snap = self._snapshot
+        index = snap.codes if self.quantization != "none" else snap.vectors
+        if index.size:
+            index.sum(dtype=np.float64)
+
+    def add_embeddings(
+        self,
+        vectors: list[list[float]] | np.ndarray,
+        texts: list[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> int:
+        """Grava vetores já calculados (upsert por id)."""
+        if len(texts) == 0:
+            return 0
+        matrix = _normalize(vectors)
+        metadatas = metadatas or [{} for _ in texts]
+        ids = ids or [os.urandom(16).hex() for _ in texts]
+
+        with stage_timer("vector_write"), self._lock:
+            self._sync_for_write()
+            self.path.mkdir(parents=True, exist_ok=True)
+            if self._dim is None:
+                self._dim = int(matrix.shape[1])
+                self._file(_META).write_text(json.dumps({"dim": self._dim}))
+            if matrix.shape[1] != self._dim:
+                raise ValueError(f"Dimensão {matrix.shape[1]} difere da coleção ({self._dim}).")
+
+            start = self._snapshot.count
+            self._truncate_tail(start)
+            self._catch_up_codes()
+            known = self._load_ids()
+            # Sidecar/offsets/tombstones antes da matriz: leitores usam o tamanho
+            # de vectors.f32 como nº de linhas e nunca enxergam linha incompleta
+            offsets = np.empty(len(texts), dtype=np.uint64)
+            with open(self._file(_DOCS), "ab") as f:
+                for i, (cid, text, meta) in enumerate(zip(ids, texts, metadatas, strict=True)):
+                    offsets[i] = f.tell()
+                    rec = {"id": cid, "text": text, "metadata": meta}
+                    f.write(json.dumps(rec, ensure_ascii=False).encode() + b"\n")
+            with open(self._file(_OFFSETS), "ab") as f:
+                offsets.tofile(f)
+            with open(self._file(_ALIVE), "ab") as f:
+                np.ones(len(texts), dtype=np.uint8).tofile(f)
+            last = {cid: row for row, cid in enumerate(ids, start=start)}
+            stale = [known[cid] for cid in last if cid in known]
+            # id repetido no mesmo lote: vale a última ocorrência
+            stale += [row for row, cid in enumerate(ids, start=start) if last[cid] != row]
+            self._tombstone(stale)
+            if self.quantization != "none":
+                if self.quantization == "int8":
+                    self._widen_scales(np.abs(matrix).max(axis=0), start)
+                with open(self._file(_CODES[self.quantization]), "ab") as f:
+                    quantize(matrix, self.quantization, self._scales).tofile(f)
+            with open(self._file(_VECTORS), "ab") as f:
+                matrix.tofile(f)
+
+            known.update(last)
+            self._remap()
+        VECTORS_ADDED.inc(len(texts), backend="numpy")
+        return len(texts)
+
+    def add_documents(self, documents, ids: list[str] | None = None):
+        """Com `ids`, a escrita é um upsert (reingestão não duplica vetores)."""
+        if not documents:
+            return 0
+        texts = [d.page_content for d in documents]
+        with stage_timer("embed"):
+            vectors = self.embeddings.instance.embed_documents(texts)
+        return self.add_embeddings(vectors, texts, [dict(d.metadata) for d in documents], ids)
+
+    def delete(self, ids: list[str]) -> int:
+        if not ids:
+            return 0
+        with self._lock:
+            self._sync_for_write()
+            known = self._load_ids()
+            rows = [known.pop(cid) for cid in ids if cid in known]
+            self._tombstone(rows)
+            self._remap()
+        return len(ids)
+
+    def compact(self) -> int:
+        """Reescreve a coleção só com as linhas vivas; devolve quantas foram descartadas.
+
+        Cada arquivo novo entra por `os.replace`: buscas que ainda seguram o snapshot
+        anterior continuam lendo os inodes antigos, que somem quando o último mmap fecha.
+        """
+        with self._lock:
+            self._sync_for_write()
+            snap = self._snapshot
+            rows = np.flatnonzero(snap.alive)
+            if len(rows) == snap.count:
+                return 0
+            vectors = np.array(snap.vectors[rows])
+            docs = snap.docs
+            records = [
+                docs[int(snap.offsets[row]) : docs.find(b"\n", int(snap.offsets[row])) + 1]
+                for row in rows
+            ]
+
+            offsets = np.empty(len(records), dtype=np.uint64)
+            position = 0
+            for i, rec in enumerate(records):
+                offsets[i], position = position, position + len(rec)
+            names = [_DOCS, _OFFSETS, _ALIVE, _VECTORS]
+            tmp = {name: self._file(name + ".tmp") for name in names}
+            with open(tmp[_DOCS], "wb") as f:
+                f.writelines(records)
+            offsets.tofile(tmp[_OFFSETS])
+            np.ones(len(records), dtype=np.uint8).tofile(tmp[_ALIVE])
+            vectors.tofile(tmp[_VECTORS])
+            # Códigos (e escalas do int8) refeitos a partir das linhas vivas
+            self._scales = None
+            if self.quantization != "none" and len(vectors):
+                if self.quantization == "int8":
+                    self._scales = int8_scales(vectors)
+                    names.append(_SCALES)
+                    tmp[_SCALES] = self._file(_SCALES + ".tmp")
+                    self._scales.tofile(tmp[_SCALES])
+                codes = _CODES[self.quantization]
+                names.append(codes)
+                tmp[codes] = self._file(codes + ".tmp")
+                quantize(vectors, self.quantization, self._scales).tofile(tmp[codes])
+            # Códigos que não foram refeitos ficaram desalinhados (e nenhum snapshot os mapeia)
+            for name in (*_CODES.values(), _SCALES):
+                if name not in names:
+                    self._file(name).unlink(missing_ok=True)
+            # vectors.f32 por último: muda a assinatura só com o resto já no lugar
+            for name in [*names[4:], _DOCS, _OFFSETS, _ALIVE, _VECTORS]:
+                os.replace(tmp[name], self._file(name))
+
+            self._ids = None
+            self._remap()
+        return snap.count - len(rows)
+
+    # ------------------------------------------------------------------ reads
+    @staticmethod
+    def _hits(scores: np.ndarray, k: int) -> np.ndarray:
+        rows = top_k(scores, k)
+        return rows[np.isfinite(scores[rows])]
+
+    def _candidates(self, snap: _Snapshot, queries: np.ndarray, k: int) -> list[np.ndarray]:
+        """Linhas vivas mais similares (cosseno exato, ordem decrescente) por query."""
+        queries = _normalize(queries)
+        if self.quantization == "none" or not len(snap.codes):
+            scores = queries @ snap.vectors.T
+            scores[:, snap.alive == 0] = -np.inf
+            return [self._hits(row, k) for row in scores]
+
+        coded = len(snap.codes)
+        approx = self._approx_scores(snap, queries)
+        approx[:, snap.alive[:coded] == 0] = -np.inf
+        # Linhas ainda sem código entram direto no rescoring
+        tail = coded + np.flatnonzero(snap.alive[coded:])
+        out = []
+        for query, row in zip(queries, approx, strict=True):
+            rows = np.sort(np.concatenate([self._hits(row, k * self.rescore_factor), tail]))
+            exact = snap.vectors[rows] @ query  # lê do disco só os candidatos
+            out.append(rows[top_k(exact, k)])
+        return out
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embeda várias perguntas numa única chamada ao backend de embeddings."""
+        emb = self.embeddings.instance
+        batch = getattr(emb, "embed_queries", None)
+        with stage_timer("embed"):
+            return batch(texts) if batch is not None else emb.embed_documents(texts)
+
+    def similarity_search_by_vectors(
+        self, vectors: list[list[float]], k: int
+    ) -> list[list[Document]]:
+        """Várias buscas por similaridade num único produto de matrizes."""
+        return [docs for docs, _ in self.similarity_search_with_embeddings(vectors, k)]
+
+    def similarity_search_with_embeddings(
+        self, vectors: list[list[float]], k: int
+    ) -> list[tuple[list[Document], np.ndarray]]:
+        """Como `similarity_search_by_vectors`, devolvendo também os vetores dos hits."""
+        if len(vectors) == 0:
+            return []
+        snap = self._refresh()
+        if not snap.count:
+            dim = len(vectors[0])
+            return [([], np.empty((0, dim), dtype=np.float32)) for _ in vectors]
+        with stage_timer("vector_search"):
+            found = self._candidates(snap, np.asarray(vectors, dtype=np.float32), k)
+        return [(self._read_docs(snap, rows), np.asarray(snap.vectors[rows])) for rows in found]
+
+    def mmr_search_by_vector(
+        self,
+        vector: list[float],
+        k: int,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        docs, embeddings = self.similarity_search_with_embeddings(
+            [vector], max(k, fetch_k or MMR_FETCH_K)
+        )[0]
+        if not docs:
+            return []
+        return mmr_documents(
+            vector, embeddings, docs, k, MMR_LAMBDA if lambda_mult is None else lambda_mult
+        )
+
+    def search(
+        self,
+        question: str,
+        *,
+        search_type: str = "similarity",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        with stage_timer("embed"):
+            vector = self.embeddings.instance.embed_query(question)
+        if search_type == "similarity":
+            return self.similarity_search_by_vectors([vector], k)[0]
+        if search_type == "mmr":
+            return self.mmr_search_by_vector(vector, k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+        raise ValueError(f"search_type não suportado pelo backend numpy: {search_type}")
+
+    def as_retriever(
+        self,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ):
+        search_kwargs = {}
+        if search_type == "mmr":
+            search_kwargs = {"fetch_k": fetch_k, "lambda_mult": lambda_mult}
+        return StoreRetriever(store=self, search_type=search_type, k=k, search_kwargs=search_kwargs)
+
+    def stats(self) -> dict:
+        """Estatísticas básicas da coleção persistida."""
+        snap = self._refresh()
+        return {
+            "collection": self.collection_name,
+            "persist_directory": self.persist_dir,
+            "total_vectors": int(np.count_nonzero(snap.alive)),
+            "quantization": self.quantization,
+            # Bytes varridos por busca (o que precisa caber em RAM)
+            "index_bytes": int(
+                snap.codes.nbytes + (snap.scales.nbytes if snap.scales is not None else 0)
+                if self.quantization != "none"
+                else snap.vectors.nbytes
+            ),
+        }
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+from pydantic import Field
+
+
+class StoreRetriever(BaseRetriever):
+    """Retriever LangChain sobre o `search()` dos nossos stores (mantém tracing/callbacks)."""
+
+    store: Any
+    search_type: str = "similarity"
+    k: int = 5
+    search_kwargs: dict[str, Any] = Field(default_factory=dict)
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> list[Document]:
+        return self.store.search(
+            query, search_type=self.search_type, k=self.k, **self.search_kwargs
+        )
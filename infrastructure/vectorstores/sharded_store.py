@@ -0,0 +1,225 @@
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import Sequence
+from concurrent.futures import Executor
+from typing import Any
+
+import numpy as np
+from langchain_core.documents import Document
+
+from infrastructure.embeddings.provider import EmbeddingsProvider
+from infrastructure.observability.metrics import stage_timer
+from infrastructure.vectorstores.mmr import MMR_FETCH_K, MMR_LAMBDA, mmr_documents
+from infrastructure.vectorstores.retriever import StoreRetriever
+
+
+def shard_of(chunk_id: str, shards: int) -> int:
+    """Shard do chunk: hash estável do id (não depende de PYTHONHASHSEED nem do processo)."""
+    digest = hashlib.sha1(chunk_id.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % shards
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class ShardedVectorStore:
+    """
+    N stores (Chroma ou NumPy, um diretório cada) vistos como uma coleção só.
+
+    Escrita: cada chunk vai para `shard_of(id)`; o lote é embedado uma vez e os shards
+    gravam em paralelo (upsert por id continua idempotente enquanto N não mudar).
+
+    Leitura: cada shard devolve o seu top-k com os vetores dos hits, os candidatos são
+    reordenados pelo cosseno com a query (mesma escala para qualquer backend) e o MMR
+    roda depois do merge, sobre os `fetch_k` melhores globais.
+
+    As chamadas aos shards rodam no `executor` fora do contexto da requisição: os tempos
+    de cada shard vão só para o histograma e o `Server-Timing` recebe o fan-out inteiro
+    (`shard_fanout`, wall-clock) em vez da soma de N buscas paralelas.
+    """
+
+    def __init__(
+        self,
+        shards: Sequence[Any],
+        embeddings: EmbeddingsProvider | None = None,
+        executor: Executor | None = None,
+        collection_name: str = "documents",
+        persist_dir: str = "",
+    ) -> None:
+        if not shards:
+            raise ValueError("ShardedVectorStore precisa de pelo menos um shard.")
+        self.shards = list(shards)
+        self.embeddings = embeddings or EmbeddingsProvider()
+        self.executor = executor  # None = shards em sequência (testes, scripts)
+        self.collection_name = collection_name
+        self.persist_dir = persist_dir
+
+    def _fan_out(self, method: str, calls: list[tuple[int, tuple]] | None = None) -> list[Any]:
+        """`shard.method(*args)` para cada (shard, args), em paralelo; resultados na ordem.
+
+        Sem `calls`, chama o método sem argumentos em todos os shards.
+        """
+        if calls is None:
+            calls = [(i, ()) for i in range(len(self.shards))]
+        bound = [(getattr(self.shards[i], method), args) for i, args in calls]
+        if self.executor is None or len(bound) <= 1:
+            return [fn(*args) for fn, args in bound]
+        futures = [self.executor.submit(fn, *args) for fn, args in bound]
+        return [f.result() for f in futures]
+
+    def _group(self, ids: list[str]) -> dict[int, list[int]]:
+        """Posições de `ids` por shard."""
+        groups: dict[int, list[int]] = {}
+        for pos, cid in enumerate(ids):
+            groups.setdefault(shard_of(cid, len(self.shards)), []).append(pos)
+        return groups
+
+    # ----------------------------------------------------------------- writes
+    def warm_up(self) -> None:
+        self._fan_out("warm_up")
+
+    def add_embeddings(
+        self,
+        vectors: list[list[float]] | np.ndarray,
+        texts: list[str],
+        metadatas: list[dict] | None = None,
+        ids: list[str] | None = None,
+    ) -> int:
+        """Grava vetores já calculados, cada um no shard do seu id (upsert por id)."""
+        if len(texts) == 0:
+            return 0
+        ids = ids or [uuid.uuid4().hex for _ in texts]
+        metadatas = metadatas or [{} for _ in texts]
+        calls = [
+            (
+                shard,
+                (
+                    [vectors[p] for p in rows],
+                    [texts[p] for p in rows],
+                    [metadatas[p] for p in rows],
+                    [ids[p] for p in rows],
+                ),
+            )
+            for shard, rows in self._group(ids).items()
+        ]
+        with stage_timer("shard_fanout"):
+            return sum(self._fan_out("add_embeddings", calls))
+
+    def add_documents(self, documents, ids: list[str] | None = None):
+        """Com `ids`, a escrita é um upsert (reingestão não duplica vetores)."""
+        if not documents:
+            return 0
+        texts = [d.page_content for d in documents]
+        with stage_timer("embed"):
+            vectors = self.embeddings.instance.embed_documents(texts)
+        return self.add_embeddings(vectors, texts, [dict(d.metadata) for d in documents], ids)
+
+    def delete(self, ids: list[str]) -> int:
+        if not ids:
+            return 0
+        calls = [(shard, ([ids[p] for p in rows],)) for shard, rows in self._group(ids).items()]
+        with stage_timer("shard_fanout"):
+            self._fan_out("delete", calls)
+        return len(ids)
+
+    # ------------------------------------------------------------------ reads
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        """Embeda várias perguntas numa única chamada ao backend de embeddings."""
+        emb = self.embeddings.instance
+        batch = getattr(emb, "embed_queries", None)
+        with stage_timer("embed"):
+            return batch(texts) if batch is not None else emb.embed_documents(texts)
+
+    def similarity_search_with_embeddings(
+        self, vectors: list[list[float]], k: int
+    ) -> list[tuple[list[Document], np.ndarray]]:
+        """Top-k global por query: top-k de cada shard, reordenado pelo cosseno."""
+        if len(vectors) == 0:
+            return []
+        calls = [(i, (vectors, k)) for i in range(len(self.shards))]
+        with stage_timer("shard_fanout"):
+            per_shard = self._fan_out("similarity_search_with_embeddings", calls)
+            queries = _unit(np.asarray(vectors, dtype=np.float32))
+            out = []
+            for q, query in enumerate(queries):
+                docs = [d for found in per_shard for d in found[q][0]]
+                if not docs:
+                    out.append(([], np.empty((0, len(query)), dtype=np.float32)))
+                    continue
+                embeddings = np.concatenate(
+                    [np.asarray(f[q][1], dtype=np.float32) for f in per_shard if f[q][0]]
+                )
+                scores = _unit(embeddings) @ query
+                # Empate: mantém a ordem dos shards (resultado determinístico)
+                best = np.argsort(-scores, kind="stable")[:k]
+                out.append(([docs[i] for i in best], embeddings[best]))
+        return out
+
+    def similarity_search_by_vectors(
+        self, vectors: list[list[float]], k: int
+    ) -> list[list[Document]]:
+        """Várias buscas por similaridade; uma chamada por shard para o lote inteiro."""
+        return [docs for docs, _ in self.similarity_search_with_embeddings(vectors, k)]
+
+    def mmr_search_by_vector(
+        self,
+        vector: list[float],
+        k: int,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        """MMR sobre os `fetch_k` melhores globais (não por shard): diversidade entre shards."""
+        docs, embeddings = self.similarity_search_with_embeddings(
+            [vector], max(k, fetch_k or MMR_FETCH_K)
+        )[0]
+        if not docs:
+            return []
+        return mmr_documents(
+            vector, embeddings, docs, k, MMR_LAMBDA if lambda_mult is None else lambda_mult
+        )
+
+    def search(
+        self,
+        question: str,
+        *,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> list[Document]:
+        with stage_timer("embed"):
+            vector = self.embeddings.instance.embed_query(question)
+        if search_type == "similarity":
+            return self.similarity_search_by_vectors([vector], k)[0]
+        if search_type == "mmr":
+            return self.mmr_search_by_vector(vector, k, fetch_k=fetch_k, lambda_mult=lambda_mult)
+        raise ValueError(f"search_type não suportado: {search_type}")
+
+    def as_retriever(
+        self,
+        search_type: str = "mmr",
+        k: int = 5,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ):
+        search_kwargs = {}
+        if search_type == "mmr":
+            search_kwargs = {"fetch_k": fetch_k, "lambda_mult": lambda_mult}
+        return StoreRetriever(store=self, search_type=search_type, k=k, search_kwargs=search_kwargs)
+
+    def stats(self) -> dict:
+        """Totais somados entre shards, mais as estatísticas de cada um."""
+        shards = self._fan_out("stats")
+        out = {
+            "collection": self.collection_name,
+            "persist_directory": self.persist_dir,
+            "total_vectors": sum(s["total_vectors"] for s in shards),
+            "shards": shards,
+        }
+        if all("index_bytes" in s for s in shards):
+            out["index_bytes"] = sum(s["index_bytes"] for s in shards)
+        return out
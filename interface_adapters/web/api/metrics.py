@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable, Callable
+
+from fastapi import APIRouter, Request, Response
+from starlette.routing import NoMatchFound
+
+from app.container import AppState
+from infrastructure.observability.metrics import (
+    CONTENT_TYPE,
+    HTTP_IN_FLIGHT,
+    HTTP_REQUEST_SECONDS,
+    REGISTRY,
+    Counter,
+    Gauge,
+)
+from interface_adapters.web.dependencies import Container
+
+router = APIRouter(tags=["observability"])
+
+
+def _container_metrics(container: AppState) -> list[Counter]:
+    """Séries lidas na hora do scrape: contadores que os caches e a fila já mantêm."""
+    hits = Counter("rag_cache_hits_total", "Acertos de cache.", ["cache"])
+    misses = Counter("rag_cache_misses_total", "Faltas de cache.", ["cache"])
+    caches = {
+        "retrieval": container.retrieval_cache.stats() if container.retrieval_cache else None,
+        "embeddings": container.embeddings.cache_stats(),
+    }
+    for name, stats in caches.items():
+        if stats is not None:
+            hits.inc(stats["hits"], cache=name)
+            misses.inc(stats["misses"], cache=name)
+
+    jobs = Gauge("rag_ingest_jobs_in_flight", "Jobs de ingestão na fila ou rodando.", ["state"])
+    for state, n in container.jobs.stats().items():
+        jobs.set(n, state=state)
+
+    pool = container.collections.stats()
+    open_ = Gauge("rag_collections_open", "Coleções abertas no pool (sem as fixas).")
+    open_.set(pool["open"])
+    opens = Counter("rag_collection_opens_total", "Aberturas de coleção (misses do pool).")
+    opens.inc(pool["opens"])
+    evictions = Counter("rag_collection_evictions_total", "Coleções removidas do pool por LRU.")
+    evictions.inc(pool["evictions"])
+    return [hits, misses, jobs, open_, opens, evictions]
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(container: Container) -> Response:
+    body = REGISTRY.render(extra=_container_metrics(container))
+    return Response(content=body, media_type=CONTENT_TYPE)
+
+
+def _route_label(request: Request) -> str:
+    """Template completo da rota casada (`/v1/jobs/{job_id}`), com o prefixo do router.
+
+    Conforme a versão do FastAPI, `scope["route"]` traz o path relativo ao `include_router`
+    (`/echo`): o prefixo é o path da requisição menos o trecho que a própria rota casou.
+    """
+    route = request.scope.get("route")
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if route is None or template is None:
+        return "unmatched"
+    try:
+        matched = str(route.url_path_for(route.name, **request.path_params))
+    except (NoMatchFound, AttributeError):
+        return template
+    path = request.scope["path"]
+    return path[: len(path) - len(matched)] + template if path.endswith(matched) else template
+
+
+async def track_requests(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Middleware HTTP: requisições em andamento e latência por rota (template, não a URL)."""
+    started = time.perf_counter()
+    status = 500
+    HTTP_IN_FLIGHT.inc()
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        HTTP_IN_FLIGHT.dec()
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - started,
+            method=request.method,
+            route=_route_label(request),
+            status=str(status),
+        )
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import re
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from fastapi import Request, Response
+from starlette.concurrency import run_in_threadpool
+
+from infrastructure.observability.profiler import SamplingProfiler
+from infrastructure.observability.timing import end_request, start_request
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_FILE_HEADER = "X-Profile-File"
+
+
+def _profile_name(request: Request) -> str:
+    route = re.sub(r"[^0-9A-Za-z]+", "_", request.url.path).strip("_")
+    return f"{route}-{uuid.uuid4().hex[:8]}"
+
+
+async def server_timing(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """
+    Middleware: header `Server-Timing` com os estágios desta requisição (embed, busca,
+    rerank, pack, llm...) e, se `PROFILING_ENABLED`, perfil amostrado quando o cliente
+    envia `X-Profile: 1`. Em respostas em streaming só entram os estágios concluídos
+    antes dos headers.
+    """
+    settings = request.app.state.container.settings
+    profiler = None
+    if settings.profiling_enabled and request.headers.get(PROFILE_HEADER, "") in {"1", "true"}:
+        profiler = SamplingProfiler(settings.profiling_interval_ms / 1000).start()
+
+    started = time.perf_counter()
+    timings, token = start_request()
+    try:
+        response = await call_next(request)
+    finally:
+        end_request(token)
+        if profiler is not None:
+            profiler.stop()
+
+    if settings.server_timing_enabled:
+        response.headers["Server-Timing"] = timings.header(total=time.perf_counter() - started)
+    if profiler is not None:
+        name = _profile_name(request)
+        path = await run_in_threadpool(profiler.write, settings.profiling_dir, name)
+        response.headers[PROFILE_FILE_HEADER] = path.name
+    return response
@@ -1,24 +1,53 @@
 from __future__ import annotations
 
+import shutil
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Annotated
+from typing import Annotated, Any
 
-from fastapi import APIRouter, File, HTTPException, UploadFile, status
-from pydantic import BaseModel
+from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile, status
+from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 
 from app.settings import Settings
-from infrastructure.vectorstores.chroma_store import ChromaVectorStore
-from use_cases.ingest_documents import IngestDocumentsUseCase
+from infrastructure.jobs.job_queue import Job, JobQueueFullError
+from infrastructure.observability.metrics import stage_timer
+from interface_adapters.web.dependencies import COLLECTION_PATTERN, Container, read_collection
+from use_cases.ingest_documents import IngestProgress
 
 router = APIRouter(tags=["documents"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MiB
 
-class DocumentIngestResponse(BaseModel):
+CollectionField = Annotated[str | None, Form(pattern=COLLECTION_PATTERN)]
+CollectionQuery = Annotated[str | None, Query(pattern=COLLECTION_PATTERN)]
+
+
+class DocumentIngestAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
     filename: str
     uploaded_at: datetime
-    num_docs: int
-    num_chunks: int
+    collection: str
+
+
+class BulkIngestRequest(BaseModel):
+    directory: str = ""  # subdiretório relativo ao diretório da coleção ("" = ele todo)
+    pattern: str = "*.pdf"  # glob de nome de arquivo (sem separadores nem "..")
+    collection: str | None = Field(None, pattern=COLLECTION_PATTERN)
+
+    def pattern_is_local(self) -> bool:
+        """O glob não pode sair do diretório (`../*.pdf`) nem ser absoluto."""
+        p = self.pattern
+        return bool(p) and not (Path(p).is_absolute() or "/" in p or "\\" in p or ".." in p)
+
+
+class BulkIngestAccepted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+    directory: str
     collection: str
 
 
@@ -26,40 +55,138 @@ class DocumentStatsResponse(BaseModel):
     collection: str
     persist_directory: str
     total_vectors: int
+    embeddings_cache: dict[str, Any] | None = None
+    retrieval_cache: dict[str, Any] | None = None
+    lexical_chunks: int | None = None
+    shards: list[dict[str, Any]] | None = None  # VECTOR_STORE_SHARDS > 1: stats por shard
+
+
+def collection_raw_dir(settings: Settings, collection: str) -> Path:
+    """PDFs da coleção padrão em RAW_DIR; tenants em TENANTS_RAW_DIR/<collection>."""
+    if collection == settings.chroma_collection:
+        return Path(settings.raw_dir)
+    # Fora do RAW_DIR: o bulk da coleção padrão (rglob) não pode enxergar arquivos de tenants
+    return Path(settings.tenants_raw_dir) / collection
 
 
 @router.post(
-    "/documents", response_model=DocumentIngestResponse, status_code=status.HTTP_201_CREATED
+    "/documents", response_model=DocumentIngestAccepted, status_code=status.HTTP_202_ACCEPTED
 )
-async def upload_document(file: Annotated[UploadFile, File(...)]) -> DocumentIngestResponse:
-    settings = Settings()
+async def upload_document(
+    file: Annotated[UploadFile, File(...)],
+    container: Container,
+    collection: CollectionField = None,
+) -> DocumentIngestAccepted:
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="Apenas PDFs são aceitos.")
 
-    raw_dir = Path(settings.raw_dir)
+    name = collection or container.settings.chroma_collection
+    raw_dir = collection_raw_dir(container.settings, name)
     raw_dir.mkdir(parents=True, exist_ok=True)
     dest = raw_dir / file.filename
-    data = await file.read()
-    dest.write_bytes(data)
+    # Cópia em blocos de tamanho fixo, fora do event loop (não carrega o PDF inteiro)
+    with dest.open("wb") as out, stage_timer("upload"):
+        await run_in_threadpool(shutil.copyfileobj, file.file, out, UPLOAD_CHUNK_SIZE)
+
+    # A ingestão provisiona o tenant; o lease segura a coleção no pool até o job terminar
+    services = await container.acollection(name, create=True, lease=True)
+    uc = services.ingest_documents
+
+    # Load/split/embed rodam no pool de workers, fora do event loop
+    def _ingest(job: Job) -> dict[str, Any]:
+        progress: IngestProgress = job.progress
+        num_docs, num_chunks = uc.execute(str(dest), progress=progress)
+        return {
+            "num_docs": num_docs,
+            "num_chunks": num_chunks,
+            "skipped": bool(progress.files_skipped),
+            "chunks_unchanged": progress.chunks_unchanged,
+            "chunks_deleted": progress.chunks_deleted,
+        }
 
-    uc = IngestDocumentsUseCase(settings=settings)
-    num_docs, num_chunks = uc.execute(str(dest))
+    try:
+        job = container.submit_job(
+            services,
+            "ingest",
+            _ingest,
+            payload={"filename": file.filename, "path": str(dest), "collection": services.name},
+            progress=IngestProgress(),
+        )
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
 
-    return DocumentIngestResponse(
+    return DocumentIngestAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/v1/jobs/{job.id}",
         filename=file.filename,
         uploaded_at=datetime.now(UTC),
-        num_docs=num_docs,
-        num_chunks=num_chunks,
-        collection=settings.chroma_collection,
+        collection=services.name,
     )
 
 
-@router.get("/documents", response_model=DocumentStatsResponse)
-async def get_documents_stats() -> DocumentStatsResponse:
-    settings = Settings()
-    store = ChromaVectorStore(
-        persist_dir=settings.chroma_dir,
-        collection_name=settings.chroma_collection,
+@router.post(
+    "/documents/bulk", response_model=BulkIngestAccepted, status_code=status.HTTP_202_ACCEPTED
+)
+async def bulk_ingest_documents(req: BulkIngestRequest, container: Container) -> BulkIngestAccepted:
+    if not req.pattern_is_local():
+        raise HTTPException(
+            status_code=400, detail="Padrão inválido (só nomes de arquivo, ex.: *.pdf)."
+        )
+    name = req.collection or container.settings.chroma_collection
+    raw_dir = collection_raw_dir(container.settings, name).resolve()
+    directory = (raw_dir / req.directory).resolve()
+    if not directory.is_relative_to(raw_dir) or not directory.is_dir():
+        raise HTTPException(
+            status_code=400, detail="Diretório inválido (deve estar no diretório da coleção)."
+        )
+
+    services = await container.acollection(name, create=True, lease=True)
+    uc = services.bulk_ingest
+
+    def _ingest(job: Job) -> dict[str, Any]:
+        return uc.execute(directory, pattern=req.pattern, progress=job.progress).as_dict()
+
+    try:
+        job = container.submit_job(
+            services,
+            "bulk_ingest",
+            _ingest,
+            payload={
+                "directory": str(directory),
+                "pattern": req.pattern,
+                "collection": services.name,
+            },
+            progress=IngestProgress(),
+        )
+    except JobQueueFullError as exc:
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+    return BulkIngestAccepted(
+        job_id=job.id,
+        status=job.status,
+        status_url=f"/v1/jobs/{job.id}",
+        directory=str(directory),
+        collection=services.name,
     )
-    data = store.stats()
+
+
+@router.get("/documents", response_model=DocumentStatsResponse)
+async def get_documents_stats(
+    container: Container, collection: CollectionQuery = None
+) -> DocumentStatsResponse:
+    services = await read_collection(container, collection)
+    data = services.store.stats()
+    data["embeddings_cache"] = container.embeddings.cache_stats()
+    cache = services.query_rag.retrieval_cache
+    if cache is not None:
+        data["retrieval_cache"] = cache.stats()
+    if services.lexical_index is not None:
+        data["lexical_chunks"] = services.lexical_index.count()
     return DocumentStatsResponse(**data)
+
+
+@router.get("/collections")
+async def get_collections(container: Container) -> dict[str, Any]:
+    """Pool de coleções: abertas, limite, aberturas/evicções e uso por coleção."""
+    return container.collections.stats()
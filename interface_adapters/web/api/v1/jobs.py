@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel
+
+from interface_adapters.web.dependencies import Container
+
+router = APIRouter(tags=["jobs"])
+
+
+class JobProgress(BaseModel):
+    stage: str
+    files_parsed: int
+    pages_parsed: int
+    chunks_split: int
+    chunks_embedded: int
+    chunks_unchanged: int
+    chunks_deleted: int
+    files_skipped: int
+    files_failed: int
+    timings: dict[str, float]
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    payload: dict[str, Any]
+    progress: JobProgress | None = None
+    # Mesmos estágios do Server-Timing (s): o upload responde antes da ingestão rodar
+    stage_timings: dict[str, float]
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, container: Container) -> JobStatusResponse:
+    job = container.jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado.")
+    p = job.progress
+    progress = (
+        JobProgress(
+            stage=p.stage,
+            files_parsed=p.files_parsed,
+            pages_parsed=p.pages_parsed,
+            chunks_split=p.chunks_split,
+            chunks_embedded=p.chunks_embedded,
+            chunks_unchanged=p.chunks_unchanged,
+            chunks_deleted=p.chunks_deleted,
+            files_skipped=p.files_skipped,
+            files_failed=p.files_failed,
+            timings=dict(p.timings),
+        )
+        if p is not None
+        else None
+    )
+    return JobStatusResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        payload=job.payload,
+        progress=progress,
+        stage_timings=job.timings.snapshot(),
+        result=job.result,
+        error=job.error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
@@ -1,20 +1,50 @@
 from __future__ import annotations
 
+import json
+import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from use_cases.query_rag import QueryRAGUseCase
+from interface_adapters.web.dependencies import COLLECTION_PATTERN, Container, read_collection
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["rag"])
 
 
 class RAGQueryRequest(BaseModel):
     question: str = Field(..., min_length=1)
+    collection: str | None = Field(None, pattern=COLLECTION_PATTERN)  # padrão: CHROMA_COLLECTION
     generate: bool = False
     k: int | None = None
     search_type: str | None = None  # "mmr" | "similarity" | etc.
+    # Só para search_type="mmr"; padrão: RETRIEVER_FETCH_K / RETRIEVER_LAMBDA_MULT
+    fetch_k: int | None = Field(None, ge=1)
+    lambda_mult: float | None = Field(None, ge=0.0, le=1.0)
+    # Rerank (se RERANK_PROVIDER != none): false desliga; budget padrão RERANK_BUDGET_MS
+    rerank: bool | None = None
+    rerank_budget_ms: float | None = Field(None, ge=0.0)
+
+
+class RAGBatchRequest(BaseModel):
+    items: list[RAGQueryRequest] = Field(..., min_length=1)
+    collection: str | None = Field(None, pattern=COLLECTION_PATTERN)  # padrão dos itens
+
+
+class RAGStreamRequest(BaseModel):
+    question: str = Field(..., min_length=1)
+    collection: str | None = Field(None, pattern=COLLECTION_PATTERN)
+    k: int | None = None
+    search_type: str | None = None
+    fetch_k: int | None = Field(None, ge=1)
+    lambda_mult: float | None = Field(None, ge=0.0, le=1.0)
+    # Rerank (se RERANK_PROVIDER != none): false desliga; budget padrão RERANK_BUDGET_MS
+    rerank: bool | None = None
+    rerank_budget_ms: float | None = Field(None, ge=0.0)
 
 
 class RAGHit(BaseModel):
@@ -22,13 +52,86 @@ class RAGHit(BaseModel):
     metadata: dict[str, Any]
 
 
+class RerankInfo(BaseModel):
+    reranker: str
+    candidates: int
+    ms: float
+    timed_out: bool
+
+
 class RAGQueryResponse(BaseModel):
     answer: str | None = None
     hits: list[RAGHit]
+    rerank: RerankInfo | None = None  # tempo do 2º estágio, separado do retrieval
+
+
+class RAGBatchResponse(BaseModel):
+    results: list[RAGQueryResponse]
 
 
 @router.post("/rag/query", response_model=RAGQueryResponse)
-def rag_query(req: RAGQueryRequest) -> RAGQueryResponse:
-    uc = QueryRAGUseCase()
-    out = uc.execute(req.question, generate=req.generate, k=req.k, search_type=req.search_type)
+async def rag_query(req: RAGQueryRequest, container: Container) -> RAGQueryResponse:
+    services = await read_collection(container, req.collection)
+    out = await services.query_rag.aexecute(
+        req.question,
+        generate=req.generate,
+        k=req.k,
+        search_type=req.search_type,
+        fetch_k=req.fetch_k,
+        lambda_mult=req.lambda_mult,
+        rerank=req.rerank,
+        rerank_budget_ms=req.rerank_budget_ms,
+    )
     return RAGQueryResponse(**out)
+
+
+@router.post("/rag/query:batch", response_model=RAGBatchResponse)
+async def rag_query_batch(req: RAGBatchRequest, container: Container) -> RAGBatchResponse:
+    limit = container.settings.batch_max_items
+    if len(req.items) > limit:
+        raise HTTPException(status_code=413, detail=f"Máximo de {limit} perguntas por lote.")
+    collections = {it.collection or req.collection for it in req.items}
+    if len(collections) > 1:
+        raise HTTPException(status_code=400, detail="Um lote consulta uma única coleção.")
+    services = await read_collection(container, collections.pop())
+    items = [it.model_dump(exclude={"collection"}) for it in req.items]
+    out = await services.query_rag.aexecute_batch(items)
+    return RAGBatchResponse(results=[RAGQueryResponse(**r) for r in out])
+
+
+def _sse(event: str, data: Any) -> str:
+    payload = json.dumps(data, ensure_ascii=False, default=str)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+@router.post("/rag/query/stream", response_class=StreamingResponse)
+async def rag_query_stream(req: RAGStreamRequest, container: Container) -> StreamingResponse:
+    """
+    Server-Sent Events: `hits` (lista de trechos) → `token`* (fragmentos do LLM)
+    → `done` (`{"answer": resposta completa, "rerank": tempo do 2º estágio ou null}`).
+    Falhas no meio do stream viram um evento `error`.
+    """
+    uc = (await read_collection(container, req.collection)).query_rag
+
+    async def _events() -> AsyncIterator[str]:
+        try:
+            events = uc.astream(
+                req.question,
+                k=req.k,
+                search_type=req.search_type,
+                fetch_k=req.fetch_k,
+                lambda_mult=req.lambda_mult,
+                rerank=req.rerank,
+                rerank_budget_ms=req.rerank_budget_ms,
+            )
+            async for ev in events:
+                yield _sse(ev["event"], ev["data"])
+        except Exception as exc:
+            logger.exception("Falha no streaming da resposta RAG")
+            yield _sse("error", {"detail": f"{type(exc).__name__}: {exc}"})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
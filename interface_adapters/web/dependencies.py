@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Annotated
+
+from fastapi import Depends, HTTPException, Request
+
+from app.container import AppState, CollectionServices
+from infrastructure.cache.collection_pool import UnknownCollectionError
+
+
+def get_container(request: Request) -> AppState:
+    """Container do processo, construído em `create_app` e aquecido no lifespan."""
+    return request.app.state.container
+
+
+Container = Annotated[AppState, Depends(get_container)]
+
+# Nome de coleção aceito pelo Chroma (3-63 caracteres) e seguro como nome de arquivo
+COLLECTION_PATTERN = r"^[A-Za-z0-9][A-Za-z0-9_-]{1,61}[A-Za-z0-9]$"
+
+
+async def read_collection(container: AppState, name: str | None) -> CollectionServices:
+    """Coleção para consulta: tenant que nunca recebeu ingestão é 404 (e não é criado)."""
+    try:
+        return await container.acollection(name)
+    except UnknownCollectionError as exc:
+        raise HTTPException(status_code=404, detail="Coleção não encontrada.") from exc
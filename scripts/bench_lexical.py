@@ -0,0 +1,117 @@
+"""
+Benchmark do índice lexical (BM25Index, SQLite FTS5) em escala.
+
+Gera chunks sintéticos em PT-BR (stopwords frequentes + vocabulário com cauda longa,
+distribuição de Zipf) e mede, para cada tamanho:
+  - build:  tempo de upsert dos chunks
+  - p50/p95 de latência por busca (k=K) com a query completa (OR de todos os termos,
+    como antes) e com a query filtrada (sem stopwords, sem termos de df alto, até
+    _MAX_TERMS termos)
+  - overlap@K entre os dois top-k
+
+Uso:
+    python scripts/bench_lexical.py
+    BENCH_CHUNKS=100000,1000000 python scripts/bench_lexical.py
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+import numpy as np
+from langchain_core.documents import Document
+
+from infrastructure.lexical.bm25_index import _TOKEN_RE, BM25Index, _normalize, to_match_query
+
+# ===================== USER CONFIG =====================
+SIZES = [int(s) for s in os.getenv("BENCH_CHUNKS", "100000,1000000").split(",")]
+VOCAB = int(os.getenv("BENCH_VOCAB", "50000"))
+WORDS_PER_CHUNK = 120
+K = 10
+N_QUERIES = 200
+WRITE_BATCH = 5000
+SEED = 42
+# =======================================================
+
+STOPWORDS = ["de", "a", "o", "que", "e", "do", "da", "em", "um", "para", "com", "não", "os"]
+QUESTION = "Qual é o prazo de {} para o recurso de {} e {} no caso do {}?"
+
+
+def synthetic(n: int, rng: np.random.Generator) -> list[str]:
+    texts = []
+    for _ in range(n):
+        # ~40% stopwords, resto do vocabulário com frequência de Zipf
+        ids = np.minimum(rng.zipf(1.3, WORDS_PER_CHUNK), VOCAB)
+        words = [
+            STOPWORDS[i % len(STOPWORDS)] if rng.random() < 0.4 else f"termo{i}"
+            for i in ids.tolist()
+        ]
+        texts.append(" ".join(words))
+    return texts
+
+
+def questions(rng: np.random.Generator) -> list[str]:
+    return [
+        QUESTION.format(*(f"termo{i}" for i in rng.integers(1, VOCAB // 10, 4)))
+        for _ in range(N_QUERIES)
+    ]
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    q = statistics.quantiles(samples, n=100)
+    return q[49] * 1000, q[94] * 1000
+
+
+def search_all_terms(index: BM25Index, question: str) -> list[str]:
+    """Comportamento anterior: OR de todos os termos da pergunta."""
+    terms = list(dict.fromkeys(_normalize(t) for t in _TOKEN_RE.findall(question)))
+    rows = index._conn.execute(
+        "SELECT c.chunk_id FROM chunks_fts JOIN chunks c ON c.rowid = chunks_fts.rowid"
+        " WHERE chunks_fts MATCH ? ORDER BY chunks_fts.rank LIMIT ?",
+        (to_match_query(terms), K),
+    ).fetchall()
+    return [r[0] for r in rows]
+
+
+def main() -> None:
+    rng = np.random.default_rng(SEED)
+    qs = questions(rng)
+    print(f"[bench] vocab={VOCAB} words/chunk={WORDS_PER_CHUNK} k={K} queries={N_QUERIES}")
+    print(
+        f"\n{'n':>9} {'build s':>9} {'all p50':>8} {'all p95':>8} "
+        f"{'sel p50':>8} {'sel p95':>8} {'overlap':>8}"
+    )
+    for n in SIZES:
+        root = tempfile.mkdtemp(prefix="bench_lex_")
+        try:
+            index = BM25Index(os.path.join(root, "lex.sqlite"))
+            t0 = time.perf_counter()
+            for i in range(0, n, WRITE_BATCH):
+                size = min(WRITE_BATCH, n - i)
+                docs = [Document(page_content=t, metadata={}) for t in synthetic(size, rng)]
+                index.upsert(docs, [str(j) for j in range(i, i + size)])
+            build = time.perf_counter() - t0
+
+            lat_all, lat_sel, overlap = [], [], []
+            for q in qs:
+                t0 = time.perf_counter()
+                everything = search_all_terms(index, q)
+                lat_all.append(time.perf_counter() - t0)
+                t0 = time.perf_counter()
+                selected = [d.metadata["chunk_id"] for d in index.search(q, K)]
+                lat_sel.append(time.perf_counter() - t0)
+                overlap.append(len(set(everything) & set(selected)) / K)
+            a50, a95 = percentiles(lat_all)
+            s50, s95 = percentiles(lat_sel)
+            print(
+                f"{n:>9} {build:>9.1f} {a50:>8.2f} {a95:>8.2f} "
+                f"{s50:>8.2f} {s95:>8.2f} {statistics.mean(overlap):>8.3f}"
+            )
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Suíte de benchmark ponta a ponta com corpus sintético, embeddings fake e LLM fake.
+
+Mede:
+  - ingestão (IngestDocumentsUseCase, o mesmo pipeline do POST /v1/documents):
+    páginas/s e chunks/s
+  - latência de query (p50/p95/p99) para similarity, mmr e similarity + geração
+  - pico de memória do processo (max RSS) após ingestão e após as queries
+
+Os resultados vão para um JSON (métricas planas + metadados da execução). Com
+`--baseline`, compara contra um JSON anterior e sai com código 1 se alguma métrica
+piorou além da tolerância (vazão caindo ou latência/memória subindo).
+
+Uso:
+    python scripts/bench_suite.py                                # -> bench_results.json
+    python scripts/bench_suite.py --output baseline.json
+    python scripts/bench_suite.py --baseline baseline.json --tolerance 0.15
+    BENCH_DOCS=100 BENCH_PAGES=50 python scripts/bench_suite.py
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+
+from synthetic_corpus import make_corpus, sample_questions
+
+from app.container import build_app_state
+from app.settings import Settings
+from use_cases.ingest_documents import IngestProgress
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore
+
+# ===================== USER CONFIG =====================
+DOCS = int(os.getenv("BENCH_DOCS", "20"))
+PAGES_PER_DOC = int(os.getenv("BENCH_PAGES", "25"))
+N_QUERIES = int(os.getenv("BENCH_QUERIES", "200"))
+K = 5
+WARMUP_QUERIES = 10
+VECTOR_STORE = os.getenv("BENCH_VECTOR_STORE", "chroma")  # chroma | numpy
+DEFAULT_TOLERANCE = 0.10  # piora relativa aceita antes de acusar regressão
+SEED = 42
+# =======================================================
+
+SCENARIOS = {
+    "similarity": {"search_type": "similarity"},
+    "mmr": {"search_type": "mmr"},
+    "generate": {"search_type": "similarity", "generate": True},
+}
+# Sentido "bom" de cada métrica, pelo sufixo
+HIGHER_IS_BETTER = ("_per_s",)
+LOWER_IS_BETTER = ("_ms", "_mb")
+
+
+def max_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KiB; macOS, bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def percentiles_ms(samples: list[float]) -> dict[str, float]:
+    q = statistics.quantiles(samples, n=100, method="inclusive")
+    return {"p50_ms": q[49] * 1000, "p95_ms": q[94] * 1000, "p99_ms": q[98] * 1000}
+
+
+def bench_settings(workdir: Path) -> Settings:
+    return Settings(
+        vector_store_provider=VECTOR_STORE,
+        chroma_dir=str(workdir / "chroma"),
+        numpy_store_dir=str(workdir / "numpy"),
+        chroma_collection="bench",
+        embeddings_provider="fake",
+        embeddings_cache_enabled=False,
+        llm_provider="fake",
+        # Queries repetidas não podem cair no cache: mede a busca, não o dict
+        retrieval_cache_enabled=False,
+        langchain_tracing_v2=False,
+    )
+
+
+def bench_ingest(state, paths: list[Path]) -> dict[str, float]:
+    pages = chunks = 0
+    started = time.perf_counter()
+    for path in paths:
+        progress = IngestProgress()
+        state.ingest_documents.execute(str(path), progress=progress)
+        pages += progress.pages_parsed
+        chunks += progress.chunks_split
+    seconds = time.perf_counter() - started
+    return {
+        "ingest.pages": pages,
+        "ingest.chunks": chunks,
+        "ingest.seconds": seconds,
+        "ingest.pages_per_s": pages / seconds,
+        "ingest.chunks_per_s": chunks / seconds,
+    }
+
+
+def bench_queries(state, questions: list[str]) -> dict[str, float]:
+    out: dict[str, float] = {}
+    for name, options in SCENARIOS.items():
+        for q in questions[:WARMUP_QUERIES]:
+            state.query_rag.execute(q, k=K, **options)
+        latencies = []
+        for q in questions:
+            t0 = time.perf_counter()
+            state.query_rag.execute(q, k=K, **options)
+            latencies.append(time.perf_counter() - t0)
+        for metric, value in percentiles_ms(latencies).items():
+            out[f"query.{name}.{metric}"] = value
+        out[f"query.{name}.queries_per_s"] = len(latencies) / sum(latencies)
+    return out
+
+
+def run(corpus_dir: str | None) -> dict:
+    workdir = Path(tempfile.mkdtemp(prefix="bench_suite_"))
+    try:
+        corpus = Path(corpus_dir) if corpus_dir else workdir / "corpus"
+        paths = sorted(corpus.glob("*.pdf")) if corpus_dir else []
+        if not paths:
+            print(f"[bench] Gerando corpus: {DOCS} PDFs x {PAGES_PER_DOC} páginas -> {corpus}")
+            paths = make_corpus(corpus, DOCS, PAGES_PER_DOC, SEED)
+
+        state = build_app_state(bench_settings(workdir))
+        try:
+            state.warm_up()
+            metrics = bench_ingest(state, paths)
+            metrics["memory.after_ingest_max_rss_mb"] = max_rss_mb()
+            metrics.update(bench_queries(state, sample_questions(N_QUERIES, SEED)))
+            metrics["memory.max_rss_mb"] = max_rss_mb()
+        finally:
+            state.shutdown()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "config": {
+                "docs": len(paths),
+                "pages_per_doc": PAGES_PER_DOC,
+                "queries": N_QUERIES,
+                "k": K,
+                "vector_store": VECTOR_STORE,
+            },
+        },
+        "metrics": {k: v for k, v in metrics.items() if v is not None},
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float) -> list[dict]:
+    """Variação relativa por métrica; `regression` quando piora além da tolerância."""
+    rows = []
+    for name, base in baseline["metrics"].items():
+        value = current["metrics"].get(name)
+        if value is None or not base:
+            continue
+        change = (value - base) / base
+        if name.endswith(HIGHER_IS_BETTER):
+            worse = -change
+        elif name.endswith(LOWER_IS_BETTER):
+            worse = change
+        else:
+            continue  # contagens/tempo total: só informativo
+        rows.append(
+            {
+                "metric": name,
+                "baseline": base,
+                "current": value,
+                "change": change,
+                "regression": worse > tolerance,
+            }
+        )
+    return rows
+
+
+def print_summary(result: dict) -> None:
+    m = result["metrics"]
+    print(
+        f"\n[ingest] {m['ingest.pages']:.0f} pages, {m['ingest.chunks']:.0f} chunks in "
+        f"{m['ingest.seconds']:.2f}s | pages/s={m['ingest.pages_per_s']:.1f} "
+        f"chunks/s={m['ingest.chunks_per_s']:.1f}"
+    )
+    print(f"\n{'scenario':>12} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'q/s':>9}")
+    for name in SCENARIOS:
+        p = f"query.{name}."
+        print(
+            f"{name:>12} {m[p + 'p50_ms']:>9.2f} {m[p + 'p95_ms']:>9.2f} "
+            f"{m[p + 'p99_ms']:>9.2f} {m[p + 'queries_per_s']:>9.1f}"
+        )
+    if "memory.max_rss_mb" in m:
+        print(f"\n[memory] max RSS {m['memory.max_rss_mb']:.1f} MB")
+
+
+def print_comparison(rows: list[dict], tolerance: float) -> None:
+    print(f"\n{'metric':<36} {'baseline':>11} {'current':>11} {'change':>8}")
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        print(
+            f"{r['metric']:<36} {r['baseline']:>11.2f} {r['current']:>11.2f} "
+            f"{r['change']:>+7.1%}{flag}"
+        )
+    n = sum(r["regression"] for r in rows)
+    print(f"\n[compare] {n} regressão(ões) acima de {tolerance:.0%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--corpus", help="diretório com PDFs (padrão: gera um sintético)")
+    args = parser.parse_args()
+
+    result = run(args.corpus)
+    print_summary(result)
+
+    regressions = False
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        rows = compare(result, baseline, args.tolerance)
+        print_comparison(rows, args.tolerance)
+        result["comparison"] = {"baseline": args.baseline, "rows": rows}
+        regressions = any(r["regression"] for r in rows)
+
+    Path(args.output).write_text(json.dumps(result, indent=2))
+    print(f"[bench] resultados -> {args.output}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
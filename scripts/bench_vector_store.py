@@ -0,0 +1,163 @@
+"""
+Benchmark de vector store: backend "numpy" (matriz mmap, busca exata) vs Chroma (HNSW).
+
+Mede, para cada tamanho de coleção:
+  - build:  tempo de escrita dos vetores (já calculados)
+  - open:   abrir a coleção persistida num cliente novo + primeira busca
+  - p50/p95 de latência por busca (k=K) e recall@K do Chroma contra a busca exata
+
+Com BENCH_SHARDS (ex.: 1,2,4,8), o backend numpy também roda particionado
+(ShardedVectorStore, linhas "numpy/N"): escrita e busca em paralelo entre os shards,
+merge do top-k; o recall contra o índice único deve ficar em 1.0.
+
+Uso:
+    python scripts/bench_vector_store.py
+    BENCH_SIZES=10000,100000 python scripts/bench_vector_store.py
+    BENCH_SIZES=1000000 BENCH_SHARDS=1,2,4,8 python scripts/bench_vector_store.py
+"""
+
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import chromadb
+import numpy as np
+
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore
+from infrastructure.vectorstores.sharded_store import ShardedVectorStore
+
+# ===================== USER CONFIG =====================
+SIZES = [int(s) for s in os.getenv("BENCH_SIZES", "10000,100000,1000000").split(",")]
+DIM = int(os.getenv("BENCH_DIM", "768"))
+K = 10
+N_QUERIES = 200
+WRITE_BATCH = 5000  # Chroma limita o tamanho de cada add
+# Construir HNSW com 1M vetores leva muito tempo; acima disso só o numpy roda
+CHROMA_MAX_VECTORS = int(os.getenv("BENCH_CHROMA_MAX", "1000000"))
+SHARDS = [int(s) for s in os.getenv("BENCH_SHARDS", "1").split(",")]
+SEED = 42
+# =======================================================
+
+
+def synthetic(n: int, rng: np.random.Generator) -> np.ndarray:
+    return rng.standard_normal((n, DIM), dtype=np.float32)
+
+
+def percentiles(samples: list[float]) -> tuple[float, float]:
+    q = statistics.quantiles(samples, n=100)
+    return q[49] * 1000, q[94] * 1000
+
+
+def open_numpy(
+    root: str, shards: int = 1, executor: ThreadPoolExecutor | None = None
+) -> NumpyVectorStore | ShardedVectorStore:
+    if shards <= 1:
+        return NumpyVectorStore(root, "bench", embeddings=object())
+    return ShardedVectorStore(
+        [open_numpy(os.path.join(root, str(i))) for i in range(shards)],
+        embeddings=object(),
+        executor=executor,
+    )
+
+
+def bench_numpy(
+    root: str,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    shards: int = 1,
+    executor: ThreadPoolExecutor | None = None,
+) -> dict:
+    store = open_numpy(root, shards, executor)
+    t0 = time.perf_counter()
+    for i in range(0, len(vectors), WRITE_BATCH):
+        chunk = vectors[i : i + WRITE_BATCH]
+        store.add_embeddings(
+            chunk,
+            [f"doc {j}" for j in range(i, i + len(chunk))],
+            ids=[str(j) for j in range(i, i + len(chunk))],
+        )
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    reader = open_numpy(root, shards, executor)
+    reader.similarity_search_by_vectors([queries[0].tolist()], K)
+    open_s = time.perf_counter() - t0
+
+    lat, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        docs = reader.similarity_search_by_vectors([q.tolist()], K)[0]
+        lat.append(time.perf_counter() - t0)
+        results.append({d.page_content for d in docs})
+    return {"build": build, "open": open_s, "lat": lat, "results": results}
+
+
+def bench_chroma(root: str, vectors: np.ndarray, queries: np.ndarray) -> dict:
+    client = chromadb.PersistentClient(path=root)
+    col = client.create_collection("bench", metadata={"hnsw:space": "cosine"})
+    t0 = time.perf_counter()
+    for i in range(0, len(vectors), WRITE_BATCH):
+        chunk = vectors[i : i + WRITE_BATCH]
+        col.add(
+            ids=[str(j) for j in range(i, i + len(chunk))],
+            embeddings=chunk.tolist(),
+            documents=[f"doc {j}" for j in range(i, i + len(chunk))],
+        )
+    build = time.perf_counter() - t0
+    del col, client
+
+    t0 = time.perf_counter()
+    col = chromadb.PersistentClient(path=root).get_collection("bench")
+    col.query(query_embeddings=[queries[0].tolist()], n_results=K)
+    open_s = time.perf_counter() - t0
+
+    lat, results = [], []
+    for q in queries:
+        t0 = time.perf_counter()
+        res = col.query(query_embeddings=[q.tolist()], n_results=K, include=["documents"])
+        lat.append(time.perf_counter() - t0)
+        results.append(set(res["documents"][0]))
+    return {"build": build, "open": open_s, "lat": lat, "results": results}
+
+
+def main() -> None:
+    rng = np.random.default_rng(SEED)
+    queries = synthetic(N_QUERIES, rng)
+    print(f"[bench] dim={DIM} k={K} queries={N_QUERIES}")
+    print(
+        f"\n{'backend':>8} {'n':>9} {'build s':>9} {'open s':>8} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'recall':>7}"
+    )
+    for n in SIZES:
+        vectors = synthetic(n, rng)
+        root = tempfile.mkdtemp(prefix="bench_vs_")
+        try:
+            exact = bench_numpy(os.path.join(root, "numpy"), vectors, queries)
+            runs = [("numpy", exact)]
+            for shards in (s for s in SHARDS if s > 1):
+                with ThreadPoolExecutor(max_workers=shards) as executor:
+                    path = os.path.join(root, f"numpy_{shards}")
+                    sharded = bench_numpy(path, vectors, queries, shards, executor)
+                runs.append((f"numpy/{shards}", sharded))
+            if n <= CHROMA_MAX_VECTORS:
+                chroma = bench_chroma(os.path.join(root, "chroma"), vectors, queries)
+                runs.append(("chroma", chroma))
+            for name, r in runs:
+                p50, p95 = percentiles(r["lat"])
+                recall = statistics.mean(
+                    len(got & want) / K
+                    for got, want in zip(r["results"], exact["results"], strict=True)
+                )
+                print(
+                    f"{name:>8} {n:>9} {r['build']:>9.1f} {r['open']:>8.3f} "
+                    f"{p50:>8.2f} {p95:>8.2f} {recall:>7.3f}"
+                )
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
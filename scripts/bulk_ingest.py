@@ -0,0 +1,38 @@
+"""
+Ingestão em massa de um diretório de PDFs (mesmo pipeline de POST /v1/documents/bulk).
+
+Uso:
+    python scripts/bulk_ingest.py                # RAW_DIR do .env
+    python scripts/bulk_ingest.py data/onboarding "*.pdf"
+"""
+
+import json
+import sys
+
+from app.container import build_app_state
+
+
+def main() -> None:
+    state = build_app_state()
+    directory = sys.argv[1] if len(sys.argv) > 1 else state.settings.raw_dir
+    pattern = sys.argv[2] if len(sys.argv) > 2 else "*.pdf"
+
+    collection = state.settings.chroma_collection
+    print(f"[bulk] directory={directory} pattern={pattern} collection={collection}")
+    try:
+        report = state.bulk_ingest.execute(directory, pattern=pattern)
+    finally:
+        state.shutdown()
+
+    out = report.as_dict()
+    print(json.dumps(out, indent=2))
+    t = out["throughput"]
+    print(
+        f"[bulk] {out['files']} files, {out['chunks']} chunks, {out['vectors']} vectors "
+        f"in {out['seconds']:.2f}s | files/s={t['files_per_s']:.2f} "
+        f"chunks/s={t['chunks_per_s']:.2f} vectors/s={t['vectors_per_s']:.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 import csv
 import datetime
+import hashlib
+import json
 import math
 import os
+import shutil
 import textwrap
 from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 
 # ===================== USER CONFIG (no .env) =====================
@@ -20,6 +24,24 @@ EVAL_DUMP = False
 EVAL_DUMP_K = 10
 PREVIEW_CHARS = 220
 
+# Lexical (BM25 / SQLite FTS5) scoring: adds a "bm25" row and a "<tag>+bm25" hybrid
+# row (reciprocal rank fusion) per model
+EVAL_HYBRID = True
+HYBRID_FETCH_K = 20
+HYBRID_RRF_K = 60
+
+# Quantized NumPy index (infrastructure/vectorstores/numpy_store.py): one "<tag>@<mode>" row
+# per mode (similarity search) with index bytes/vector and top-K overlap vs float32 ("none")
+EVAL_QUANTIZATION: list[str] = ["none", "int8", "binary"]  # [] disables
+QUANT_RESCORE_FACTOR = 10
+
+# Persistent embedding cache shared with the API (None disables it)
+EMBED_CACHE_PATH: str | None = ".cache/embeddings.sqlite"
+
+# Models evaluated in parallel (threads: HF encoders and Ollama calls release the GIL).
+# Indexes are reused across runs while (corpus hash, chunking params, model) is unchanged
+EVAL_WORKERS = 2
+
 # Gold set with (question, relevant_chunk_ids ; separated)
 GOLD_PATH = "data/eval/eval_gold.csv"
 
@@ -60,6 +82,11 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_ollama import OllamaEmbeddings
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from domain.services.rank_fusion import reciprocal_rank_fusion
+from infrastructure.embeddings.cache import CachedEmbeddings
+from infrastructure.lexical.bm25_index import BM25Index
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore
+
 
 # -------------------- helpers: loading & chunking --------------------
 def load_pdfs_as_docs(raw_dir: str) -> list[Document]:
@@ -76,11 +103,53 @@ def load_pdfs_as_docs(raw_dir: str) -> list[Document]:
     return docs
 
 
-def split_docs_with_chunk_ids(docs: list[Document]) -> list[Document]:
+def corpus_fingerprint(raw_dir: str) -> str:
+    """sha256 over (file name, content hash) of every PDF: cheap next to parsing them."""
+    h = hashlib.sha256()
+    for name in sorted(os.listdir(raw_dir)):
+        if not name.lower().endswith(".pdf"):
+            continue
+        file_hash = hashlib.sha256()
+        with open(os.path.join(raw_dir, name), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                file_hash.update(block)
+        h.update(f"{name}\x00{file_hash.hexdigest()}\n".encode())
+    return h.hexdigest()
+
+
+def index_fingerprint(corpus_hash: str, entry: dict) -> str:
+    payload = {
+        "corpus": corpus_hash,
+        "chunk_size": CHUNK_SIZE,
+        "chunk_overlap": CHUNK_OVERLAP,
+        "type": entry["type"],
+        "model": entry["model"],
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def read_fingerprint(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def write_fingerprint(path: str, fingerprint: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(fingerprint)
+
+
+def split_docs_with_chunk_ids(
+    docs: list[Document], chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP
+) -> list[Document]:
     splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
         separators=["\n\n", "\n", " ", ""],
+        # Position on the page: lets sweep_retrieval.py map gold ids across chunkings
+        add_start_index=True,
     )
     chunks = splitter.split_documents(docs)
     counters: dict[str, int] = {}
@@ -92,6 +161,30 @@ def split_docs_with_chunk_ids(docs: list[Document]) -> list[Document]:
     return chunks
 
 
+def load_chunks(raw_dir: str, persist_dir: str, corpus_hash: str) -> list[Document]:
+    """Parsed + split corpus, persisted as JSONL so unchanged PDFs are not parsed again."""
+    key = hashlib.sha256(f"{corpus_hash}:{CHUNK_SIZE}:{CHUNK_OVERLAP}".encode()).hexdigest()
+    path = os.path.join(persist_dir, f"chunks_{key[:16]}.jsonl")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f]
+        print(f"[eval] Reusing parsed corpus -> {path}")
+        return [Document(page_content=r["text"], metadata=r["metadata"]) for r in rows]
+
+    chunks = split_docs_with_chunk_ids(load_pdfs_as_docs(raw_dir))
+    os.makedirs(persist_dir, exist_ok=True)
+    for name in os.listdir(persist_dir):
+        if name.startswith("chunks_") and name.endswith(".jsonl"):
+            os.remove(os.path.join(persist_dir, name))
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(
+            json.dumps({"text": c.page_content, "metadata": c.metadata}) + "\n" for c in chunks
+        )
+    os.replace(tmp, path)
+    return chunks
+
+
 # -------------------- metrics & gold --------------------
 @dataclass
 class QueryCase:
@@ -134,13 +227,34 @@ def ndcg_at_k(ranked: Iterable[str], relevant: set[str], k: int) -> float:
             s += rel if i == 1 else (rel / math.log2(i))
         return s
 
-    ideal = dcg(sorted(ranked, key=lambda x: (x in relevant), reverse=True))
+    ideal = dcg(sorted(ranked, key=lambda x: x in relevant, reverse=True))
     actual = dcg(ranked)
     return (actual / ideal) if ideal > 0 else 0.0
 
 
 # -------------------- vector store plumbing --------------------
-def rebuild_index(persist_dir: str, collection: str, embeddings, chunks: list[Document]) -> Chroma:
+def open_index(persist_dir: str, collection: str, embeddings, fingerprint: str) -> Chroma | None:
+    """The persisted collection, if it was built from the same corpus/chunking/model."""
+    marker = os.path.join(persist_dir, f"{collection}.fingerprint")
+    if read_fingerprint(marker) != fingerprint:
+        return None
+    vs = Chroma(
+        collection_name=collection, embedding_function=embeddings, persist_directory=persist_dir
+    )
+    return vs if vs._collection.count() > 0 else None
+
+
+def rebuild_index(
+    persist_dir: str,
+    collection: str,
+    embeddings,
+    chunks: list[Document],
+    vectors: list[list[float]],
+    fingerprint: str,
+) -> Chroma:
+    marker = os.path.join(persist_dir, f"{collection}.fingerprint")
+    if os.path.exists(marker):
+        os.remove(marker)
     vs = Chroma(
         collection_name=collection, embedding_function=embeddings, persist_directory=persist_dir
     )
@@ -152,18 +266,145 @@ def rebuild_index(persist_dir: str, collection: str, embeddings, chunks: list[Do
         collection_name=collection, embedding_function=embeddings, persist_directory=persist_dir
     )
     if chunks:
-        vs.add_documents(chunks)
+        # Vectors were computed once for Chroma and the NumPy indexes
+        vs._collection.upsert(
+            ids=[c.metadata["chunk_id"] for c in chunks],
+            embeddings=vectors,
+            documents=[c.page_content for c in chunks],
+            metadatas=[dict(c.metadata) for c in chunks],
+        )
+    write_fingerprint(marker, fingerprint)
     return vs
 
 
-def retrieve_docs(vs: Chroma, question: str, k: int) -> list[Document]:
-    return vs.as_retriever(search_type="mmr", search_kwargs={"k": k}).invoke(question)
+def embed_questions(embeddings, questions: list[str]) -> dict[str, list[float]]:
+    """All gold questions in one batch (CachedEmbeddings.embed_queries when available)."""
+    batch = getattr(embeddings, "embed_queries", None)
+    vectors = batch(questions) if batch is not None else embeddings.embed_documents(questions)
+    return dict(zip(questions, vectors, strict=True))
+
 
+def retrieve_docs(vs: Chroma, query_vector: list[float], k: int) -> list[Document]:
+    # Same defaults as as_retriever(search_type="mmr")
+    return vs.max_marginal_relevance_search_by_vector(query_vector, k=k)
 
-def retrieve_ids(vs: Chroma, question: str, k: int) -> list[str]:
+
+def retrieve_ids(vs: Chroma, query_vector: list[float], k: int) -> list[str]:
     return [
-        (d.metadata or {}).get("chunk_id", "unknown#c?") for d in retrieve_docs(vs, question, k)
+        (d.metadata or {}).get("chunk_id", "unknown#c?") for d in retrieve_docs(vs, query_vector, k)
+    ]
+
+
+def rebuild_lexical_index(persist_dir: str, chunks: list[Document]) -> BM25Index:
+    path = os.path.join(persist_dir, "lexical_eval.sqlite")
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    index = BM25Index(path)
+    index.upsert(chunks, [c.metadata["chunk_id"] for c in chunks])
+    return index
+
+
+def lexical_ids(index: BM25Index, question: str, k: int) -> list[str]:
+    return [d.metadata["chunk_id"] for d in index.search(question, k)]
+
+
+def hybrid_ids(
+    vs: Chroma, index: BM25Index, question: str, query_vector: list[float], k: int
+) -> list[str]:
+    dense = [
+        (d.metadata or {}).get("chunk_id", "unknown#c?")
+        for d in vs.similarity_search_by_vector(query_vector, k=max(k, HYBRID_FETCH_K))
     ]
+    lexical = lexical_ids(index, question, max(k, HYBRID_FETCH_K))
+    fused = reciprocal_rank_fusion([dense, lexical], key=lambda cid: cid, k=HYBRID_RRF_K)
+    return [cid for cid, _ in fused[:k]]
+
+
+def open_numpy_indexes(root: str, fingerprint: str) -> dict[str, NumpyVectorStore] | None:
+    """Persisted quantized indexes, if every mode exists for the same fingerprint."""
+    if read_fingerprint(os.path.join(root, "fingerprint")) != fingerprint:
+        return None
+    stores: dict[str, NumpyVectorStore] = {}
+    for mode in EVAL_QUANTIZATION:
+        store = NumpyVectorStore(root, mode, quantization=mode, rescore_factor=QUANT_RESCORE_FACTOR)
+        if store.stats()["total_vectors"] == 0:
+            return None
+        stores[mode] = store
+    return stores
+
+
+def rebuild_numpy_indexes(
+    root: str, chunks: list[Document], vectors: list[list[float]], fingerprint: str
+) -> dict[str, NumpyVectorStore]:
+    """One NumpyVectorStore per quantization mode, all from the same vectors."""
+    shutil.rmtree(root, ignore_errors=True)
+    texts = [c.page_content for c in chunks]
+    stores: dict[str, NumpyVectorStore] = {}
+    for mode in EVAL_QUANTIZATION:
+        store = NumpyVectorStore(root, mode, quantization=mode, rescore_factor=QUANT_RESCORE_FACTOR)
+        store.add_embeddings(
+            vectors,
+            texts,
+            [dict(c.metadata) for c in chunks],
+            [c.metadata["chunk_id"] for c in chunks],
+        )
+        stores[mode] = store
+    write_fingerprint(os.path.join(root, "fingerprint"), fingerprint)
+    return stores
+
+
+def numpy_ids(store: NumpyVectorStore, query_vector: list[float], k: int) -> list[str]:
+    docs = store.similarity_search_by_vectors([query_vector], k)[0]
+    return [d.metadata["chunk_id"] for d in docs]
+
+
+def quantization_rows(
+    tag: str,
+    model_id: str,
+    gold: list[QueryCase],
+    qvecs: dict[str, list[float]],
+    stores: dict[str, NumpyVectorStore],
+) -> list[dict[str, str]]:
+    import statistics as st
+
+    ranked = {
+        mode: {q: numpy_ids(store, v, TOP_K) for q, v in qvecs.items()}
+        for mode, store in stores.items()
+    }
+    baseline = ranked.get("none")
+    rows = []
+    for mode, store in stores.items():
+        row = score_row(f"{tag}@{mode}", model_id, gold, lambda q, m=mode: ranked[m][q])
+        stats = store.stats()
+        per_vector = stats["index_bytes"] / max(1, stats["total_vectors"])
+        row["index_bytes_per_vector"] = f"{per_vector:.1f}"
+        if baseline is not None:
+            overlap = [len(set(ranked[mode][q]) & set(baseline[q])) / TOP_K for q in qvecs]
+            row["overlap_at_k"] = f"{st.mean(overlap) if overlap else 0.0:.6f}"
+        rows.append(row)
+    return rows
+
+
+def score_row(tag: str, model_id: str, gold: list[QueryCase], rank_fn) -> dict[str, str]:
+    import statistics as st
+
+    recalls, mrrs, ndcgs = [], [], []
+    for case in gold:
+        ranked = rank_fn(case.question)
+        recalls.append(recall_at_k(ranked, case.relevant_ids, TOP_K))
+        mrrs.append(mrr_at_k(ranked, case.relevant_ids, TOP_K))
+        ndcgs.append(ndcg_at_k(ranked, case.relevant_ids, TOP_K))
+    return {
+        "tag": tag,
+        "model_id": model_id,
+        "recall_at_k": f"{st.mean(recalls) if recalls else 0.0:.6f}",
+        "mrr_at_k": f"{st.mean(mrrs) if mrrs else 0.0:.6f}",
+        "ndcg_at_k": f"{st.mean(ndcgs) if ndcgs else 0.0:.6f}",
+        "k": str(TOP_K),
+        "chunk_size": str(CHUNK_SIZE),
+        "chunk_overlap": str(CHUNK_OVERLAP),
+    }
 
 
 # -------------------- embeddings factory --------------------
@@ -171,16 +412,20 @@ def build_embeddings(entry: dict) -> object:
     kind = entry["type"]
     if kind == "ollama":
         base = entry.get("base_url", "http://localhost:11434")
-        return OllamaEmbeddings(model=entry["model"], base_url=base)
+        emb = OllamaEmbeddings(model=entry["model"], base_url=base)
     elif kind == "hf":
-        return HuggingFaceEmbeddings(model_name=entry["model"], cache_folder=".hf_cache")
+        emb = HuggingFaceEmbeddings(model_name=entry["model"], cache_folder=".hf_cache")
     else:
         raise ValueError(f"Unknown embeddings type: {kind}")
+    if not EMBED_CACHE_PATH:
+        return emb
+    # Re-runs with unchanged PDFs/questions skip the model entirely
+    return CachedEmbeddings(emb, provider=kind, model=entry["model"], path=EMBED_CACHE_PATH)
 
 
 # -------------------- pretty printing & CSV report --------------------
-def dump_candidates(tag: str, vs: Chroma, question: str, k: int) -> None:
-    docs = retrieve_docs(vs, question, k)
+def dump_candidates(tag: str, vs: Chroma, question: str, query_vector: list[float], k: int) -> None:
+    docs = retrieve_docs(vs, query_vector, k)
     print(f"\n--- Candidates [{tag}] — Top {k}\nQ: {question}\n")
     for i, d in enumerate(docs, 1):
         cid = (d.metadata or {}).get("chunk_id", "unknown#c?")
@@ -203,9 +448,11 @@ def write_metrics_csv(out_path: str, rows: list[dict[str, str]]) -> None:
         "k",
         "chunk_size",
         "chunk_overlap",
+        "index_bytes_per_vector",
+        "overlap_at_k",
     ]
     with open(out_path, "w", newline="", encoding="utf-8") as f:
-        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w = csv.DictWriter(f, fieldnames=fieldnames, restval="")
         w.writeheader()
         for r in rows:
             w.writerow(r)
@@ -223,6 +470,67 @@ def print_summary_table(rows: list[dict[str, str]]) -> None:
         )
     print("=" * 86)
 
+    quant = [r for r in rows if r.get("index_bytes_per_vector")]
+    if quant:
+        print("\n=== Quantization: recall vs memory ===")
+        print(f"{'Tag':<26} {'Bytes/vec':>10} {'Recall@' + str(TOP_K):>10} {'Overlap':>10}")
+        for r in quant:
+            overlap = float(r["overlap_at_k"]) if r.get("overlap_at_k") else float("nan")
+            print(
+                f"{r['tag']:<26} {float(r['index_bytes_per_vector']):>10.1f} "
+                f"{float(r['recall_at_k']):>10.3f} {overlap:>10.3f}"
+            )
+
+
+# -------------------- per-model evaluation --------------------
+def evaluate_model(
+    entry: dict,
+    chunks: list[Document],
+    gold: list[QueryCase],
+    corpus_hash: str,
+    lexical: BM25Index | None,
+) -> list[dict[str, str]]:
+    tag = entry["tag"]
+    model_id = entry["model"]
+    print(f"[eval] Building embeddings: {tag} -> {model_id}")
+    emb = build_embeddings(entry)
+    fingerprint = index_fingerprint(corpus_hash, entry)
+
+    collection = f"eval_{tag}"
+    numpy_root = os.path.join(EVAL_CHROMA_DIR, f"numpy_{tag}")
+    vs = open_index(EVAL_CHROMA_DIR, collection, emb, fingerprint)
+    stores = open_numpy_indexes(numpy_root, fingerprint) if EVAL_QUANTIZATION else {}
+    if vs is None or stores is None:
+        vectors = emb.embed_documents([c.page_content for c in chunks])
+        if vs is None:
+            vs = rebuild_index(EVAL_CHROMA_DIR, collection, emb, chunks, vectors, fingerprint)
+        if stores is None:
+            stores = rebuild_numpy_indexes(numpy_root, chunks, vectors, fingerprint)
+    else:
+        print(f"[eval] Reusing persisted indexes [{tag}]")
+
+    qvecs = embed_questions(emb, [case.question for case in gold])
+
+    if EVAL_DUMP:
+        for case in gold:
+            dump_candidates(tag, vs, case.question, qvecs[case.question], EVAL_DUMP_K)
+
+    rows = [score_row(tag, model_id, gold, lambda q: retrieve_ids(vs, qvecs[q], TOP_K))]
+    if lexical is not None:
+        rows.append(
+            score_row(
+                f"{tag}+bm25",
+                model_id,
+                gold,
+                lambda q: hybrid_ids(vs, lexical, q, qvecs[q], TOP_K),
+            )
+        )
+    if stores:
+        rows.extend(quantization_rows(tag, model_id, gold, qvecs, stores))
+    if isinstance(emb, CachedEmbeddings):
+        print(f"[eval] Embedding cache [{tag}]: {emb.stats()}")
+    return rows
+
 
 # -------------------- main --------------------
 def main():
@@ -232,8 +540,8 @@ def main():
         raise ValueError("No models selected. Check INCLUDE_TAGS/MODELS.")
 
     print(f"[eval] RAW_DIR={RAW_DIR}  EVAL_CHROMA_DIR={EVAL_CHROMA_DIR}")
-    base_docs = load_pdfs_as_docs(RAW_DIR)
-    chunks = split_docs_with_chunk_ids(base_docs)
+    corpus_hash = corpus_fingerprint(RAW_DIR)
+    chunks = load_chunks(RAW_DIR, EVAL_CHROMA_DIR, corpus_hash)
 
     print("[eval] Example chunk_ids:")
     for d in chunks[:10]:
@@ -244,40 +552,23 @@ def main():
 
     results_rows: list[dict[str, str]] = []
 
-    for entry in selected:
-        tag = entry["tag"]
-        model_id = entry["model"]
-        print(f"\n[eval] Building embeddings: {tag} -> {model_id}")
-        emb = build_embeddings(entry)
-
-        collection = f"eval_{tag}"
-        vs = rebuild_index(EVAL_CHROMA_DIR, collection, emb, chunks)
-
-        if EVAL_DUMP:
-            for case in gold:
-                dump_candidates(tag, vs, case.question, EVAL_DUMP_K)
+    lexical = None
+    if EVAL_HYBRID:
+        lexical = rebuild_lexical_index(EVAL_CHROMA_DIR, chunks)
+        results_rows.append(
+            score_row("bm25", "sqlite-fts5", gold, lambda q: lexical_ids(lexical, q, TOP_K))
+        )
 
-        # Score metrics
-        recalls, mrrs, ndcgs = [], [], []
-        for case in gold:
-            ranked = retrieve_ids(vs, case.question, TOP_K)
-            recalls.append(recall_at_k(ranked, case.relevant_ids, TOP_K))
-            mrrs.append(mrr_at_k(ranked, case.relevant_ids, TOP_K))
-            ndcgs.append(ndcg_at_k(ranked, case.relevant_ids, TOP_K))
-
-        import statistics as st
-
-        row = {
-            "tag": tag,
-            "model_id": model_id,
-            "recall_at_k": f"{st.mean(recalls) if recalls else 0.0:.6f}",
-            "mrr_at_k": f"{st.mean(mrrs) if mrrs else 0.0:.6f}",
-            "ndcg_at_k": f"{st.mean(ndcgs) if ndcgs else 0.0:.6f}",
-            "k": str(TOP_K),
-            "chunk_size": str(CHUNK_SIZE),
-            "chunk_overlap": str(CHUNK_OVERLAP),
-        }
-        results_rows.append(row)
+    # Candidate dumps are per question: keep them readable with a single worker
+    workers = 1 if EVAL_DUMP else max(1, min(EVAL_WORKERS, len(selected)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="eval") as pool:
+        futures = [
+            pool.submit(evaluate_model, entry, chunks, gold, corpus_hash, lexical)
+            for entry in selected
+        ]
+        # Rows keep MODELS order regardless of which model finishes first
+        for future in futures:
+            results_rows.extend(future.result())
 
     # Print and save summary
     print_summary_table(results_rows)
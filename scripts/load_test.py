@@ -0,0 +1,242 @@
+"""
+Teste de carga: mix de requisições concorrentes em níveis crescentes de concorrência,
+com metas de SLO que fazem a execução falhar quando violadas.
+
+Alvo:
+  - padrão: a própria app em processo via `httpx.ASGITransport` (mesmo event loop do
+    cliente: qualquer bloqueio do loop aparece na latência de todos os endpoints)
+  - `--url http://localhost:8000`: um uvicorn já rodando
+
+Workload (pesos em WORKLOAD): /v1/rag/query só retrieval e com geração, upload para
+/v1/documents (PDF sintético com nome único, ingestão real no pool de jobs) e /v1/echo.
+O echo não faz trabalho nenhum: é o canário de event loop bloqueado.
+
+Para cada nível: throughput, p50/p95/p99 e taxa de erro por endpoint. SLOs vêm de
+DEFAULT_SLOS e de `--slo endpoint:métrica=limite` (ex.: `--slo rag_query:p95_ms=300`,
+`--slo "*:error_rate=0.02"`), checados em todos os níveis.
+
+Uso:
+    python scripts/load_test.py
+    python scripts/load_test.py --levels 1,8,32 --duration 10 --output load.json
+    python scripts/load_test.py --url http://localhost:8000 --slo echo:p99_ms=20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from pathlib import Path
+
+import httpx
+from synthetic_corpus import make_pdf
+
+# ===================== USER CONFIG =====================
+LEVELS = [1, 4, 16, 64]
+DURATION_S = 5.0  # por nível
+WORKLOAD = {  # endpoint -> peso
+    "rag_query": 55,
+    "rag_generate": 20,
+    "documents_upload": 5,
+    "echo": 20,
+}
+UPLOAD_PAGES = 3
+# endpoint -> {métrica: limite}; "*" vale para todos
+DEFAULT_SLOS: dict[str, dict[str, float]] = {
+    "*": {"error_rate": 0.01},
+    "echo": {"p99_ms": 50.0},
+    "rag_query": {"p95_ms": 250.0},
+    "rag_generate": {"p95_ms": 500.0},
+    "documents_upload": {"p95_ms": 500.0},
+}
+SEED = 42
+# =======================================================
+
+QUESTIONS = [
+    "Qual a multa por rescisão do contrato?",
+    "Como funciona o backup dos servidores?",
+    "Quais benefícios entram na folha?",
+    "Qual o prazo de entrega do fornecedor?",
+    "Resuma o documento",
+]
+
+
+def synthetic_pdf_bytes() -> bytes:
+    path = Path(tempfile.mkdtemp(prefix="load_pdf_")) / "upload.pdf"
+    make_pdf(path, UPLOAD_PAGES, "contratos", random.Random(SEED))
+    return path.read_bytes()
+
+
+async def call(client: httpx.AsyncClient, endpoint: str, rng: random.Random, pdf: bytes):
+    if endpoint == "echo":
+        return await client.post("/v1/echo", json={"question": "ping"})
+    if endpoint in {"rag_query", "rag_generate"}:
+        body = {
+            "question": rng.choice(QUESTIONS),
+            "generate": endpoint == "rag_generate",
+            "k": 4,
+        }
+        return await client.post("/v1/rag/query", json=body)
+    if endpoint == "documents_upload":
+        files = {"file": (f"load_{uuid.uuid4().hex[:12]}.pdf", pdf, "application/pdf")}
+        return await client.post("/v1/documents", files=files)
+    raise ValueError(endpoint)
+
+
+async def run_level(
+    client: httpx.AsyncClient, concurrency: int, duration: float, pdf: bytes
+) -> dict[str, dict]:
+    names, weights = list(WORKLOAD), list(WORKLOAD.values())
+    samples: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + duration
+
+    async def worker(i: int) -> None:
+        rng = random.Random(SEED * 1000 + i)
+        while time.perf_counter() < deadline:
+            endpoint = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                resp = await call(client, endpoint, rng, pdf)
+                ok = resp.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            samples[endpoint].append(time.perf_counter() - t0)
+            if not ok:
+                errors[endpoint] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {name: summarize(lat, errors[name], elapsed) for name, lat in samples.items()}
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    ordered = sorted(latencies)
+
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000
+
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "error_rate": errors / len(latencies),
+    }
+
+
+def parse_slos(specs: list[str]) -> dict[str, dict[str, float]]:
+    slos = {name: dict(limits) for name, limits in DEFAULT_SLOS.items()}
+    for spec in specs:
+        endpoint, _, rule = spec.partition(":")
+        metric, _, limit = rule.partition("=")
+        if not (endpoint and metric and limit):
+            raise SystemExit(f"SLO inválido: {spec!r} (esperado endpoint:métrica=limite)")
+        slos.setdefault(endpoint, {})[metric] = float(limit)
+    return slos
+
+
+def check_slos(results: dict[int, dict[str, dict]], slos: dict[str, dict[str, float]]) -> list[str]:
+    breaches = []
+    for level, stats in results.items():
+        for endpoint, s in stats.items():
+            limits = {**slos.get("*", {}), **slos.get(endpoint, {})}
+            for metric, limit in limits.items():
+                if metric in s and s[metric] > limit:
+                    breaches.append(
+                        f"concurrency={level} {endpoint}.{metric}={s[metric]:.3f} > {limit}"
+                    )
+    return breaches
+
+
+def print_level(concurrency: int, stats: dict[str, dict]) -> None:
+    print(f"\n[load] concurrency={concurrency}")
+    print(
+        f"{'endpoint':>18} {'req':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} "
+        f"{'p99 ms':>8} {'err':>6}"
+    )
+    for name, s in sorted(stats.items()):
+        print(
+            f"{name:>18} {s['requests']:>7} {s['rps']:>8.1f} {s['p50_ms']:>8.1f} "
+            f"{s['p95_ms']:>8.1f} {s['p99_ms']:>8.1f} {s['error_rate']:>6.1%}"
+        )
+
+
+def hermetic_env(workdir: Path) -> None:
+    """Providers fake e diretórios temporários para a app em processo."""
+    defaults = {
+        "EMBEDDINGS_PROVIDER": "fake",
+        "LLM_PROVIDER": "fake",
+        "LANGCHAIN_TRACING_V2": "false",
+        "CHROMA_DIR": str(workdir / "chroma"),
+        "NUMPY_STORE_DIR": str(workdir / "numpy"),
+        "RAW_DIR": str(workdir / "raw"),
+        "EMBEDDINGS_CACHE_PATH": str(workdir / "embeddings.sqlite"),
+    }
+    for key, value in defaults.items():
+        os.environ.setdefault(key, value)
+
+
+async def drive(args: argparse.Namespace, pdf: bytes) -> dict[int, dict[str, dict]]:
+    results: dict[int, dict[str, dict]] = {}
+    limits = httpx.Limits(max_connections=max(args.levels) * 2)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+            for level in args.levels:
+                results[level] = await run_level(client, level, args.duration, pdf)
+                print_level(level, results[level])
+        return results
+
+    hermetic_env(Path(tempfile.mkdtemp(prefix="load_test_")))
+    # Import tardio: app.main monta uma app no import e o Settings lê o ambiente acima
+    from app.main import create_app
+
+    app = create_app()
+    transport = httpx.ASGITransport(app=app)
+    # ASGITransport não dispara o lifespan: warm-up/shutdown rodam aqui
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://load", timeout=60) as c,
+    ):
+        for level in args.levels:
+            results[level] = await run_level(c, level, args.duration, pdf)
+            print_level(level, results[level])
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Teste de carga com SLOs.")
+    parser.add_argument("--url", help="servidor já rodando (padrão: app em processo)")
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=LEVELS)
+    parser.add_argument("--duration", type=float, default=DURATION_S)
+    parser.add_argument("--slo", action="append", default=[], help="endpoint:métrica=limite")
+    parser.add_argument("--output", help="grava os resultados em JSON")
+    args = parser.parse_args()
+
+    slos = parse_slos(args.slo)
+    results = asyncio.run(drive(args, synthetic_pdf_bytes()))
+    breaches = check_slos(results, slos)
+
+    if args.output:
+        out = {
+            "levels": {str(k): v for k, v in results.items()},
+            "slos": slos,
+            "breaches": breaches,
+        }
+        Path(args.output).write_text(json.dumps(out, indent=2))
+    if breaches:
+        print("\n[slo] VIOLADO:\n  " + "\n  ".join(breaches))
+        sys.exit(1)
+    print("\n[slo] ok")
+
+
+if __name__ == "__main__":
+    main()
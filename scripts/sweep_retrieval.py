@@ -0,0 +1,297 @@
+"""
+Varredura de parâmetros de retrieval: grade de chunking (tamanho, overlap) x busca
+(search_type, k) por modelo de embeddings, com qualidade e custo lado a lado.
+
+  - os PDFs são parseados uma vez; cada (chunk_size, chunk_overlap) re-fatia as mesmas
+    páginas e monta o seu índice (NumpyVectorStore, sem re-embedar nada no caminho)
+  - embeddings por texto: chunks idênticos entre configurações (páginas curtas que
+    cabem num chunk, tamanhos próximos) saem do pool do modelo sem nova chamada
+  - a relevância não depende do chunking: os ids do gold (chunking de referência do
+    eval_retrieval.py) viram trechos (doc, página, início, fim) e um chunk de outra
+    configuração é relevante quando cobre metade do trecho ou metade de si mesmo
+  - por célula: recall/MRR/nDCG@k, latência da busca (p50/p95, com o vetor da pergunta
+    já calculado), nº de chunks e bytes do índice
+
+Saída: CSV em data/eval/reports/sweep_<ts>.csv e uma tabela por modelo ordenada por
+nDCG, com `*` nas células da fronteira de Pareto (nenhuma outra tem nDCG maior ou igual
+com latência p95 e índice menores ou iguais). Os modelos rodam em sequência: em paralelo
+um contaminaria a latência do outro.
+
+Uso:
+    python scripts/sweep_retrieval.py
+"""
+
+import csv
+import datetime
+import os
+import shutil
+import statistics
+import time
+
+from eval_retrieval import (
+    CHUNK_OVERLAP,
+    CHUNK_SIZE,
+    GOLD_PATH,
+    INCLUDE_TAGS,
+    MODELS,
+    RAW_DIR,
+    QueryCase,
+    build_embeddings,
+    embed_questions,
+    load_gold_csv,
+    load_pdfs_as_docs,
+    mrr_at_k,
+    ndcg_at_k,
+    recall_at_k,
+    split_docs_with_chunk_ids,
+)
+from langchain_core.documents import Document
+
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore
+
+# ===================== USER CONFIG =====================
+SWEEP_CHUNK_SIZES = [500, 1000, 1500]
+SWEEP_CHUNK_OVERLAPS = [0, 150]
+SWEEP_SEARCH_TYPES = ["similarity", "mmr"]
+SWEEP_K = [3, 5, 10]
+SWEEP_QUANTIZATION = "none"  # none | int8 | binary
+LATENCY_REPEATS = 3  # buscas cronometradas por pergunta e célula
+SWEEP_DIR = ".sweep_eval"
+MIN_SPAN_OVERLAP = 0.5  # fração do menor trecho (gold ou chunk) que precisa coincidir
+# =======================================================
+
+Span = tuple[str, int, int, int]  # (doc_id, página, início, fim)
+
+
+# -------------------- relevância independente do chunking --------------------
+def chunk_span(chunk: Document) -> Span | None:
+    meta = chunk.metadata or {}
+    start = meta.get("start_index", -1)
+    if start < 0:
+        return None
+    return (meta.get("doc_id", ""), meta.get("page", 0), start, start + len(chunk.page_content))
+
+
+def gold_spans(reference: list[Document], gold: list[QueryCase]) -> dict[str, Span]:
+    """Trecho de cada chunk_id citado no gold, pelo chunking de referência."""
+    spans = {c.metadata["chunk_id"]: chunk_span(c) for c in reference}
+    wanted = set().union(*(case.relevant_ids for case in gold))
+    missing = sorted(cid for cid in wanted if spans.get(cid) is None)
+    if missing:
+        print(f"[sweep] {len(missing)} gold ids sem trecho (ignorados): {missing[:5]}")
+    return {cid: spans[cid] for cid in wanted if spans.get(cid) is not None}
+
+
+def overlaps(a: Span, b: Span) -> bool:
+    if a[:2] != b[:2]:
+        return False
+    common = min(a[3], b[3]) - max(a[2], b[2])
+    return common > 0 and common >= MIN_SPAN_OVERLAP * min(a[3] - a[2], b[3] - b[2])
+
+
+def relevant_ids(docs: list[Document], targets: list[Span]) -> set[str]:
+    out = set()
+    for d in docs:
+        span = chunk_span(d)
+        if span is not None and any(overlaps(span, t) for t in targets):
+            out.add(d.metadata["chunk_id"])
+    return out
+
+
+# -------------------- índice por configuração de chunking --------------------
+def embed_chunks(
+    embeddings, chunks: list[Document], pool: dict[str, list[float]]
+) -> tuple[list[list[float]], int]:
+    """Vetores dos chunks; só textos ainda fora do pool vão ao modelo (um lote)."""
+    missing = list(dict.fromkeys(c.page_content for c in chunks if c.page_content not in pool))
+    if missing:
+        pool.update(zip(missing, embeddings.embed_documents(missing), strict=True))
+    return [pool[c.page_content] for c in chunks], len(missing)
+
+
+def build_store(
+    root: str, name: str, chunks: list[Document], vectors: list[list[float]]
+) -> NumpyVectorStore:
+    store = NumpyVectorStore(root, name, quantization=SWEEP_QUANTIZATION)
+    store.add_embeddings(
+        vectors,
+        [c.page_content for c in chunks],
+        [dict(c.metadata) for c in chunks],
+        [c.metadata["chunk_id"] for c in chunks],
+    )
+    return store
+
+
+def search(
+    store: NumpyVectorStore, search_type: str, vector: list[float], k: int
+) -> list[Document]:
+    if search_type == "mmr":
+        return store.mmr_search_by_vector(vector, k)
+    return store.similarity_search_by_vectors([vector], k)[0]
+
+
+# -------------------- células --------------------
+def score_cell(
+    store: NumpyVectorStore,
+    search_type: str,
+    k: int,
+    gold: list[QueryCase],
+    qvecs: dict[str, list[float]],
+    spans: dict[str, Span],
+) -> dict[str, float]:
+    recalls, mrrs, ndcgs, latencies = [], [], [], []
+    for case in gold:
+        vector = qvecs[case.question]
+        docs: list[Document] = []
+        for _ in range(max(1, LATENCY_REPEATS)):
+            t0 = time.perf_counter()
+            docs = search(store, search_type, vector, k)
+            latencies.append(time.perf_counter() - t0)
+        ranked = [d.metadata["chunk_id"] for d in docs]
+        targets = [spans[cid] for cid in case.relevant_ids if cid in spans]
+        relevant = relevant_ids(docs, targets)
+        recalls.append(recall_at_k(ranked, relevant, k))
+        mrrs.append(mrr_at_k(ranked, relevant, k))
+        ndcgs.append(ndcg_at_k(ranked, relevant, k))
+    ordered = sorted(latencies)
+    return {
+        "recall_at_k": statistics.mean(recalls),
+        "mrr_at_k": statistics.mean(mrrs),
+        "ndcg_at_k": statistics.mean(ndcgs),
+        "p50_ms": statistics.median(ordered) * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] * 1000,
+    }
+
+
+def sweep_model(
+    entry: dict,
+    pages: list[Document],
+    gold: list[QueryCase],
+    spans: dict[str, Span],
+) -> list[dict]:
+    tag, model_id = entry["tag"], entry["model"]
+    print(f"\n[sweep] {tag} -> {model_id}")
+    emb = build_embeddings(entry)
+    qvecs = embed_questions(emb, [case.question for case in gold])
+    root = os.path.join(SWEEP_DIR, tag)
+    shutil.rmtree(root, ignore_errors=True)
+
+    pool: dict[str, list[float]] = {}
+    rows = []
+    for size in SWEEP_CHUNK_SIZES:
+        for overlap in SWEEP_CHUNK_OVERLAPS:
+            if overlap >= size:
+                continue
+            chunks = split_docs_with_chunk_ids(pages, size, overlap)
+            t0 = time.perf_counter()
+            vectors, embedded = embed_chunks(emb, chunks, pool)
+            embed_s = time.perf_counter() - t0
+            store = build_store(root, f"c{size}_o{overlap}", chunks, vectors)
+            index_bytes = store.stats()["index_bytes"]
+            print(
+                f"[sweep] {tag} chunk={size}/{overlap}: {len(chunks)} chunks, "
+                f"{embedded} embedded ({len(chunks) - embedded} reused) in {embed_s:.1f}s"
+            )
+            for search_type in SWEEP_SEARCH_TYPES:
+                for k in SWEEP_K:
+                    cell = score_cell(store, search_type, k, gold, qvecs, spans)
+                    rows.append(
+                        {
+                            "tag": tag,
+                            "model_id": model_id,
+                            "chunk_size": size,
+                            "chunk_overlap": overlap,
+                            "search_type": search_type,
+                            "k": k,
+                            "chunks": len(chunks),
+                            "chunks_embedded": embedded,
+                            "index_bytes": index_bytes,
+                            **cell,
+                        }
+                    )
+    mark_pareto(rows)
+    return rows
+
+
+def mark_pareto(rows: list[dict]) -> None:
+    """`pareto`: nenhuma outra célula é tão boa em nDCG, p95 e bytes e melhor em algum deles."""
+    keys = [(r["ndcg_at_k"], -r["p95_ms"], -r["index_bytes"]) for r in rows]
+    for r, a in zip(rows, keys, strict=True):
+        r["pareto"] = not any(
+            all(x >= y for x, y in zip(b, a, strict=True)) and b != a for b in keys
+        )
+
+
+# -------------------- saída --------------------
+FIELDS = [
+    "tag",
+    "model_id",
+    "chunk_size",
+    "chunk_overlap",
+    "search_type",
+    "k",
+    "recall_at_k",
+    "mrr_at_k",
+    "ndcg_at_k",
+    "p50_ms",
+    "p95_ms",
+    "chunks",
+    "chunks_embedded",
+    "index_bytes",
+    "pareto",
+]
+
+
+def write_csv(path: str, rows: list[dict]) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.DictWriter(f, fieldnames=FIELDS, extrasaction="ignore")
+        w.writeheader()
+        for r in rows:
+            w.writerow({k: f"{v:.6f}" if isinstance(v, float) else v for k, v in r.items()})
+
+
+def print_matrix(rows: list[dict]) -> None:
+    for tag in dict.fromkeys(r["tag"] for r in rows):
+        cells = sorted(
+            (r for r in rows if r["tag"] == tag), key=lambda r: (-r["ndcg_at_k"], r["p95_ms"])
+        )
+        print(f"\n=== {tag}: qualidade x custo (* = fronteira de Pareto) ===")
+        print(
+            f"  {'chunk':>9} {'search':>10} {'k':>3} {'Recall':>7} {'MRR':>7} {'nDCG':>7} "
+            f"{'p50 ms':>8} {'p95 ms':>8} {'chunks':>7} {'index KB':>9}"
+        )
+        for r in cells:
+            chunk = f"{r['chunk_size']}/{r['chunk_overlap']}"
+            print(
+                f"{'*' if r['pareto'] else ' '} {chunk:>9} {r['search_type']:>10} {r['k']:>3} "
+                f"{r['recall_at_k']:>7.3f} {r['mrr_at_k']:>7.3f} {r['ndcg_at_k']:>7.3f} "
+                f"{r['p50_ms']:>8.3f} {r['p95_ms']:>8.3f} {r['chunks']:>7} "
+                f"{r['index_bytes'] / 1024:>9.1f}"
+            )
+
+
+def main() -> None:
+    selected = [m for m in MODELS if not INCLUDE_TAGS or m["tag"] in INCLUDE_TAGS]
+    if not selected:
+        raise ValueError("No models selected. Check INCLUDE_TAGS/MODELS.")
+
+    pages = load_pdfs_as_docs(RAW_DIR)
+    gold = load_gold_csv(GOLD_PATH)
+    reference = split_docs_with_chunk_ids(pages, CHUNK_SIZE, CHUNK_OVERLAP)
+    spans = gold_spans(reference, gold)
+    print(f"[sweep] {len(pages)} páginas, {len(gold)} perguntas, {len(spans)} trechos gold")
+
+    rows: list[dict] = []
+    for entry in selected:
+        rows.extend(sweep_model(entry, pages, gold, spans))
+
+    print_matrix(rows)
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_csv = f"data/eval/reports/sweep_{ts}.csv"
+    write_csv(out_csv, rows)
+    print(f"\n[sweep] Saved matrix CSV -> {out_csv}")
+
+
+if __name__ == "__main__":
+    main()
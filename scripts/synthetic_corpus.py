@@ -0,0 +1,139 @@
+"""
+Gera um corpus sintético de PDFs com várias páginas (PyMuPDF), determinístico pela seed.
+
+Cada documento tem um tema; as frases misturam termos do tema com vocabulário comum,
+então buscas por termos do tema têm resposta "certa" sem depender de texto real.
+
+Uso:
+    python scripts/synthetic_corpus.py data/bench              # 20 docs x 25 páginas
+    python scripts/synthetic_corpus.py data/bench 100 50 7     # docs, páginas, seed
+"""
+
+import random
+import sys
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+# ===================== USER CONFIG =====================
+DOCS = 20
+PAGES_PER_DOC = 25
+WORDS_PER_PAGE = 380  # ~2.500 caracteres: 2-3 chunks por página com o splitter padrão
+SEED = 42
+# =======================================================
+
+TOPICS = {
+    "contratos": ["locação", "rescisão", "multa", "fiador", "aluguel", "reajuste", "vigência"],
+    "saude": ["paciente", "diagnóstico", "exame", "prontuário", "tratamento", "alergia"],
+    "financas": ["orçamento", "balanço", "receita", "despesa", "auditoria", "tributo"],
+    "ti": ["servidor", "latência", "backup", "deploy", "incidente", "monitoramento"],
+    "rh": ["férias", "admissão", "benefício", "folha", "treinamento", "avaliação"],
+    "logistica": ["estoque", "frete", "entrega", "armazém", "pedido", "fornecedor"],
+}
+NOUNS = [
+    "processo",
+    "cliente",
+    "prazo",
+    "documento",
+    "equipe",
+    "relatório",
+    "política",
+    "norma",
+    "área",
+    "sistema",
+    "informação",
+    "registro",
+    "análise",
+    "controle",
+    "resultado",
+    "responsável",
+    "procedimento",
+    "etapa",
+]
+COMMON = [
+    "o",
+    "a",
+    "de",
+    "do",
+    "da",
+    "que",
+    "em",
+    "para",
+    "com",
+    "por",
+    "uma",
+    "um",
+    "os",
+    "as",
+    "se",
+    "no",
+    "na",
+    "mais",
+    "como",
+    "ao",
+    *NOUNS,
+]
+
+
+def topic_of(doc_index: int) -> str:
+    return list(TOPICS)[doc_index % len(TOPICS)]
+
+
+def page_text(rng: random.Random, topic: str, words: int) -> str:
+    terms = TOPICS[topic]
+    sentences, count = [], 0
+    while count < words:
+        n = rng.randint(8, 18)
+        picked = [rng.choice(terms if rng.random() < 0.2 else COMMON) for _ in range(n)]
+        sentences.append(" ".join(picked).capitalize() + ".")
+        count += n
+    return " ".join(sentences)
+
+
+def make_pdf(path: Path, pages: int, topic: str, rng: random.Random) -> None:
+    doc = fitz.open()
+    for p in range(pages):
+        page = doc.new_page()
+        body = f"{topic.upper()} - página {p + 1}\n\n" + page_text(rng, topic, WORDS_PER_PAGE)
+        page.insert_textbox(page.rect + (48, 48, -48, -48), body, fontsize=9)
+    doc.save(path)
+    doc.close()
+
+
+def make_corpus(
+    directory: str | Path, docs: int = DOCS, pages: int = PAGES_PER_DOC, seed: int = SEED
+) -> list[Path]:
+    """Cria `docs` PDFs de `pages` páginas em `directory` e devolve os caminhos."""
+    out = Path(directory)
+    out.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(docs):
+        path = out / f"synthetic_{i:04d}_{topic_of(i)}.pdf"
+        make_pdf(path, pages, topic_of(i), rng)
+        paths.append(path)
+    return paths
+
+
+def sample_questions(n: int, seed: int = SEED) -> list[str]:
+    """Perguntas com termos dos temas do corpus (determinísticas pela seed)."""
+    rng = random.Random(seed + 1)
+    out = []
+    for _ in range(n):
+        topic = rng.choice(list(TOPICS))
+        terms = rng.sample(TOPICS[topic], 2)
+        out.append(f"Qual o {rng.choice(NOUNS)} sobre {terms[0]} e {terms[1]}?")
+    return out
+
+
+def main() -> None:
+    directory = sys.argv[1] if len(sys.argv) > 1 else "data/bench"
+    docs = int(sys.argv[2]) if len(sys.argv) > 2 else DOCS
+    pages = int(sys.argv[3]) if len(sys.argv) > 3 else PAGES_PER_DOC
+    seed = int(sys.argv[4]) if len(sys.argv) > 4 else SEED
+    paths = make_corpus(directory, docs, pages, seed)
+    print(f"[corpus] {len(paths)} PDFs x {pages} páginas -> {directory}")
+
+
+if __name__ == "__main__":
+    main()
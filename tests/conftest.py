@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.fixture
+def wait_for_job():
+    """Faz polling em GET /v1/jobs/{id} até o job terminar (ingestão é assíncrona)."""
+
+    async def _wait(ac: AsyncClient, job_id: str, timeout: float = 60.0) -> dict:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            resp = await ac.get(f"/v1/jobs/{job_id}")
+            assert resp.status_code == 200, resp.text
+            data = resp.json()
+            if data["status"] in {"succeeded", "failed"}:
+                return data
+            assert loop.time() < deadline, f"job {job_id} não terminou: {data}"
+            await asyncio.sleep(0.05)
+
+    return _wait
@@ -0,0 +1,157 @@
+from pathlib import Path
+
+import fitz  # PyMuPDF
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import create_app
+from app.settings import Settings
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.manifest.ingest_manifest import IngestManifest
+from use_cases.bulk_ingest import BulkIngestUseCase
+from use_cases.ingest_documents import source_key
+
+
+class _RecordingStore:
+    def __init__(self) -> None:
+        self.batches: list[int] = []
+
+    def add_documents(self, documents, ids=None) -> int:
+        self.batches.append(len(documents))
+        return len(documents)
+
+    def delete(self, ids: list[str]) -> int:
+        return len(ids)
+
+
+def _make_pdfs(directory: Path, n: int) -> None:
+    directory.mkdir(parents=True, exist_ok=True)
+    for i in range(n):
+        doc = fitz.open()
+        doc.new_page().insert_text((72, 72), f"bulk file {i}")
+        doc.save(directory / f"f{i}.pdf")
+        doc.close()
+
+
+def test_bulk_ingest_groups_chunks_across_files(tmp_path: Path):
+    _make_pdfs(tmp_path / "nested", 5)
+    store = _RecordingStore()
+    uc = BulkIngestUseCase(
+        settings=Settings(bulk_embed_batch_size=2, bulk_embed_concurrency=2), store=store
+    )
+
+    report = uc.execute(tmp_path)
+
+    assert report.files == 5
+    assert report.vectors == report.chunks == sum(store.batches) == 5
+    assert store.batches == [2, 2, 1]
+    assert set(report.throughput) == {"files_per_s", "chunks_per_s", "vectors_per_s"}
+
+
+class _FlakyStore(_RecordingStore):
+    """Recusa lotes com o texto `poison` (ex.: backend de embeddings fora do ar)."""
+
+    def __init__(self, poison: str) -> None:
+        super().__init__()
+        self.poison = poison
+
+    def add_documents(self, documents, ids=None) -> int:
+        if any(self.poison in d.page_content for d in documents):
+            raise RuntimeError("embeddings indisponíveis")
+        return super().add_documents(documents, ids)
+
+
+def test_bulk_ingest_isolates_failed_files(tmp_path: Path):
+    docs = tmp_path / "docs"
+    _make_pdfs(docs, 4)
+    (docs / "corrupt.pdf").write_bytes(b"%PDF-1.4 isto nao e um pdf")
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite"), collection="t")
+    cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+    uc = BulkIngestUseCase(
+        settings=Settings(bulk_embed_batch_size=1, bulk_embed_concurrency=2),
+        store=_FlakyStore(poison="bulk file 2"),
+        retrieval_cache=cache,
+        manifest=manifest,
+    )
+
+    report = uc.execute(docs)
+
+    assert {(Path(f["file"]).name, f["stage"]) for f in report.failures} == {
+        ("corrupt.pdf", "parse"),
+        ("f2.pdf", "embed"),
+    }
+    assert report.files_failed == 2
+    assert "embeddings indisponíveis" in report.as_dict()["failures"][-1]["error"]
+    assert report.vectors == 3
+    assert cache.epoch == 1  # gravou algo: o cache não serve o índice antigo
+    # Só os arquivos gravados por inteiro entram no manifesto: o retry refaz os outros
+    committed = {p.name for p in docs.iterdir() if manifest.file_hash(source_key(p))}
+    assert committed == {"f0.pdf", "f1.pdf", "f3.pdf"}
+
+    uc.store = _RecordingStore()
+    retry = uc.execute(docs)
+    assert retry.files_skipped == 3
+    assert [Path(f["file"]).name for f in retry.failures] == ["corrupt.pdf"]
+    assert retry.vectors == 1
+
+
+class _Crash(BaseException):
+    """Interrupção que não é um erro de arquivo (processo morto, cancelamento)."""
+
+
+class _CrashingStore(_RecordingStore):
+    def add_documents(self, documents, ids=None) -> int:
+        if len(self.batches) == 2:
+            self.batches.append(0)
+            raise _Crash
+        return super().add_documents(documents, ids)
+
+
+def test_interrupted_bulk_ingest_resumes_per_file(tmp_path: Path):
+    _make_pdfs(tmp_path / "docs", 5)
+    manifest = IngestManifest(str(tmp_path / "manifest.sqlite"), collection="t")
+    cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+    uc = BulkIngestUseCase(
+        settings=Settings(bulk_embed_batch_size=1, bulk_embed_concurrency=1),
+        store=_CrashingStore(),
+        retrieval_cache=cache,
+        manifest=manifest,
+    )
+
+    with pytest.raises(_Crash):
+        uc.execute(tmp_path / "docs")
+    assert cache.epoch == 1  # vetores gravados antes da interrupção invalidam o cache
+
+    # Cada arquivo gravado por inteiro já está no manifesto: só o interrompido é refeito
+    uc.store = _RecordingStore()
+    retry = uc.execute(tmp_path / "docs")
+    assert retry.files_skipped == 4
+    assert retry.vectors == 1
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_rejects_paths_outside_raw_dir():
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/v1/documents/bulk", json={"directory": "../.."})
+    assert resp.status_code == 400
+
+
+def test_scan_ignores_files_outside_directory(tmp_path: Path):
+    _make_pdfs(tmp_path / "inner", 1)
+    _make_pdfs(tmp_path, 1)
+    inner = tmp_path / "inner"
+    assert BulkIngestUseCase.scan(inner) == [inner / "f0.pdf"]
+    assert BulkIngestUseCase.scan(inner, "../*.pdf") == []
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("pattern", ["../*.pdf", "/etc/*.pdf", "sub/*.pdf", "..\\*.pdf"])
+async def test_bulk_endpoint_rejects_patterns_outside_raw_dir(pattern: str):
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/v1/documents/bulk", json={"pattern": pattern})
+    assert resp.status_code == 400
+    assert "Padrão" in resp.json()["detail"]
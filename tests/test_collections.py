@@ -0,0 +1,151 @@
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from langchain_core.documents import Document
+
+from app.container import build_app_state
+from app.main import create_app
+from app.settings import Settings
+from infrastructure.cache.collection_pool import CollectionPool, UnknownCollectionError
+from infrastructure.cache.retrieval_cache import RetrievalCache
+
+
+def test_pool_is_lru_bounded_and_opens_once():
+    opened: list[str] = []
+
+    def factory(name: str) -> dict:
+        opened.append(name)
+        time.sleep(0.01)
+        return {"name": name}
+
+    pool = CollectionPool(factory, max_open=2, pinned={"default": {"name": "default"}})
+    threads = [threading.Thread(target=pool.get, args=("a",)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert opened == ["a"]  # aberturas concorrentes esperam a primeira
+
+    pool.get("b")
+    pool.get("a")  # "b" vira o menos recente
+    pool.get("c")
+    assert pool.get_open("b") is None
+    assert pool.get_open("a") is not None
+    assert pool.get("default") == {"name": "default"}  # fixa, fora do limite
+
+    stats = pool.stats()
+    assert stats["open"] == 2
+    assert stats["evictions"] == 1
+    assert stats["collections"]["a"]["requests"] == 10
+    assert stats["collections"]["b"]["open"] is False
+
+
+def test_leased_collections_are_not_evicted():
+    opened: list[str] = []
+
+    def factory(name: str) -> dict:
+        opened.append(name)
+        return {"name": name}
+
+    pool = CollectionPool(factory, max_open=1, exists=lambda name: name != "novo")
+    writing = pool.get("a", lease=True)  # job de ingestão em andamento
+    pool.get("b")
+    assert pool.get_open("a") is writing  # com lease: o pool passa do limite
+    assert pool.get_open("b") is None  # e quem sai é a ociosa
+    assert pool.stats()["leased"] == 1
+
+    pool.release("a")
+    pool.get("c")
+    assert pool.get_open("a") is None  # sem lease, volta a valer o LRU
+    assert pool.stats()["leased"] == 0
+
+    with pytest.raises(UnknownCollectionError):
+        pool.get("novo", create=False)
+    assert pool.get("novo") == {"name": "novo"}  # create=True (ingestão) abre
+    assert opened == ["a", "b", "c", "novo"]
+
+
+def test_retrieval_cache_epoch_is_per_namespace():
+    cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+    a, b = cache.for_namespace("a"), cache.for_namespace("b")
+    a.put(a.key("q", 1, "mmr"), ["from a"])
+    b.put(b.key("q", 1, "mmr"), ["from b"])
+    assert a.get(a.key("q", 1, "mmr")) == ["from a"]
+
+    a.bump_epoch()  # ingestão no tenant "a" não derruba o cache do "b"
+    assert a.get(a.key("q", 1, "mmr")) is None
+    assert b.get(b.key("q", 1, "mmr")) == ["from b"]
+    assert cache.stats()["hits"] == 2  # a raiz soma as visões
+
+
+def test_collections_are_isolated(tmp_path: Path):
+    settings = Settings(
+        vector_store_provider="numpy",
+        numpy_store_dir=str(tmp_path / "numpy"),
+        chroma_dir=str(tmp_path / "chroma"),
+        embeddings_provider="fake",
+        embeddings_cache_enabled=False,
+        llm_provider="fake",
+        collection_pool_size=4,
+    )
+    state = build_app_state(settings)
+    try:
+        with pytest.raises(UnknownCollectionError):
+            state.collection("tenant_a")  # leitura não provisiona
+        tenant = state.collection("tenant_a", create=True)
+        assert state.collection("tenant_a") is tenant
+        assert state.collection() is state.collection(settings.chroma_collection)
+        assert tenant.store is not state.store
+
+        tenant.store.add_documents([Document(page_content="só do tenant a")], ids=["x"])
+        assert tenant.query_rag.execute("tenant", k=1, search_type="similarity")["hits"]
+        assert not state.query_rag.execute("tenant", k=1, search_type="similarity")["hits"]
+        assert state.collections.stats()["collections"]["tenant_a"]["opens"] == 1
+    finally:
+        state.shutdown()
+
+
+def _tenant_settings(tmp_path: Path) -> Settings:
+    return Settings(
+        vector_store_provider="numpy",
+        numpy_store_dir=str(tmp_path / "numpy"),
+        chroma_dir=str(tmp_path / "chroma"),
+        embeddings_provider="fake",
+        embeddings_cache_enabled=False,
+        llm_provider="fake",
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_on_unknown_collection_are_404_and_create_nothing(tmp_path: Path):
+    settings = _tenant_settings(tmp_path)
+    app = create_app()
+    app.state.container.shutdown()
+    app.state.container = state = build_app_state(settings)
+    before = sorted(p.name for p in tmp_path.rglob("*"))
+    query = {"question": "q", "generate": False, "collection": "tenant_x"}
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            assert (await ac.post("/v1/rag/query", json=query)).status_code == 404
+            resp = await ac.get("/v1/documents", params={"collection": "tenant_x"})
+            assert resp.status_code == 404
+        assert sorted(p.name for p in tmp_path.rglob("*")) == before
+        assert "tenant_x" not in state.collections.stats()["collections"]
+
+        tenant = state.collection("tenant_x", create=True)  # o que a ingestão faz
+        tenant.store.add_documents([Document(page_content="ingerido")], ids=["x"])
+    finally:
+        state.shutdown()
+
+    # Outro processo (pool vazio): a coleção agora existe no disco
+    app.state.container = state = build_app_state(settings)
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            resp = await ac.post("/v1/rag/query", json=query)
+        assert resp.status_code == 200
+        assert resp.json()["hits"][0]["content"] == "ingerido"
+    finally:
+        state.shutdown()
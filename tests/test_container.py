@@ -0,0 +1,49 @@
+from langchain_core.documents import Document
+
+from app.main import create_app
+from app.settings import Settings
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _StubRetriever:
+    def __init__(self, k: int) -> None:
+        self.k = k
+
+    def invoke(self, question: str) -> list[Document]:
+        return [Document(page_content=f"{question} #{i}", metadata={}) for i in range(self.k)]
+
+
+class _StubStore:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, int]] = []
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, **_) -> _StubRetriever:
+        self.calls.append((search_type, k))
+        return _StubRetriever(k)
+
+
+class _StubLLM:
+    def generate(self, question, context_snippets=None) -> str:
+        return "stub"
+
+
+def test_container_is_built_once_per_app():
+    app = create_app()
+    container = app.state.container
+    assert container.query_rag.store is container.store
+    assert container.ingest_documents.store is container.store
+    assert container.query_rag.llm is container.llm
+
+
+def test_query_overrides_do_not_mutate_settings():
+    settings = Settings(retriever_k=5, retriever_search_type="mmr")
+    store = _StubStore()
+    uc = QueryRAGUseCase(settings=settings, store=store, llm=_StubLLM())
+
+    out = uc.execute("q", k=2, search_type="similarity")
+    assert len(out["hits"]) == 2
+    assert settings.retriever_k == 5
+    assert settings.retriever_search_type == "mmr"
+
+    uc.execute("q")
+    assert store.calls == [("similarity", 2), ("mmr", 5)]
@@ -0,0 +1,46 @@
+from domain.services.context_packer import estimate_tokens, pack_context
+
+TEXT = "".join(f"frase {i:03d} do documento. " for i in range(200))  # página "original"
+
+
+def _chunk(start: int, end: int, page: int = 0, **meta) -> tuple[str, dict]:
+    return TEXT[start:end], {"source": "a.pdf", "page": page, "start_index": start, **meta}
+
+
+def test_overlapping_and_adjacent_chunks_are_merged():
+    snippets = [
+        _chunk(900, 1900),  # mais relevante
+        _chunk(0, 1000),  # sobrepõe 100 caracteres
+        _chunk(1900, 2500),  # encosta no primeiro
+        _chunk(0, 300, page=1),  # outra página: não funde
+    ]
+
+    packed = pack_context(snippets, max_tokens=10_000)
+
+    assert [t for t, _ in packed] == [TEXT[0:2500], TEXT[0:300]]
+    assert packed[0][1]["start_index"] == 0
+    assert packed[0][1]["merged_chunks"] == 3
+    assert packed[1][1] == snippets[3][1]
+
+
+def test_duplicate_overlap_is_free_and_budget_follows_relevance():
+    snippets = [
+        _chunk(0, 1000),
+        _chunk(100, 900),  # totalmente coberto: não custa nada
+        _chunk(2000, 2800, page=0),
+        _chunk(4000, 4400),
+    ]
+    budget = estimate_tokens(TEXT[0:1000]) + 100
+
+    packed = pack_context(snippets, max_tokens=budget)
+
+    assert packed[0][0] == TEXT[0:1000]
+    # O terceiro é cortado para caber no que sobrou; o quarto fica de fora
+    assert len(packed) == 2
+    assert TEXT[2000:2800].startswith(packed[1][0])
+    assert sum(estimate_tokens(t) for t, _ in packed) <= budget
+
+
+def test_unpositioned_snippets_are_deduplicated_by_text():
+    snippets = [("igual", {}), ("igual", {"start_index": -1}), ("outro", {"page": 3})]
+    assert pack_context(snippets, max_tokens=100) == [("igual", {}), ("outro", {"page": 3})]
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from langchain_core.embeddings import Embeddings
+
+from infrastructure.embeddings.cache import CachedEmbeddings
+
+
+class _CountingEmbeddings(Embeddings):
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += len(texts)
+        return [[float(len(t)), 1.0] for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return [float(len(text)), 0.0]
+
+
+def _cached(inner: Embeddings, path: Path, **kw) -> CachedEmbeddings:
+    return CachedEmbeddings(inner, provider="test", model="m", path=str(path), **kw)
+
+
+def test_cache_hits_memory_and_disk(tmp_path: Path):
+    db = tmp_path / "emb.sqlite"
+    inner = _CountingEmbeddings()
+    emb = _cached(inner, db)
+
+    assert emb.embed_documents(["a", "bb", "a"]) == [[1.0, 1.0], [2.0, 1.0], [1.0, 1.0]]
+    assert inner.calls == 2  # "a" repetido no lote é embedado uma vez
+    emb.embed_documents(["a", "bb"])
+    assert inner.calls == 2
+    assert emb.stats()["hits"] == 2
+
+    # Novo processo: nada em memória, tudo vem do SQLite
+    inner2 = _CountingEmbeddings()
+    emb2 = _cached(inner2, db)
+    assert emb2.embed_documents(["bb"]) == [[2.0, 1.0]]
+    assert inner2.calls == 0
+
+    # Query e documento usam chaves distintas
+    assert emb2.embed_query("bb") == [2.0, 0.0]
+    assert inner2.calls == 1
+
+
+def test_cache_bounded_eviction(tmp_path: Path):
+    emb = _cached(_CountingEmbeddings(), tmp_path / "emb.sqlite", max_entries=3, memory_entries=2)
+    emb.embed_documents(["a", "b", "c", "d", "e"])
+    stats = emb.stats()
+    assert stats["disk_entries"] == 3
+    assert stats["memory_entries"] == 2
+
+
+def test_disk_hits_touch_in_batches_and_eviction_sees_them(tmp_path: Path):
+    db = tmp_path / "emb.sqlite"
+    _cached(_CountingEmbeddings(), db).embed_documents(["a", "b", "c"])
+
+    emb = _cached(_CountingEmbeddings(), db, max_entries=3, memory_entries=1)
+    assert emb.stats()["disk_entries"] == 3  # contado na abertura
+    changes = emb._conn.total_changes
+    emb.embed_documents(["a"])  # hit no disco: nenhuma escrita ainda
+    assert emb._conn.total_changes == changes
+
+    # A evicção grava os touches pendentes antes: "a" (recém-lido) sobrevive; sai "b" ou "c"
+    emb.embed_documents(["d"])
+    keys = {k for (k,) in emb._conn.execute("SELECT key FROM embeddings")}
+    assert emb._key("doc", "a") in keys
+    assert len(keys & {emb._key("doc", "b"), emb._key("doc", "c")}) == 1
+    assert emb.stats()["disk_entries"] == 3
@@ -0,0 +1,79 @@
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.lexical.bm25_index import BM25Index, query_terms
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _DenseStore:
+    """Busca densa "ruim": nunca traz o chunk com o código exato."""
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5):
+        assert search_type == "similarity"
+
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                return [
+                    Document(page_content=f"dense {i}", metadata={"chunk_id": f"d{i}"})
+                    for i in range(k)
+                ]
+
+        return _Retriever()
+
+
+class _StubLLM:
+    def generate(self, question, context_snippets=None) -> str:
+        return "stub"
+
+
+def test_bm25_index_upsert_delete_and_search(tmp_path: Path):
+    index = BM25Index(str(tmp_path / "lex.sqlite"))
+    docs = [
+        Document(page_content="Dipirona sódica 500 mg", metadata={"page": 1}),
+        Document(page_content="Artigo 5º, inciso XXXV", metadata={"page": 2}),
+    ]
+    index.upsert(docs, ["a", "b"])
+    assert [d.metadata["chunk_id"] for d in index.search("dipirona", 5)] == ["a"]
+    assert index.search("artigo 5", 5)[0].metadata["page"] == 2
+
+    index.upsert([Document(page_content="Paracetamol", metadata={})], ["a"])
+    index.delete(["b"])
+    assert index.count() == 1
+    assert index.search("dipirona", 5) == []
+
+
+def test_bm25_query_drops_stopwords_and_common_terms(tmp_path: Path):
+    assert query_terms("Qual é a dose de Dipirona para crianças?") == [
+        "dose",
+        "dipirona",
+        "criancas",
+    ]
+
+    index = BM25Index(str(tmp_path / "lex.sqlite"))
+    texts = [f"dose do medicamento {i}" for i in range(9)] + ["dose de dipirona sódica"]
+    index.upsert([Document(page_content=t, metadata={}) for t in texts], list("abcdefghij"))
+    assert index._select_terms(query_terms("dose da dipirona ausente")) == ["dipirona"]
+    assert [d.metadata["chunk_id"] for d in index.search("dose da dipirona", 5)] == ["j"]
+    # Só termos comuns: ainda busca com eles em vez de não trazer nada
+    assert len(index.search("dose", 5)) == 5
+    assert index.search("de que", 5) == []
+
+
+def test_hybrid_search_fuses_lexical_hits(tmp_path: Path):
+    index = BM25Index(str(tmp_path / "lex.sqlite"))
+    index.upsert([Document(page_content="código ISO-27001 controle A.5", metadata={})], ["lex1"])
+    uc = QueryRAGUseCase(
+        settings=Settings(hybrid_fetch_k=4),
+        store=_DenseStore(),
+        llm=_StubLLM(),
+        lexical_index=index,
+    )
+
+    out = uc.execute("ISO-27001", k=3, search_type="hybrid")
+
+    ids = [h["metadata"]["chunk_id"] for h in out["hits"]]
+    assert len(ids) == 3
+    assert "lex1" in ids
+    assert all("rrf_score" in h["metadata"] for h in out["hits"])
@@ -1,3 +1,4 @@
+import uuid
 from pathlib import Path
 
 import fitz  # PyMuPDF
@@ -8,11 +9,12 @@ from app.main import create_app
 
 
 @pytest.mark.asyncio
-async def test_ingest_pdf_ok(tmp_path: Path):
+async def test_ingest_pdf_ok(tmp_path: Path, wait_for_job):
     pdf_path = tmp_path / "tiny.pdf"
     doc = fitz.open()
     page = doc.new_page()
-    page.insert_text((72, 72), "Hello RAG with LangChain & Chroma!")
+    # Conteúdo único por execução: PDFs idênticos são pulados pelo manifesto
+    page.insert_text((72, 72), f"Hello RAG with LangChain & Chroma! {uuid.uuid4()}")
     doc.save(pdf_path)
     doc.close()
 
@@ -23,8 +25,28 @@ async def test_ingest_pdf_ok(tmp_path: Path):
             files = {"file": ("tiny.pdf", f, "application/pdf")}
             resp = await ac.post("/v1/documents", files=files)
 
-    assert resp.status_code == 201, resp.text
-    data = resp.json()
-    assert data["filename"] == "tiny.pdf"
+        assert resp.status_code == 202, resp.text
+        accepted = resp.json()
+        assert accepted["filename"] == "tiny.pdf"
+        assert accepted["status_url"] == f"/v1/jobs/{accepted['job_id']}"
+
+        job = await wait_for_job(ac, accepted["job_id"])
+
+    assert job["status"] == "succeeded", job
+    data = job["result"]
     assert data["num_docs"] >= 1
     assert data["num_chunks"] >= 1
+    assert job["progress"]["pages_parsed"] >= 1
+    assert job["progress"]["chunks_embedded"] == data["num_chunks"]
+    assert set(job["progress"]["timings"]) == {"load", "split", "embed"}
+    # O Server-Timing do upload só tem o `upload`; os estágios da ingestão ficam no job
+    assert {"embed", "vector_write"} <= set(job["stage_timings"])
+
+
+@pytest.mark.asyncio
+async def test_job_not_found():
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.get("/v1/jobs/does-not-exist")
+    assert resp.status_code == 404
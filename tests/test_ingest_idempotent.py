@@ -0,0 +1,66 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.manifest.ingest_manifest import IngestManifest
+from use_cases.ingest_documents import IngestDocumentsUseCase, IngestProgress
+
+
+class _PagesLoader:
+    def __init__(self) -> None:
+        self.pages: list[str] = []
+
+    def lazy_load(self, filepath: str) -> Iterator[Document]:
+        for i, text in enumerate(self.pages):
+            yield Document(page_content=text, metadata={"page": i})
+
+
+class _DictStore:
+    def __init__(self) -> None:
+        self.vectors: dict[str, str] = {}
+        self.writes = 0
+
+    def add_documents(self, documents, ids=None) -> int:
+        for doc, cid in zip(documents, ids, strict=True):
+            self.vectors[cid] = doc.page_content
+        self.writes += len(documents)
+        return len(documents)
+
+    def delete(self, ids: list[str]) -> int:
+        for cid in ids:
+            self.vectors.pop(cid, None)
+        return len(ids)
+
+
+def test_reingest_skips_unchanged_and_applies_diff(tmp_path: Path):
+    pdf_path = tmp_path / "doc.pdf"
+    loader = _PagesLoader()
+    store = _DictStore()
+    uc = IngestDocumentsUseCase(
+        settings=Settings(),
+        store=store,
+        loader=loader,
+        manifest=IngestManifest(str(tmp_path / "manifest.sqlite"), collection="t"),
+    )
+
+    loader.pages = ["page zero", "page one", "page two"]
+    pdf_path.write_bytes(b"v1")
+    assert uc.execute(str(pdf_path)) == (3, 3)
+    assert len(store.vectors) == 3
+
+    # Mesmo arquivo: pulado sem tocar no store
+    progress = IngestProgress()
+    assert uc.execute(str(pdf_path), progress=progress) == (0, 0)
+    assert progress.files_skipped == 1
+    assert store.writes == 3
+
+    # Arquivo alterado: 1 página mudou e a última sumiu
+    loader.pages = ["page zero", "page ONE (edited)"]
+    pdf_path.write_bytes(b"v2")
+    progress = IngestProgress()
+    assert uc.execute(str(pdf_path), progress=progress) == (2, 1)
+    assert progress.chunks_unchanged == 1
+    assert progress.chunks_deleted == 1
+    assert sorted(store.vectors.values()) == ["page ONE (edited)", "page zero"]
@@ -0,0 +1,50 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from use_cases.ingest_documents import IngestDocumentsUseCase, IngestProgress
+
+
+class _LazyLoader:
+    def __init__(self, pages: int) -> None:
+        self.pages = pages
+        self.yielded = 0
+
+    def lazy_load(self, filepath: str) -> Iterator[Document]:
+        for i in range(self.pages):
+            self.yielded += 1
+            yield Document(page_content="lorem ipsum " * 200, metadata={"page": i})
+
+
+class _RecordingStore:
+    def __init__(self, loader: _LazyLoader) -> None:
+        self.loader = loader
+        self.batches: list[int] = []
+        self.pages_seen_at_flush: list[int] = []
+
+    def add_documents(self, documents, ids=None) -> int:
+        self.batches.append(len(documents))
+        self.pages_seen_at_flush.append(self.loader.yielded)
+        return len(documents)
+
+    def delete(self, ids: list[str]) -> int:
+        return len(ids)
+
+
+def test_streaming_ingest_flushes_bounded_batches(tmp_path: Path):
+    pdf_path = tmp_path / "stub.pdf"
+    pdf_path.write_bytes(b"stub")  # conteúdo vem do loader fake; arquivo só é hasheado
+    loader = _LazyLoader(pages=10)
+    store = _RecordingStore(loader)
+    uc = IngestDocumentsUseCase(settings=Settings(ingest_batch_size=4), store=store, loader=loader)
+    progress = IngestProgress()
+
+    num_docs, added = uc.execute(str(pdf_path), progress=progress)
+
+    assert num_docs == 10
+    assert added == progress.chunks_split == progress.chunks_embedded
+    assert max(store.batches) <= 4
+    # Lotes são escritos enquanto as páginas ainda estão sendo lidas
+    assert store.pages_seen_at_flush[0] < 10
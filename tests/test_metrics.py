@@ -0,0 +1,70 @@
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import create_app
+from app.settings import Settings
+from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from infrastructure.observability.metrics import (
+    LLM_TOKENS,
+    STAGE_SECONDS,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+)
+
+
+def test_text_exposition_format():
+    registry = MetricsRegistry()
+    hist = registry.register(Histogram("t_seconds", "Duração.", ["stage"], buckets=(0.1, 1.0)))
+    hist.observe(0.05, stage="a")
+    hist.observe(0.5, stage="a")
+    hist.observe(5.0, stage="a")
+    counter = registry.register(Counter("t_total", "Total.", ["name"]))
+    counter.inc(2, name='com "aspas"')
+
+    lines = registry.render().splitlines()
+
+    assert "# TYPE t_seconds histogram" in lines
+    assert 't_seconds_bucket{stage="a",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="a",le="1"} 2' in lines
+    assert 't_seconds_bucket{stage="a",le="+Inf"} 3' in lines
+    assert 't_seconds_sum{stage="a"} 5.55' in lines
+    assert 't_seconds_count{stage="a"} 3' in lines
+    assert 't_total{name="com \\"aspas\\""} 2' in lines
+    with pytest.raises(ValueError):
+        counter.inc(name="x", extra="y")
+
+
+def test_llm_stage_and_tokens_are_recorded():
+    llm = LangChainLLMProvider(Settings(llm_provider="fake"))
+    calls = STAGE_SECONDS.count(stage="llm")
+    completion = LLM_TOKENS.value(kind="completion", source="estimated")
+
+    llm.generate("pergunta", context_snippets=[("trecho", {"page": 1})])
+    "".join(llm.stream("pergunta"))
+
+    assert STAGE_SECONDS.count(stage="llm") == calls + 2
+    assert LLM_TOKENS.value(kind="completion", source="estimated") > completion
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint():
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/v1/echo", json={"question": "ping"})
+        assert resp.status_code == 200
+
+        resp = await ac.get("/v1/jobs/nao-existe")
+        assert resp.status_code == 404
+
+        resp = await ac.get("/metrics")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = resp.text
+
+    assert 'route="/v1/echo",status="200"' in body
+    assert 'route="/v1/jobs/{job_id}",status="404"' in body  # template, não a URL
+    assert "rag_http_requests_in_flight 1" in body  # o próprio scrape
+    assert "# TYPE rag_stage_duration_seconds histogram" in body
+    assert 'rag_ingest_jobs_in_flight{state="running"} 0' in body
@@ -0,0 +1,91 @@
+import numpy as np
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.vectorstores.mmr import mmr_documents, mmr_select
+from use_cases.query_rag import QueryRAGUseCase
+
+
+def _reference_mmr(query, cands, k, lambda_mult):
+    """MMR ingênuo (recalcula tudo a cada passo), como o loop do LangChain."""
+    unit = cands / np.linalg.norm(cands, axis=1, keepdims=True)
+    rel = unit @ (query / np.linalg.norm(query))
+    picked = [int(np.argmax(rel))]
+    while len(picked) < k:
+        best, best_i = -np.inf, -1
+        for i in range(len(cands)):
+            if i in picked:
+                continue
+            redundancy = max(unit[i] @ unit[j] for j in picked)
+            score = lambda_mult * rel[i] - (1 - lambda_mult) * redundancy
+            if score > best:
+                best, best_i = score, i
+        picked.append(best_i)
+    return picked
+
+
+def test_mmr_select_matches_reference_and_returns_scores():
+    rng = np.random.default_rng(3)
+    query = rng.standard_normal(32)
+    cands = rng.standard_normal((40, 32))
+
+    for lambda_mult in (0.0, 0.3, 0.5, 1.0):
+        picked, relevance, diversity = mmr_select(query, cands, 8, lambda_mult)
+        assert picked.tolist() == _reference_mmr(query, cands, 8, lambda_mult)
+    assert diversity[0] == 1.0
+    assert np.all((diversity >= 0) & (diversity <= 2))
+    assert relevance[0] == max(relevance)  # lambda=1: primeiro é o mais relevante
+
+
+def test_mmr_skips_near_duplicates():
+    query = np.array([1.0, 0.0])
+    cands = np.array([[1.0, 0.01], [1.0, 0.02], [0.7, 0.7]])
+    docs = [Document(page_content=t, metadata={"i": i}) for i, t in enumerate("abc")]
+
+    out = mmr_documents(query, cands, docs, k=2, lambda_mult=0.3)
+
+    assert [d.page_content for d in out] == ["a", "c"]
+    assert out[0].metadata["i"] == 0
+    assert out[1].metadata["mmr_diversity"] < 1.0
+    assert out[1].metadata["mmr_relevance"] < out[0].metadata["mmr_relevance"]
+
+
+class _MMRStore:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, **kwargs):
+        self.calls.append({"search_type": search_type, "k": k, **kwargs})
+
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                return [Document(page_content=question, metadata={})]
+
+        return _Retriever()
+
+
+class _StubLLM:
+    def generate(self, question, context_snippets=None) -> str:
+        return "stub"
+
+
+def test_fetch_k_and_lambda_per_request_and_in_cache_key():
+    store = _MMRStore()
+    uc = QueryRAGUseCase(
+        settings=Settings(retriever_fetch_k=20, retriever_lambda_mult=0.5),
+        store=store,
+        llm=_StubLLM(),
+        retrieval_cache=RetrievalCache(),
+    )
+
+    uc.execute("q", k=3, search_type="mmr")
+    uc.execute("q", k=3, search_type="mmr", fetch_k=50, lambda_mult=0.9)
+    uc.execute("q", k=3, search_type="mmr", fetch_k=50, lambda_mult=0.9)  # cache
+    uc.execute("q", k=3, search_type="similarity", fetch_k=50)
+
+    assert store.calls == [
+        {"search_type": "mmr", "k": 3, "fetch_k": 20, "lambda_mult": 0.5},
+        {"search_type": "mmr", "k": 3, "fetch_k": 50, "lambda_mult": 0.9},
+        {"search_type": "similarity", "k": 3},
+    ]
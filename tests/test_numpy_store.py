@@ -0,0 +1,197 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore, top_k
+
+
+class _KeywordEmbeddings:
+    """Vetor one-hot por palavra-chave: busca com resultado previsível."""
+
+    WORDS = ("gato", "cachorro", "peixe", "pássaro")
+
+    def _vec(self, text: str) -> list[float]:
+        return [1.0 if w in text else 0.0 for w in self.WORDS]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vec(text)
+
+
+class _Provider:
+    instance = _KeywordEmbeddings()
+
+
+def _store(path: Path) -> NumpyVectorStore:
+    return NumpyVectorStore(str(path), "docs", embeddings=_Provider())
+
+
+def _docs(*texts: str) -> list[Document]:
+    return [Document(page_content=t, metadata={"n": i}) for i, t in enumerate(texts)]
+
+
+def _contents(found: list[list[Document]]) -> list[list[str]]:
+    return [[d.page_content for d in hits] for hits in found]
+
+
+def test_top_k_matches_full_sort():
+    scores = np.random.default_rng(0).standard_normal(1000).astype(np.float32)
+    assert top_k(scores, 10).tolist() == np.argsort(-scores)[:10].tolist()
+    assert len(top_k(scores, 5000)) == 1000
+
+
+def test_add_search_and_reopen(tmp_path: Path):
+    store = _store(tmp_path)
+    store.add_documents(_docs("gato", "cachorro", "peixe"), ids=["a", "b", "c"])
+
+    hits = store.as_retriever(search_type="similarity", k=2).invoke("gato")
+    assert hits[0].page_content == "gato"
+    assert hits[0].metadata == {"n": 0}
+
+    # Outro processo/réplica: só mapeia os arquivos
+    reopened = _store(tmp_path)
+    assert reopened.stats()["total_vectors"] == 3
+    assert reopened.similarity_search_by_vectors([[0, 0, 1, 0]], 1)[0][0].page_content == "peixe"
+
+
+def test_upsert_delete_and_compact(tmp_path: Path):
+    store = _store(tmp_path)
+    reader = _store(tmp_path)
+    store.add_documents(_docs("gato", "cachorro"), ids=["a", "b"])
+    assert reader.stats()["total_vectors"] == 2
+
+    store.add_documents(_docs("peixe"), ids=["a"])  # upsert: "a" agora é peixe
+    store.delete(["b"])
+    assert reader.stats()["total_vectors"] == 1
+    assert [d.page_content for d in reader.as_retriever("similarity", k=5).invoke("gato")] == [
+        "peixe"
+    ]
+
+    assert store.compact() == 2
+    assert store.stats()["total_vectors"] == 1
+    store.add_documents(_docs("pássaro"), ids=["a"])
+    assert [d.page_content for d in _store(tmp_path).as_retriever("mmr", k=5).invoke("x")] == [
+        "pássaro"
+    ]
+
+
+def test_interrupted_append_is_discarded(tmp_path: Path):
+    store = _store(tmp_path)
+    store.add_documents(_docs("gato"), ids=["a"])
+    # Simula queda depois do sidecar e antes da matriz
+    with open(tmp_path / "docs" / "docs.jsonl", "ab") as f:
+        f.write(b'{"id": "x", "text": "lixo", "meta')
+
+    store = _store(tmp_path)
+    store.add_documents(_docs("cachorro"), ids=["b"])
+    hits = store.similarity_search_by_vectors([[0, 1, 0, 0]], 5)[0]
+    assert [d.page_content for d in hits] == ["cachorro", "gato"]
+
+
+def test_quantized_search_reranks_with_exact_vectors(tmp_path: Path):
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((2000, 64)).astype(np.float32)
+    queries = rng.standard_normal((20, 64)).astype(np.float32)
+    texts = [str(i) for i in range(len(vectors))]
+
+    exact = NumpyVectorStore(str(tmp_path), "exact", embeddings=_Provider())
+    exact.add_embeddings(vectors, texts, ids=texts)
+    want = _contents(exact.similarity_search_by_vectors(queries, 5))
+
+    # Binário em 64 dims é grosseiro: precisa de um pool de candidatos bem maior
+    for mode, factor, min_recall in (("int8", 3, 0.95), ("binary", 40, 0.75)):
+        store = NumpyVectorStore(
+            str(tmp_path), mode, embeddings=_Provider(), quantization=mode, rescore_factor=factor
+        )
+        store.add_embeddings(vectors[:1000], texts[:1000], ids=texts[:1000])
+        store.add_embeddings(vectors[1000:], texts[1000:], ids=texts[1000:])
+        got = _contents(store.similarity_search_by_vectors(queries, 5))
+        recall = np.mean([len(set(g) & set(w)) / 5 for g, w in zip(got, want, strict=True)])
+        assert recall >= min_recall, (mode, recall)
+        assert store.stats()["index_bytes"] < exact.stats()["index_bytes"] / 3
+
+
+def test_int8_scales_grow_with_later_batches(tmp_path: Path):
+    rng = np.random.default_rng(11)
+    dim = 64
+    # 1º lote: um vetor quase todo na dimensão 0 (escalas minúsculas nas outras);
+    # os seguintes espalham energia por dimensões diferentes, com magnitudes diferentes
+    batches = [np.eye(1, dim, dtype=np.float32) * 10 + rng.standard_normal((1, dim)) * 0.01]
+    for scale, dims in ((1.0, slice(None)), (5.0, slice(0, 8)), (0.1, slice(None))):
+        batch = rng.standard_normal((1000, dim)).astype(np.float32) * 0.05
+        batch[:, dims] += rng.standard_normal((1000, dim))[:, dims] * scale
+        batches.append(batch)
+    vectors = np.concatenate(batches).astype(np.float32)
+    queries = rng.standard_normal((30, dim)).astype(np.float32)
+    texts = [str(i) for i in range(len(vectors))]
+
+    exact = NumpyVectorStore(str(tmp_path), "exact", embeddings=_Provider())
+    exact.add_embeddings(vectors, texts, ids=texts)
+    want = _contents(exact.similarity_search_by_vectors(queries, 10))
+
+    store = NumpyVectorStore(
+        str(tmp_path), "int8", embeddings=_Provider(), quantization="int8", rescore_factor=1
+    )
+    start = 0
+    for batch in batches:
+        ids = texts[start : start + len(batch)]
+        store.add_embeddings(batch, ids, ids=ids)
+        start += len(batch)
+    # Sem rescoring extra, o top-k sai direto dos códigos: clipping derrubaria o recall
+    got = _contents(store.similarity_search_by_vectors(queries, 10))
+    recall = np.mean([len(set(g) & set(w)) / 10 for g, w in zip(got, want, strict=True)])
+    assert recall >= 0.9, recall
+
+    # Reabrir lê as escalas alargadas (e os códigos reescritos) do disco
+    reopened = NumpyVectorStore(
+        str(tmp_path), "int8", embeddings=_Provider(), quantization="int8", rescore_factor=1
+    )
+    assert _contents(reopened.similarity_search_by_vectors(queries, 10)) == got
+
+
+def test_quantization_enabled_on_existing_collection(tmp_path: Path):
+    _store(tmp_path).add_documents(_docs("gato", "cachorro"), ids=["a", "b"])
+
+    store = NumpyVectorStore(str(tmp_path), "docs", embeddings=_Provider(), quantization="int8")
+    # Sem códigos ainda: as linhas não codificadas vão direto ao rescoring
+    assert store.as_retriever("similarity", k=1).invoke("cachorro")[0].page_content == "cachorro"
+    store.warm_up()
+    assert (tmp_path / "docs" / "codes.i8").stat().st_size == 2 * 4
+    store.delete(["b"])
+    assert [d.page_content for d in store.as_retriever("similarity", k=5).invoke("x")] == ["gato"]
+
+
+def test_searches_survive_concurrent_writes_and_compaction(tmp_path: Path):
+    rng = np.random.default_rng(3)
+    store = NumpyVectorStore(str(tmp_path), "docs", embeddings=_Provider(), quantization="int8")
+    ids = [str(i) for i in range(300)]
+    store.add_embeddings(rng.standard_normal((300, 16)), ids, ids=ids)
+    deadline = time.monotonic() + 1.5
+
+    def write() -> None:
+        for round_ in range(10_000):
+            if time.monotonic() > deadline:
+                return
+            batch = [str(i) for i in rng.integers(0, 1000, 50)]
+            store.add_embeddings(rng.standard_normal((50, 16)), batch, ids=batch)
+            store.delete([str(i) for i in rng.integers(0, 1000, 20)])
+            if round_ % 3 == 0:
+                store.compact()
+
+    def search(seed: int) -> None:
+        queries = np.random.default_rng(seed).standard_normal((50, 16))
+        while time.monotonic() < deadline:
+            for q in queries[:5]:
+                assert len(store.similarity_search_by_vectors([q], 5)[0]) == 5
+                store.mmr_search_by_vector(q, 3)
+
+    # result() relança no teste o erro de qualquer thread (escrita ou busca)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(write)] + [pool.submit(search, i) for i in range(3)]
+    for future in futures:
+        future.result()
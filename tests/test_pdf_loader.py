@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+from infrastructure.loaders.pdf_loader import PDFLoaderAdapter
+
+
+def _make_pdf(path: Path, pages: int) -> None:
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"page number {i}")
+    doc.save(path)
+    doc.close()
+
+
+def test_parallel_loader_matches_sequential(tmp_path: Path):
+    pdf_path = tmp_path / "multi.pdf"
+    _make_pdf(pdf_path, pages=7)
+
+    sequential = PDFLoaderAdapter(workers=1).load(str(pdf_path))
+    loader = PDFLoaderAdapter(workers=2, pages_per_task=2)
+    try:
+        parallel = loader.load(str(pdf_path))
+        many = loader.load_many([str(pdf_path), str(pdf_path)])
+    finally:
+        loader.shutdown()
+
+    assert [d.metadata for d in parallel] == [d.metadata for d in sequential]
+    assert [d.page_content.strip() for d in parallel] == [
+        d.page_content.strip() for d in sequential
+    ]
+    assert [d.metadata["page"] for d in many] == list(range(7)) * 2
@@ -0,0 +1,39 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _ThreadRecordingStore:
+    def __init__(self) -> None:
+        self.threads: list[str] = []
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, **_):
+        store = self
+
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                store.threads.append(threading.current_thread().name)
+                return [Document(page_content="ctx", metadata={})]
+
+        return _Retriever()
+
+
+@pytest.mark.asyncio
+async def test_aexecute_offloads_retrieval_to_dedicated_executor():
+    settings = Settings(llm_provider="fake")
+    store = _ThreadRecordingStore()
+    with ThreadPoolExecutor(max_workers=2, thread_name_prefix="query") as executor:
+        uc = QueryRAGUseCase(
+            settings=settings, store=store, llm=LangChainLLMProvider(settings), executor=executor
+        )
+        out = await uc.aexecute("q", generate=True, k=1)
+
+    assert out["answer"] == "This is a fake LLM answer."
+    assert out["hits"][0]["content"] == "ctx"
+    assert store.threads and all(t.startswith("query") for t in store.threads)
@@ -0,0 +1,58 @@
+import pytest
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _BatchStore:
+    def __init__(self) -> None:
+        self.embed_calls: list[list[str]] = []
+        self.similarity_calls = 0
+        self.mmr_calls = 0
+
+    def embed_queries(self, texts: list[str]) -> list[list[float]]:
+        self.embed_calls.append(list(texts))
+        return [[float(len(t))] for t in texts]
+
+    def similarity_search_by_vectors(self, vectors, k):
+        self.similarity_calls += 1
+        return [
+            [Document(page_content=f"sim {v[0]} #{i}", metadata={}) for i in range(k)]
+            for v in vectors
+        ]
+
+    def mmr_search_by_vector(self, vector, k, **_):
+        self.mmr_calls += 1
+        return [Document(page_content=f"mmr {vector[0]} #{i}", metadata={}) for i in range(k)]
+
+
+@pytest.mark.asyncio
+async def test_batch_embeds_once_and_groups_similarity_lookups():
+    settings = Settings(llm_provider="fake", retriever_search_type="mmr")
+    store = _BatchStore()
+    uc = QueryRAGUseCase(
+        settings=settings,
+        store=store,
+        llm=LangChainLLMProvider(settings),
+        retrieval_cache=RetrievalCache(),
+    )
+    items = [
+        {"question": "a", "k": 1, "search_type": "similarity"},
+        {"question": "bb", "k": 3, "search_type": "similarity", "generate": True},
+        {"question": "ccc", "k": 2},
+    ]
+
+    out = await uc.aexecute_batch(items)
+
+    assert store.embed_calls == [["a", "bb", "ccc"]]
+    assert store.similarity_calls == 1 and store.mmr_calls == 1
+    assert [len(r["hits"]) for r in out] == [1, 3, 2]
+    assert out[0]["answer"] is None
+    assert out[1]["answer"] == "This is a fake LLM answer."
+
+    # Segunda rodada: tudo vem do cache de retrieval
+    await uc.aexecute_batch(items)
+    assert len(store.embed_calls) == 1
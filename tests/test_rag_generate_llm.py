@@ -9,7 +9,7 @@ from app.settings import Settings
 
 
 @pytest.mark.asyncio
-async def test_rag_generate_with_llm_provider(tmp_path: Path):
+async def test_rag_generate_with_llm_provider(tmp_path: Path, wait_for_job):
     # 1) cria PDF e ingere
     pdf_path = tmp_path / "tiny_gen.pdf"
     doc = fitz.open()
@@ -24,7 +24,9 @@ async def test_rag_generate_with_llm_provider(tmp_path: Path):
         with pdf_path.open("rb") as f:
             files = {"file": ("tiny_gen.pdf", f, "application/pdf")}
             resp = await ac.post("/v1/documents", files=files)
-            assert resp.status_code == 201, resp.text
+            assert resp.status_code == 202, resp.text
+        job = await wait_for_job(ac, resp.json()["job_id"])
+        assert job["status"] == "succeeded", job
 
         # 2) generate=true -> resposta via LLMProvider (fake ou real)
         resp2 = await ac.post("/v1/rag/query", json={"question": "Summarize", "generate": True})
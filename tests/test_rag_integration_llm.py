@@ -22,7 +22,7 @@ def _should_run_integration() -> tuple[bool, str]:
 
 
 @pytest.mark.asyncio
-async def test_rag_integration_real_llm(tmp_path: Path):
+async def test_rag_integration_real_llm(tmp_path: Path, wait_for_job):
     should_run, reason = _should_run_integration()
     if not should_run:
         pytest.skip(reason)
@@ -43,7 +43,9 @@ async def test_rag_integration_real_llm(tmp_path: Path):
         with pdf_path.open("rb") as f:
             files = {"file": ("tiny_integration.pdf", f, "application/pdf")}
             resp = await ac.post("/v1/documents", files=files)
-            assert resp.status_code == 201, resp.text
+            assert resp.status_code == 202, resp.text
+        job = await wait_for_job(ac, resp.json()["job_id"])
+        assert job["status"] == "succeeded", job
 
         # 2) consulta com generate=True (usa LLMProvider real)
         resp2 = await ac.post(
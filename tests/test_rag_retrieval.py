@@ -3,15 +3,18 @@ from pathlib import Path
 import fitz  # PyMuPDF
 import pytest
 from httpx import ASGITransport, AsyncClient
+from langchain_core.documents import Document
 
 from app.main import create_app
 from app.settings import Settings
+from infrastructure.vectorstores.chroma_store import ChromaVectorStore
+from infrastructure.vectorstores.retriever import StoreRetriever
 
 TEXT = "LangChain & Chroma make RAG nice"
 
 
 @pytest.mark.asyncio
-async def test_rag_retrieval_flow(tmp_path: Path):
+async def test_rag_retrieval_flow(tmp_path: Path, wait_for_job):
     # 1) cria PDF e ingere
     pdf_path = tmp_path / "tiny_rag.pdf"
     doc = fitz.open()
@@ -26,7 +29,9 @@ async def test_rag_retrieval_flow(tmp_path: Path):
         with pdf_path.open("rb") as f:
             files = {"file": ("tiny_rag.pdf", f, "application/pdf")}
             resp = await ac.post("/v1/documents", files=files)
-            assert resp.status_code == 201, resp.text
+            assert resp.status_code == 202, resp.text
+        job = await wait_for_job(ac, resp.json()["job_id"])
+        assert job["status"] == "succeeded", job
 
         # 2) retrieval-only
         resp2 = await ac.post(
@@ -50,3 +55,26 @@ async def test_rag_retrieval_flow(tmp_path: Path):
         else:
             assert ans.strip()
             assert "fake llm answer" not in ans
+
+
+class _KeywordEmbeddings:
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_query(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return [float("gato" in text), float("peixe" in text)]
+
+
+class _Provider:
+    instance = _KeywordEmbeddings()
+
+
+def test_chroma_keeps_langchain_retriever_for_other_search_types(tmp_path: Path):
+    store = ChromaVectorStore(str(tmp_path), "docs", _Provider())
+    docs = [Document(page_content=t) for t in ("gato", "peixe", "gato e peixe")]
+    store.add_documents(docs, ids=["a", "b", "c"])
+
+    assert isinstance(store.as_retriever("similarity", k=1), StoreRetriever)
+    retriever = store.as_retriever("similarity_score_threshold", k=3, score_threshold=0.9)
+    assert not isinstance(retriever, StoreRetriever)
+    assert [d.page_content for d in retriever.invoke("gato")] == ["gato"]
@@ -0,0 +1,71 @@
+import json
+import time
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from langchain_core.documents import Document
+
+from app.main import create_app
+from app.settings import Settings
+from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from use_cases.query_rag import QueryRAGUseCase
+
+FAKE_ANSWER = "This is a fake LLM answer."
+
+
+class _StubStore:
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, **_):
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                return [Document(page_content="ctx", metadata={"page": 0})]
+
+        return _Retriever()
+
+
+def _parse_sse(body: str) -> list[tuple[str, object]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_fake_stream_time_to_first_token():
+    settings = Settings(llm_provider="fake", llm_fake_stream_delay=0.005)
+    uc = QueryRAGUseCase(settings=settings, store=_StubStore(), llm=LangChainLLMProvider(settings))
+
+    t0 = time.perf_counter()
+    ttft = None
+    tokens = []
+    for ev in uc.stream("q"):
+        if ev["event"] == "token":
+            ttft = ttft if ttft is not None else time.perf_counter() - t0
+            tokens.append(ev["data"])
+        elif ev["event"] == "done":
+            total = time.perf_counter() - t0
+            assert ev["data"] == {"answer": FAKE_ANSWER, "rerank": None}
+
+    assert "".join(tokens) == FAKE_ANSWER
+    assert len(tokens) > 1
+    assert ttft is not None and ttft < total
+
+
+@pytest.mark.asyncio
+async def test_rag_query_stream_endpoint_event_order():
+    app = create_app()
+    container = app.state.container
+    container.query_rag.store = _StubStore()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post("/v1/rag/query/stream", json={"question": "Summarize", "k": 1})
+
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    events = _parse_sse(resp.text)
+    names = [e for e, _ in events]
+    assert names[0] == "hits"
+    assert names[-1] == "done"
+    assert set(names[1:-1]) <= {"token"}
+    assert events[0][1][0]["content"] == "ctx"
+    answer = "".join(d for e, d in events if e == "token")
+    assert answer == events[-1][1]["answer"]
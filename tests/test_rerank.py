@@ -0,0 +1,133 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.rerank.fake import FakeReranker
+from infrastructure.rerank.lexical import LexicalOverlapReranker
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _OrderedStore:
+    """Primeiro estágio: devolve "doc 0", "doc 1", ... e registra o k (e o fetch_k) pedido."""
+
+    def __init__(self) -> None:
+        self.ks: list[int] = []
+        self.fetch_ks: list[int | None] = []
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, fetch_k: int | None = None, **_):
+        self.ks.append(k)
+        self.fetch_ks.append(fetch_k)
+
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                return [Document(page_content=f"doc {i}", metadata={"i": i}) for i in range(k)]
+
+        return _Retriever()
+
+
+class _ReverseReranker:
+    """Inverte a ordem do primeiro estágio (score = posição)."""
+
+    name = "reverse"
+
+    def score(self, question: str, texts: list[str]) -> list[float]:
+        return [float(i) for i in range(len(texts))]
+
+
+class _StubLLM:
+    def generate(self, question, context_snippets=None) -> str:
+        return "stub"
+
+    def stream(self, question, context_snippets=None):
+        yield from ("st", "ub")
+
+
+def _use_case(store, reranker, **settings) -> QueryRAGUseCase:
+    return QueryRAGUseCase(
+        settings=Settings(**{"rerank_top_n": 10, **settings}),
+        store=store,
+        llm=_StubLLM(),
+        reranker=reranker,
+        rerank_executor=ThreadPoolExecutor(max_workers=1),
+    )
+
+
+def test_lexical_reranker_prefers_rare_query_terms():
+    texts = [
+        "O contrato de locação pode ser rescindido.",
+        "Multa rescisória do contrato de locação: três aluguéis.",
+        "Contrato padrão.",
+    ]
+    scores = LexicalOverlapReranker().score("Qual a multa rescisória do contrato?", texts)
+    assert max(range(3), key=scores.__getitem__) == 1
+    assert LexicalOverlapReranker().score("", texts) == [0.0, 0.0, 0.0]
+
+
+def test_rerank_fetches_top_n_and_cuts_to_k():
+    store = _OrderedStore()
+    uc = _use_case(store, _ReverseReranker())
+
+    out = uc.execute("q", k=3, search_type="similarity")
+
+    assert store.ks == [10]
+    assert [h["metadata"]["i"] for h in out["hits"]] == [9, 8, 7]
+    assert out["hits"][0]["metadata"]["rerank_score"] == 9.0
+    assert out["rerank"]["reranker"] == "reverse"
+    assert out["rerank"]["candidates"] == 10
+    assert out["rerank"]["timed_out"] is False
+
+
+def test_rerank_widens_mmr_pool_beyond_top_n():
+    store = _OrderedStore()
+    uc = _use_case(store, _ReverseReranker(), rerank_top_n=30, retriever_fetch_k=20)
+
+    uc.execute("q", k=3, search_type="mmr")
+    uc.execute("q", k=3, search_type="mmr", rerank=False)
+
+    assert store.ks == [30, 3]
+    assert store.fetch_ks[0] > 30  # MMR escolhe os 30 dentre mais candidatos
+    assert store.fetch_ks[1] == 20
+
+
+def test_stream_sends_hits_first_and_rerank_info_with_done():
+    events = list(_use_case(_OrderedStore(), _ReverseReranker()).stream("q", k=2))
+
+    assert [e["event"] for e in events] == ["hits", "token", "token", "done"]
+    assert [h["metadata"]["i"] for h in events[0]["data"]] == [9, 8]
+    done = events[-1]["data"]
+    assert done["answer"] == "stub"
+    assert done["rerank"]["reranker"] == "reverse"
+
+
+def test_rerank_can_be_disabled_per_request():
+    store = _OrderedStore()
+    out = _use_case(store, _ReverseReranker()).execute("q", k=3, rerank=False)
+    assert store.ks == [3]
+    assert out["rerank"] is None
+
+
+def test_budget_exceeded_falls_back_to_first_stage_order():
+    uc = _use_case(_OrderedStore(), FakeReranker(delay=0.5))
+
+    out = uc.execute("q", k=3, search_type="similarity", rerank_budget_ms=20)
+
+    assert [h["metadata"]["i"] for h in out["hits"]] == [0, 1, 2]
+    assert out["rerank"]["timed_out"] is True
+    assert out["rerank"]["ms"] < 500
+
+
+@pytest.mark.asyncio
+async def test_async_rerank_respects_budget():
+    uc = _use_case(_OrderedStore(), FakeReranker(delay=0.5))
+
+    slow = await uc.aexecute("q", k=2, search_type="similarity", rerank_budget_ms=20)
+    assert slow["rerank"]["timed_out"] is True
+    assert [h["metadata"]["i"] for h in slow["hits"]] == [0, 1]
+
+    # Worker ainda ocupado com o rerank descartado: usa outro pool
+    fast = await _use_case(_OrderedStore(), _ReverseReranker()).aexecute(
+        "q", k=2, search_type="similarity"
+    )
+    assert [h["metadata"]["i"] for h in fast["hits"]] == [9, 8]
@@ -0,0 +1,54 @@
+import time
+
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from use_cases.query_rag import QueryRAGUseCase
+
+
+class _CountingStore:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    def as_retriever(self, search_type: str = "mmr", k: int = 5, **_):
+        store = self
+
+        class _Retriever:
+            def invoke(self, question: str) -> list[Document]:
+                store.calls += 1
+                return [Document(page_content=question, metadata={"k": k})]
+
+        return _Retriever()
+
+
+class _StubLLM:
+    def generate(self, question, context_snippets=None) -> str:
+        return "stub"
+
+
+def test_retrieval_cache_hits_and_epoch_invalidation():
+    cache = RetrievalCache(max_entries=8, ttl_seconds=60)
+    store = _CountingStore()
+    uc = QueryRAGUseCase(settings=Settings(), store=store, llm=_StubLLM(), retrieval_cache=cache)
+
+    uc.execute("What is RAG?", k=3, search_type="mmr")
+    uc.execute("  what is   rag? ", k=3, search_type="mmr")
+    assert store.calls == 1
+    uc.execute("What is RAG?", k=4, search_type="mmr")
+    assert store.calls == 2
+
+    cache.bump_epoch()
+    uc.execute("What is RAG?", k=3, search_type="mmr")
+    assert store.calls == 3
+    assert cache.stats()["hits"] == 1
+
+
+def test_retrieval_cache_ttl_and_lru():
+    cache = RetrievalCache(max_entries=2, ttl_seconds=0.01)
+    for q in ("a", "b", "c"):
+        cache.put(cache.key(q, 1, "mmr"), [q])
+    assert cache.get(cache.key("a", 1, "mmr")) is None
+    assert cache.get(cache.key("c", 1, "mmr")) == ["c"]
+    time.sleep(0.02)
+    assert cache.get(cache.key("c", 1, "mmr")) is None
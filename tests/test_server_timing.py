@@ -0,0 +1,62 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import create_app
+from infrastructure.observability.metrics import stage_timer
+from infrastructure.observability.timing import end_request, start_request
+from use_cases.query_rag import QueryRAGUseCase
+
+
+def _slow_stage() -> None:
+    with stage_timer("embed"):
+        time.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_stages_in_executor_threads_count_for_the_request():
+    timings, token = start_request()
+    try:
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            await asyncio.gather(
+                QueryRAGUseCase._in_executor(pool, _slow_stage),
+                QueryRAGUseCase._in_executor(pool, _slow_stage),
+            )
+        with stage_timer("llm"):
+            pass
+    finally:
+        end_request(token)
+
+    assert list(timings.stages) == ["embed", "llm"]
+    assert timings.stages["embed"] >= 0.02
+    header = timings.header(total=0.5)
+    assert header.startswith("embed;dur=")
+    assert header.endswith("total;dur=500.00")
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_and_profile(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("PROFILING_ENABLED", "true")
+    monkeypatch.setenv("PROFILING_DIR", str(tmp_path))
+    app = create_app()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as ac:
+        resp = await ac.post(
+            "/v1/rag/query",
+            json={"question": "tempo por estágio", "search_type": "similarity"},
+        )
+        assert resp.status_code == 200, resp.text
+        timing = resp.headers["Server-Timing"]
+        assert "embed;dur=" in timing
+        assert "vector_search;dur=" in timing
+        assert "total;dur=" in timing
+        assert "X-Profile-File" not in resp.headers
+
+        resp = await ac.post("/v1/echo", json={"question": "ping"}, headers={"X-Profile": "1"})
+        assert resp.status_code == 200
+        profile = tmp_path / resp.headers["X-Profile-File"]
+        assert profile.exists()
@@ -0,0 +1,165 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.container import build_app_state, build_shard, shard_dirs
+from app.settings import Settings
+from infrastructure.vectorstores.chroma_store import ChromaVectorStore
+from infrastructure.vectorstores.numpy_store import NumpyVectorStore
+from infrastructure.vectorstores.sharded_store import ShardedVectorStore, shard_of
+
+
+class _KeywordEmbeddings:
+    """Vetor por palavra-chave (com peso): busca com resultado previsível."""
+
+    WORDS = ("gato", "cachorro", "peixe", "pássaro")
+
+    def _vec(self, text: str) -> list[float]:
+        return [float(text.count(w)) for w in self.WORDS]
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self._vec(t) for t in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self._vec(text)
+
+
+class _Provider:
+    instance = _KeywordEmbeddings()
+
+
+TEXTS = [
+    "gato",
+    "gato gato peixe",
+    "gato cachorro",
+    "cachorro",
+    "cachorro peixe peixe",
+    "peixe",
+    "pássaro gato",
+    "pássaro",
+]
+IDS = [f"c{i}" for i in range(len(TEXTS))]
+
+
+def _docs() -> list[Document]:
+    return [Document(page_content=t, metadata={"n": i}) for i, t in enumerate(TEXTS)]
+
+
+def _scores(query: list[float], hits: list[Document]) -> list[float]:
+    """Cossenos dos hits na ordem devolvida (empates podem trocar docs, nunca scores)."""
+    q = np.asarray(query) / np.linalg.norm(query)
+    vecs = np.asarray(_Provider.instance.embed_documents([d.page_content for d in hits]))
+    return np.round(vecs @ q / np.linalg.norm(vecs, axis=1), 6).tolist()
+
+
+def _sharded(path: Path, shards: int, executor=None) -> ShardedVectorStore:
+    return ShardedVectorStore(
+        [NumpyVectorStore(str(path / str(i)), "docs", _Provider()) for i in range(shards)],
+        embeddings=_Provider(),
+        executor=executor,
+        collection_name="docs",
+    )
+
+
+def test_shard_of_is_stable_and_spreads_ids():
+    assert shard_of("abc", 4) == shard_of("abc", 4)
+    counts = [0] * 4
+    for i in range(1000):
+        counts[shard_of(f"chunk-{i}", 4)] += 1
+    assert min(counts) > 200
+
+
+def test_fan_out_merge_matches_single_store(tmp_path: Path):
+    single = NumpyVectorStore(str(tmp_path / "single"), "docs", _Provider())
+    single.add_documents(_docs(), ids=IDS)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        sharded = _sharded(tmp_path / "sharded", 4, executor)
+        sharded.add_documents(_docs(), ids=IDS)
+
+        stats = sharded.stats()
+        assert stats["total_vectors"] == len(TEXTS)
+        assert [s["total_vectors"] for s in stats["shards"]] == [
+            sum(shard_of(cid, 4) == i for cid in IDS) for i in range(4)
+        ]
+
+        queries = [[1, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]]
+        for k in (1, 3, len(TEXTS)):
+            got = sharded.similarity_search_by_vectors(queries, k)
+            want = single.similarity_search_by_vectors(queries, k)
+            for query, hits, expected in zip(queries, got, want, strict=True):
+                assert _scores(query, hits) == _scores(query, expected)
+
+        # MMR depois do merge: mesma seleção que sobre o índice inteiro
+        query = [2, 0, 1, 0]
+        mmr = sharded.mmr_search_by_vector(query, 3, fetch_k=len(TEXTS))
+        assert [d.page_content for d in mmr] == [
+            d.page_content for d in single.mmr_search_by_vector(query, 3, len(TEXTS))
+        ]
+        assert "mmr_diversity" in mmr[0].metadata
+
+
+def test_chroma_shards_match_unsharded_cosine_on_unnormalized_vectors(tmp_path: Path):
+    rng = np.random.default_rng(3)
+    # Normas bem diferentes: em L2 o top-k de cada shard não seria o top-k por cosseno
+    vectors = rng.standard_normal((300, 8)) * rng.uniform(0.05, 20, size=(300, 1))
+    queries = rng.standard_normal((10, 8)) * 5
+    texts, ids = [f"doc {i}" for i in range(300)], [f"c{i}" for i in range(300)]
+    metadatas = [{"i": i} for i in range(300)]
+    settings = Settings(
+        vector_store_provider="chroma", chroma_dir=str(tmp_path), vector_store_shards=3
+    )
+
+    single = ChromaVectorStore(
+        str(tmp_path / "single"), "docs", _Provider(), collection_metadata={"hnsw:space": "cosine"}
+    )
+    single.add_embeddings(vectors.tolist(), texts, metadatas, ids)
+    sharded = ShardedVectorStore(
+        [build_shard(settings, _Provider(), "docs", d) for d in shard_dirs(str(tmp_path), 3)],
+        embeddings=_Provider(),
+    )
+    sharded.add_embeddings(vectors.tolist(), texts, metadatas, ids)
+
+    unit = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    for k in (1, 5):
+        got = sharded.similarity_search_by_vectors(queries.tolist(), k)
+        want = single.similarity_search_by_vectors(queries.tolist(), k)
+        for query, hits, expected in zip(queries, got, want, strict=True):
+            assert [d.metadata["i"] for d in hits] == [d.metadata["i"] for d in expected]
+            exact = np.argsort(-(unit @ query), kind="stable")[:k].tolist()
+            assert [d.metadata["i"] for d in hits] == exact
+
+
+def test_upsert_and_delete_route_to_the_owning_shard(tmp_path: Path):
+    sharded = _sharded(tmp_path, 3)
+    sharded.add_documents(_docs(), ids=IDS)
+    sharded.add_documents([Document(page_content="peixe", metadata={"n": 99})], ids=["c0"])
+    assert sharded.stats()["total_vectors"] == len(TEXTS)  # upsert no mesmo shard
+
+    sharded.delete(["c5", "c0"])
+    hits = sharded.as_retriever(search_type="similarity", k=len(TEXTS)).invoke("peixe")
+    assert {d.metadata["n"] for d in hits} == {1, 2, 3, 4, 6, 7}
+    assert sharded.stats()["total_vectors"] == len(TEXTS) - 2
+
+
+def test_container_builds_sharded_store(tmp_path: Path):
+    settings = Settings(
+        vector_store_provider="numpy",
+        numpy_store_dir=str(tmp_path / "numpy"),
+        chroma_dir=str(tmp_path / "chroma"),
+        vector_store_shards=2,
+        embeddings_provider="fake",
+        embeddings_cache_enabled=False,
+        llm_provider="fake",
+    )
+    state = build_app_state(settings)
+    try:
+        assert isinstance(state.store, ShardedVectorStore)
+        manifest = tmp_path / "chroma" / "shards_2" / "ingest_manifest.sqlite"
+        assert state.manifest.path == str(manifest)  # outro nº de shards, outro manifesto
+        state.store.add_documents(_docs(), ids=IDS)
+        assert state.query_rag.execute("gato", k=2, search_type="similarity")["hits"]
+        assert len(state.store.stats()["shards"]) == 2
+    finally:
+        state.shutdown()
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from langchain_core.documents import Document
+
+from app.settings import Settings
+from domain.services.vector_store import VectorStore
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.lexical.bm25_index import BM25Index
+from infrastructure.loaders.pdf_loader import PDFLoaderAdapter
+from infrastructure.manifest.ingest_manifest import IngestManifest
+from infrastructure.observability.metrics import observe_stage
+from infrastructure.vectorstores.chroma_store import ChromaVectorStore
+from use_cases.ingest_documents import (
+    ChunkDiff,
+    IngestProgress,
+    build_splitter,
+    manifest_hash,
+    source_key,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _StageSpan:
+    """Janela [primeiro início, último fim] de um estágio concorrente (wall-clock)."""
+
+    first: float | None = None
+    last: float | None = None
+
+    def mark(self, start: float, end: float) -> None:
+        self.first = start if self.first is None else min(self.first, start)
+        self.last = end if self.last is None else max(self.last, end)
+
+    @property
+    def seconds(self) -> float:
+        if self.first is None or self.last is None:
+            return 0.0
+        return self.last - self.first
+
+
+@dataclass
+class BulkIngestReport:
+    files: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    pages: int = 0
+    chunks: int = 0
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    vectors: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+    throughput: dict[str, float] = field(default_factory=dict)
+    # Um item por arquivo que falhou: {"file", "stage" (parse | split | embed), "error"}
+    failures: list[dict[str, str]] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "files": self.files,
+            "files_skipped": self.files_skipped,
+            "files_failed": self.files_failed,
+            "pages": self.pages,
+            "chunks": self.chunks,
+            "chunks_unchanged": self.chunks_unchanged,
+            "chunks_deleted": self.chunks_deleted,
+            "vectors": self.vectors,
+            "batches": self.batches,
+            "seconds": round(self.seconds, 6),
+            "stages": {k: round(v, 6) for k, v in self.stages.items()},
+            "throughput": {k: round(v, 3) for k, v in self.throughput.items()},
+            "failures": list(self.failures),
+        }
+
+
+def _rate(count: int, seconds: float) -> float:
+    return count / seconds if seconds > 0 else 0.0
+
+
+class BulkIngestUseCase:
+    """
+    Ingestão em massa de um diretório de PDFs.
+
+    parse (pool de processos do loader) → split → lotes de `bulk_embed_batch_size`
+    chunks, misturando arquivos → até `bulk_embed_concurrency` lotes em voo no
+    backend de embeddings/Chroma.
+
+    Com manifesto, arquivos inalterados nem são parseados e arquivos alterados
+    aplicam só o diff de chunks (mesma regra de IngestDocumentsUseCase).
+
+    Cada arquivo vai ao manifesto (e tem os chunks removidos apagados) assim que o
+    último lote com chunks dele é gravado: uma execução interrompida retoma de onde
+    parou. Falhas são por arquivo: um PDF corrompido (parse/split) ou um lote que o
+    backend recusa (embed) marca só os arquivos envolvidos, que ficam fora do
+    manifesto e entram no `failures` do relatório; o resto do diretório segue. O epoch do cache
+    de retrieval sobe sempre que algo pode ter sido gravado, inclusive com erro.
+    """
+
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        store: VectorStore | None = None,
+        loader: PDFLoaderAdapter | None = None,
+        retrieval_cache: RetrievalCache | None = None,
+        manifest: IngestManifest | None = None,
+        lexical_index: BM25Index | None = None,
+    ) -> None:
+        self.settings = settings or Settings()
+        self.loader = loader or PDFLoaderAdapter()
+        self.store = store or ChromaVectorStore(
+            persist_dir=self.settings.chroma_dir,
+            collection_name=self.settings.chroma_collection,
+        )
+        self.retrieval_cache = retrieval_cache
+        self.manifest = manifest
+        self.lexical_index = lexical_index
+        self.splitter = build_splitter(self.settings.chunk_size, self.settings.chunk_overlap)
+
+    @staticmethod
+    def scan(directory: str | Path, pattern: str = "*.pdf") -> list[Path]:
+        root = Path(directory)
+        base = root.resolve()
+        # `..` no padrão (ou symlinks) levaria o rglob para fora do diretório
+        return sorted(
+            p for p in root.rglob(pattern) if p.is_file() and p.resolve().is_relative_to(base)
+        )
+
+    def execute(
+        self,
+        directory: str | Path,
+        *,
+        pattern: str = "*.pdf",
+        progress: IngestProgress | None = None,
+    ) -> BulkIngestReport:
+        progress = progress or IngestProgress()
+        report = BulkIngestReport()
+        # parse/split rodam em série na thread principal: soma do tempo ocupado;
+        # embed roda com lotes concorrentes: janela em wall-clock
+        busy = {"parse": 0.0, "split": 0.0}
+        embed_span = _StageSpan()
+        embed_lock = threading.Lock()
+
+        batch_size = max(1, self.settings.bulk_embed_batch_size)
+        concurrency = max(1, self.settings.bulk_embed_concurrency)
+        in_flight = threading.BoundedSemaphore(concurrency)
+        futures: list[Future[int]] = []
+        failed: dict[str, dict[str, str]] = {}  # source -> falha (a primeira de cada arquivo)
+
+        def _fail(path: str, stage: str, exc: Exception) -> None:
+            with embed_lock:
+                if path not in failed:
+                    failed[path] = {"file": path, "stage": stage, "error": f"{exc}"}
+                    progress.files_failed = len(failed)
+
+        # Chunks ainda não gravados por arquivo: em 0, o arquivo vai ao manifesto
+        pending: dict[str, int] = {}
+        diffs: dict[str, tuple[ChunkDiff, str]] = {}
+
+        def _commit(path: str) -> None:
+            """Arquivo gravado por inteiro: apaga os chunks que sumiram e grava o manifesto.
+
+            Por arquivo, como no IngestDocumentsUseCase: uma execução interrompida ou com
+            falhas retoma só do que faltou.
+            """
+            diff, file_hash = diffs[path]
+            try:
+                removed = diff.removed()
+                deleted = self.store.delete(removed)
+                if self.lexical_index is not None:
+                    self.lexical_index.delete(removed)
+                if self.manifest is not None:
+                    self.manifest.replace(diff.source, file_hash, diff.current)
+            except Exception as exc:
+                logger.warning("Bulk ingest: commit de %s falhou", path, exc_info=True)
+                _fail(path, "commit", exc)
+                return
+            with embed_lock:
+                report.chunks_deleted += deleted
+                progress.chunks_deleted = report.chunks_deleted
+
+        def _embed(batch: list[Document], ids: list[str], counts: Counter[str]) -> int:
+            try:
+                t0 = time.perf_counter()
+                n = self.store.add_documents(batch, ids=ids)
+                if self.lexical_index is not None:
+                    self.lexical_index.upsert(batch, ids)
+                t1 = time.perf_counter()
+                observe_stage("ingest_embed", t1 - t0)
+                with embed_lock:
+                    embed_span.mark(t0, t1)
+                    progress.chunks_embedded += n
+                    done = []
+                    for path, count in counts.items():
+                        pending[path] -= count
+                        if pending[path] == 0 and path not in failed:
+                            done.append(path)
+            except Exception as exc:
+                logger.warning("Bulk ingest: lote de %d chunks falhou", len(batch), exc_info=True)
+                # O lote é de vários arquivos: nenhum deles vai ao manifesto (refeitos no retry)
+                for path in counts:
+                    _fail(path, "embed", exc)
+                return 0
+            finally:
+                in_flight.release()
+            for path in done:
+                _commit(path)
+            return n
+
+        started = time.perf_counter()
+        hashes: dict[str, str] = {}
+        for p in self.scan(directory, pattern):
+            file_hash = manifest_hash(p, self.settings)
+            if self.manifest is not None and self.manifest.file_hash(source_key(p)) == file_hash:
+                report.files_skipped += 1
+                continue
+            hashes[str(p)] = file_hash
+        progress.files_skipped = report.files_skipped
+
+        batch: list[Document] = []
+        batch_ids: list[str] = []
+        batch_paths: list[str] = []
+        progress.stage = "ingest"
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="embed") as pool:
+
+                def _submit(size: int) -> None:
+                    nonlocal batch, batch_ids, batch_paths
+                    in_flight.acquire()  # backpressure: parse espera se o backend está cheio
+                    counts = Counter(batch_paths[:size])
+                    futures.append(pool.submit(_embed, batch[:size], batch_ids[:size], counts))
+                    batch, batch_ids = batch[size:], batch_ids[size:]
+                    batch_paths = batch_paths[size:]
+                    report.batches += 1
+
+                t_parse = time.perf_counter()
+                for path, pages in self.loader.iter_files(list(hashes), return_exceptions=True):
+                    t_parsed = time.perf_counter()
+                    busy["parse"] += t_parsed - t_parse
+                    observe_stage("ingest_load", t_parsed - t_parse)
+                    if isinstance(pages, Exception):
+                        logger.warning("Bulk ingest: parse de %s falhou", path, exc_info=pages)
+                        _fail(path, "parse", pages)
+                        t_parse = time.perf_counter()
+                        continue
+                    report.files += 1
+                    report.pages += len(pages)
+                    progress.files_parsed = report.files
+                    progress.pages_parsed = report.pages
+
+                    try:
+                        chunks = self.splitter.split_documents(pages)
+                        source = source_key(path)
+                        previous = self.manifest.chunks(source) if self.manifest else None
+                        diff = ChunkDiff(source, previous)
+                        docs, ids = diff.changed(chunks)
+                    except Exception as exc:
+                        logger.warning("Bulk ingest: split de %s falhou", path, exc_info=True)
+                        _fail(path, "split", exc)
+                        t_parse = time.perf_counter()
+                        continue
+                    t_split = time.perf_counter()
+                    busy["split"] += t_split - t_parsed
+                    observe_stage("ingest_split", t_split - t_parsed)
+                    report.chunks += len(chunks)
+                    progress.chunks_split = report.chunks
+                    diffs[path] = (diff, hashes[path])
+                    report.chunks_unchanged += diff.unchanged
+                    progress.chunks_unchanged = report.chunks_unchanged
+                    if not docs:  # nada a embedar (só remoções): já pode ir ao manifesto
+                        _commit(path)
+                    else:
+                        with embed_lock:
+                            pending[path] = len(docs)
+
+                    batch.extend(docs)
+                    batch_ids.extend(ids)
+                    batch_paths.extend([path] * len(docs))
+                    while len(batch) >= batch_size:
+                        _submit(batch_size)
+                    t_parse = time.perf_counter()
+
+                if batch:
+                    _submit(len(batch))
+
+            report.vectors = sum(f.result() for f in futures)
+        finally:
+            report.seconds = time.perf_counter() - started
+            report.failures = list(failed.values())
+            report.files_failed = len(report.failures)
+            # Lote que falhou no meio pode ter gravado parte dos vetores: conta como escrita
+            wrote = report.batches or report.chunks_deleted
+            if wrote and self.retrieval_cache is not None:
+                self.retrieval_cache.bump_epoch()
+
+        report.stages = {**busy, "embed": embed_span.seconds}
+        report.throughput = {
+            "files_per_s": _rate(report.files, report.stages["parse"]),
+            "chunks_per_s": _rate(report.chunks, report.stages["split"]),
+            "vectors_per_s": _rate(report.vectors, report.stages["embed"]),
+        }
+        progress.timings.update(report.stages)
+        progress.stage = "done"
+        return report
@@ -1,33 +1,210 @@
 from __future__ import annotations
 
+import hashlib
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 from app.settings import Settings
+from domain.services.vector_store import VectorStore
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.lexical.bm25_index import BM25Index
 from infrastructure.loaders.pdf_loader import PDFLoaderAdapter
+from infrastructure.manifest.ingest_manifest import IngestManifest
+from infrastructure.observability.metrics import observe_stage
 from infrastructure.vectorstores.chroma_store import ChromaVectorStore
 
 
+def build_splitter(
+    chunk_size: int = 1000, chunk_overlap: int = 150
+) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+    )
+
+
+def file_sha256(filepath: str | Path, block_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(filepath, "rb") as f:
+        while block := f.read(block_size):
+            h.update(block)
+    return h.hexdigest()
+
+
+def manifest_hash(filepath: str | Path, settings: Settings) -> str:
+    """Hash do arquivo + parâmetros de chunking: mudar o chunking reprocessa o arquivo."""
+    return f"{file_sha256(filepath)}:{settings.chunk_size}:{settings.chunk_overlap}"
+
+
+def source_key(filepath: str | Path) -> str:
+    """Identidade estável do arquivo no manifesto (caminho absoluto)."""
+    return str(Path(filepath).resolve())
+
+
+class ChunkDiff:
+    """
+    Ids determinísticos por (source, page, start_index) e diff contra o manifesto.
+
+    O id não depende do conteúdo: quando o arquivo muda, chunks na mesma posição
+    mantêm o id e só são reescritos se o hash do texto mudou.
+    """
+
+    def __init__(self, source: str, previous: dict[str, str] | None = None) -> None:
+        self.source = source
+        self.previous = previous or {}
+        self.current: dict[str, str] = {}
+        self.unchanged = 0
+
+    def _chunk_id(self, chunk: Document) -> str:
+        page = chunk.metadata.get("page", 0)
+        start = chunk.metadata.get("start_index", -1)
+        base = hashlib.sha256(f"{self.source}\x00{page}\x00{start}".encode()).hexdigest()[:32]
+        cid, n = base, 1
+        while cid in self.current:  # start_index=-1 (trecho não localizado) pode repetir
+            cid, n = f"{base}-{n}", n + 1
+        return cid
+
+    def changed(self, chunks: list[Document]) -> tuple[list[Document], list[str]]:
+        """Atribui ids e devolve só os chunks novos ou alterados (docs, ids)."""
+        docs: list[Document] = []
+        ids: list[str] = []
+        for chunk in chunks:
+            cid = self._chunk_id(chunk)
+            content_hash = hashlib.sha256(chunk.page_content.encode()).hexdigest()
+            self.current[cid] = content_hash
+            chunk.metadata["chunk_id"] = cid
+            if self.previous.get(cid) == content_hash:
+                self.unchanged += 1
+                continue
+            docs.append(chunk)
+            ids.append(cid)
+        return docs, ids
+
+    def removed(self) -> list[str]:
+        return [cid for cid in self.previous if cid not in self.current]
+
+
+@dataclass
+class IngestProgress:
+    """Progresso por estágio (load → split → embed), lido pelo endpoint de jobs."""
+
+    stage: str = "pending"
+    files_parsed: int = 0
+    pages_parsed: int = 0
+    chunks_split: int = 0
+    chunks_embedded: int = 0
+    chunks_unchanged: int = 0
+    chunks_deleted: int = 0
+    files_skipped: int = 0
+    files_failed: int = 0
+    timings: dict[str, float] = field(default_factory=dict)
+    _stage_started: float = field(default=0.0, repr=False)
+
+    def start(self, stage: str) -> None:
+        self.stage = stage
+        self._stage_started = time.perf_counter()
+
+    def finish(self, stage: str) -> None:
+        elapsed = time.perf_counter() - self._stage_started
+        self.timings[stage] = round(self.timings.get(stage, 0.0) + elapsed, 6)
+        observe_stage(f"ingest_{stage}", elapsed)
+
+
 class IngestDocumentsUseCase:
     """Carrega PDF, fatiando em chunks e persistindo no Chroma."""
 
-    def __init__(self, settings: Settings | None = None) -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        store: VectorStore | None = None,
+        loader: PDFLoaderAdapter | None = None,
+        retrieval_cache: RetrievalCache | None = None,
+        manifest: IngestManifest | None = None,
+        lexical_index: BM25Index | None = None,
+    ) -> None:
         self.settings = settings or Settings()
-        self.loader = PDFLoaderAdapter()
-        self.store = ChromaVectorStore(
+        self.loader = loader or PDFLoaderAdapter()
+        self.store = store or ChromaVectorStore(
             persist_dir=self.settings.chroma_dir,
             collection_name=self.settings.chroma_collection,
         )
-        self.splitter = RecursiveCharacterTextSplitter(
-            chunk_size=1000,
-            chunk_overlap=150,
-            add_start_index=True,
-        )
+        self.retrieval_cache = retrieval_cache
+        self.manifest = manifest
+        self.lexical_index = lexical_index
+        self.splitter = build_splitter(self.settings.chunk_size, self.settings.chunk_overlap)
+
+    def _flush(self, batch: list[Document], ids: list[str], progress: IngestProgress) -> int:
+        progress.start("embed")
+        added = self.store.add_documents(batch, ids=ids)
+        if self.lexical_index is not None:
+            self.lexical_index.upsert(batch, ids)
+        progress.chunks_embedded += added
+        progress.finish("embed")
+        return added
+
+    def execute(self, filepath: str, progress: IngestProgress | None = None) -> tuple[int, int]:
+        """
+        Pipeline em streaming: página → split → lote de chunks → embed/escrita.
+        O pico de memória depende de `ingest_batch_size`, não do tamanho do PDF.
 
-    def execute(self, filepath: str) -> tuple[int, int]:
-        docs = self.loader.load(filepath)  # list[Document]
-        if not docs:
+        Idempotente: arquivo com o mesmo hash no manifesto é pulado; se mudou,
+        só os chunks novos/alterados são gravados e os que sumiram são removidos.
+        """
+        progress = progress or IngestProgress()
+        source = source_key(filepath)
+        file_hash = manifest_hash(filepath, self.settings)
+        if self.manifest is not None and self.manifest.file_hash(source) == file_hash:
+            progress.files_skipped = 1
+            progress.stage = "skipped"
             return 0, 0
-        chunks: list[Document] = self.splitter.split_documents(docs)
-        added = self.store.add_documents(chunks)
-        return len(docs), added
+
+        diff = ChunkDiff(source, self.manifest.chunks(source) if self.manifest else None)
+        batch_size = max(1, self.settings.ingest_batch_size)
+        pages = self.loader.lazy_load(filepath)
+        batch: list[Document] = []
+        batch_ids: list[str] = []
+        num_docs = added = 0
+
+        while True:
+            progress.start("load")
+            page = next(pages, None)
+            progress.finish("load")
+            if page is None:
+                break
+            num_docs += 1
+            progress.pages_parsed = num_docs
+
+            progress.start("split")
+            chunks = self.splitter.split_documents([page])
+            progress.chunks_split += len(chunks)
+            progress.finish("split")
+
+            docs, ids = diff.changed(chunks)
+            progress.chunks_unchanged = diff.unchanged
+            batch.extend(docs)
+            batch_ids.extend(ids)
+            while len(batch) >= batch_size:
+                added += self._flush(batch[:batch_size], batch_ids[:batch_size], progress)
+                batch, batch_ids = batch[batch_size:], batch_ids[batch_size:]
+
+        if batch:
+            added += self._flush(batch, batch_ids, progress)
+        progress.files_parsed = 1
+
+        removed = diff.removed()
+        deleted = self.store.delete(removed)
+        if self.lexical_index is not None:
+            self.lexical_index.delete(removed)
+        progress.chunks_deleted = deleted
+        if self.manifest is not None:
+            self.manifest.replace(source, file_hash, diff.current)
+
+        if (added or deleted) and self.retrieval_cache is not None:
+            self.retrieval_cache.bump_epoch()
+        progress.stage = "done"
+        return num_docs, added
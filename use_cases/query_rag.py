@@ -1,39 +1,266 @@
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import time
+from collections.abc import AsyncIterator, Iterator
+from concurrent.futures import Executor, Future
 from typing import Any, TypedDict
 
+from langchain_core.documents import Document
+
 from app.settings import Settings
+from domain.services.llm_provider import LLMProvider
+from domain.services.rank_fusion import reciprocal_rank_fusion
+from domain.services.reranker import Reranker
+from domain.services.vector_store import VectorStore
+from infrastructure.cache.retrieval_cache import RetrievalCache
+from infrastructure.lexical.bm25_index import BM25Index
 from infrastructure.llm.langchain_llm_provider import LangChainLLMProvider
+from infrastructure.observability.metrics import observe_stage, stage_timer
 from infrastructure.vectorstores.chroma_store import ChromaVectorStore
 
+# MMR sob rerank: candidatos avaliados por item entregue ao 2º estágio
+_MMR_POOL_FACTOR = 2
+
 
 class RAGHit(TypedDict):
     content: str
     metadata: dict[str, Any]
 
 
+class RerankInfo(TypedDict):
+    reranker: str
+    candidates: int
+    ms: float
+    timed_out: bool  # True = budget estourado, ordem do primeiro estágio mantida
+
+
 class RAGResult(TypedDict):
     answer: str | None
     hits: list[RAGHit]
+    rerank: RerankInfo | None
+
+
+class RAGBatchItem(TypedDict, total=False):
+    question: str
+    generate: bool
+    k: int | None
+    search_type: str | None
+    fetch_k: int | None
+    lambda_mult: float | None
+    rerank: bool | None
+    rerank_budget_ms: float | None
+
+
+class RAGStreamEvent(TypedDict):
+    event: str  # "hits" | "token" | "done" ({"answer", "rerank"})
+    data: Any
 
 
 class QueryRAGUseCase:
-    def __init__(self, settings: Settings | None = None) -> None:
+    def __init__(
+        self,
+        settings: Settings | None = None,
+        store: VectorStore | None = None,
+        llm: LLMProvider | None = None,
+        retrieval_cache: RetrievalCache | None = None,
+        executor: Executor | None = None,
+        lexical_index: BM25Index | None = None,
+        reranker: Reranker | None = None,
+        rerank_executor: Executor | None = None,
+    ) -> None:
         self.settings = settings or Settings()
-        self.store = ChromaVectorStore(
+        self.store = store or ChromaVectorStore(
             persist_dir=self.settings.chroma_dir,
             collection_name=self.settings.chroma_collection,
         )
-        self.llm = LangChainLLMProvider(self.settings)
+        self.llm = llm or LangChainLLMProvider(self.settings)
+        self.retrieval_cache = retrieval_cache
+        # Executor dedicado ao trabalho bloqueante do caminho async (Chroma é sync);
+        # None = executor padrão do event loop
+        self.executor = executor
+        self.lexical_index = lexical_index
+        # Rerank opcional: pool próprio para o scorer não competir com as buscas
+        self.reranker = reranker
+        self.rerank_executor = rerank_executor
+
+    @staticmethod
+    def _in_executor(executor: Executor | None, fn: Any, *args: Any) -> asyncio.Future[Any]:
+        """`run_in_executor` levando os contextvars (ex.: tempos do Server-Timing)."""
+        ctx = contextvars.copy_context()
+        return asyncio.get_running_loop().run_in_executor(executor, ctx.run, fn, *args)
 
-    def _retrieve(self, question: str) -> list[Any]:
-        retriever = self.store.as_retriever(
-            search_type=self.settings.retriever_search_type,
-            k=self.settings.retriever_k,
+    def _retriever(self, *, k: int, search_type: str, fetch_k: int, lambda_mult: float) -> Any:
+        if search_type == "mmr":
+            return self.store.as_retriever(
+                search_type="mmr", k=k, fetch_k=fetch_k, lambda_mult=lambda_mult
+            )
+        return self.store.as_retriever(search_type=search_type, k=k)
+
+    def _cache_key(self, question: str, p: dict[str, Any]) -> Any:
+        assert self.retrieval_cache is not None
+        options = (p["fetch_k"], p["lambda_mult"]) if p["search_type"] == "mmr" else ()
+        return self.retrieval_cache.key(question, p["k"], p["search_type"], options)
+
+    def _retrieve(self, question: str, **params: Any) -> list[Any]:
+        cache = self.retrieval_cache
+        if cache is not None:
+            key = self._cache_key(question, params)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        docs = self._search(question, **params)
+
+        if cache is not None:
+            cache.put(key, docs)
+        return docs
+
+    def _search(self, question: str, **params: Any) -> list[Any]:
+        k = params["k"]
+        if params["search_type"] != "hybrid":
+            return self._retriever(**params).invoke(question)
+        fetch_k = max(k, self.settings.hybrid_fetch_k)
+        vector = self.store.as_retriever(search_type="similarity", k=fetch_k)
+        if self.executor is None:
+            return self._fuse(vector.invoke(question), self._lexical(question, fetch_k), k)
+        ctx = contextvars.copy_context()  # tempos do BM25 contam no Server-Timing da requisição
+        lexical = self.executor.submit(ctx.run, self._lexical, question, fetch_k)
+        return self._fuse(vector.invoke(question), lexical.result(), k)
+
+    def _lexical(self, question: str, k: int) -> list[Document]:
+        if self.lexical_index is None:
+            return []
+        with stage_timer("lexical_search"):
+            return self.lexical_index.search(question, k)
+
+    def _fuse(self, vector_docs: list[Any], lexical_docs: list[Any], k: int) -> list[Any]:
+        """RRF entre as listas densa e lexical; dedup por chunk_id (ou conteúdo)."""
+        fused = reciprocal_rank_fusion(
+            [vector_docs, lexical_docs],
+            key=lambda d: d.metadata.get("chunk_id") or d.page_content,
+            k=self.settings.hybrid_rrf_k,
         )
-        docs = retriever.invoke(question)
+        return [
+            Document(page_content=d.page_content, metadata={**d.metadata, "rrf_score": score})
+            for d, score in fused[:k]
+        ]
+
+    async def _aretrieve(self, question: str, **params: Any) -> list[Any]:
+        cache = self.retrieval_cache
+        if cache is not None:
+            key = self._cache_key(question, params)
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+        # langchain_chroma não tem I/O async nativo: o `ainvoke` dele cairia no executor
+        # padrão do loop; aqui a busca (embedding da pergunta + query) vai para o dedicado
+        k = params["k"]
+        if params["search_type"] == "hybrid":
+            fetch_k = max(k, self.settings.hybrid_fetch_k)
+            retriever = self.store.as_retriever(search_type="similarity", k=fetch_k)
+            vector_docs, lexical_docs = await asyncio.gather(
+                self._in_executor(self.executor, retriever.invoke, question),
+                self._in_executor(self.executor, self._lexical, question, fetch_k),
+            )
+            docs = self._fuse(vector_docs, lexical_docs, k)
+        else:
+            retriever = self._retriever(**params)
+            docs = await self._in_executor(self.executor, retriever.invoke, question)
+
+        if cache is not None:
+            cache.put(key, docs)
         return docs
 
+    # ---------------------------------------------------------------- rerank
+    def _rerank_timeout(self, rerank: bool | None, budget_ms: float | None) -> float | None:
+        """Budget do rerank em segundos (0 = sem limite); None = estágio desligado."""
+        if self.reranker is None or rerank is False:
+            return None
+        budget = budget_ms if budget_ms is not None else self.settings.rerank_budget_ms
+        return max(0.0, budget) / 1000
+
+    def _first_stage(self, params: dict[str, Any], timeout: float | None) -> dict[str, Any]:
+        # Com rerank, o primeiro estágio traz top-N candidatos; o corte em k vem depois.
+        # O MMR escolhe os N dentre fetch_k: o pool acompanha o N, com folga para diversidade
+        if timeout is None:
+            return params
+        k = max(params["k"], self.settings.rerank_top_n)
+        return {**params, "k": k, "fetch_k": max(params["fetch_k"], _MMR_POOL_FACTOR * k)}
+
+    def _apply_rerank(
+        self, docs: list[Any], scores: list[float] | None, k: int, started: float
+    ) -> tuple[list[Any], RerankInfo]:
+        assert self.reranker is not None
+        info: RerankInfo = {
+            "reranker": self.reranker.name,
+            "candidates": len(docs),
+            "ms": round((time.perf_counter() - started) * 1000, 3),
+            "timed_out": scores is None,
+        }
+        observe_stage("rerank", info["ms"] / 1000)
+        if scores is None:
+            return docs[:k], info
+        order = sorted(range(len(docs)), key=lambda i: scores[i], reverse=True)[:k]
+        ranked = [
+            Document(
+                page_content=docs[i].page_content,
+                metadata={**docs[i].metadata, "rerank_score": float(scores[i])},
+            )
+            for i in order
+        ]
+        return ranked, info
+
+    def _rerank(
+        self, question: str, docs: list[Any], k: int, timeout: float
+    ) -> tuple[list[Any], RerankInfo]:
+        assert self.reranker is not None
+        started = time.perf_counter()
+        texts = [d.page_content for d in docs]
+        if not texts or self.rerank_executor is None:
+            return self._apply_rerank(docs, self.reranker.score(question, texts), k, started)
+        fut: Future[list[float]] = self.rerank_executor.submit(self.reranker.score, question, texts)
+        try:
+            scores: list[float] | None = fut.result(timeout=timeout or None)
+        except TimeoutError:
+            # Não dá para interromper o scorer já em execução; só descarta o resultado
+            fut.cancel()
+            scores = None
+        return self._apply_rerank(docs, scores, k, started)
+
+    async def _arerank(
+        self, question: str, docs: list[Any], k: int, timeout: float
+    ) -> tuple[list[Any], RerankInfo]:
+        assert self.reranker is not None
+        started = time.perf_counter()
+        texts = [d.page_content for d in docs]
+        if not texts:
+            return self._apply_rerank(docs, [], k, started)
+        scoring = self._in_executor(self.rerank_executor, self.reranker.score, question, texts)
+        try:
+            scores: list[float] | None = await asyncio.wait_for(scoring, timeout or None)
+        except TimeoutError:
+            scores = None
+        return self._apply_rerank(docs, scores, k, started)
+
+    def _retrieve_ranked(
+        self, question: str, params: dict[str, Any], timeout: float | None
+    ) -> tuple[list[Any], RerankInfo | None]:
+        docs = self._retrieve(question, **self._first_stage(params, timeout))
+        if timeout is None:
+            return docs, None
+        return self._rerank(question, docs, params["k"], timeout)
+
+    async def _aretrieve_ranked(
+        self, question: str, params: dict[str, Any], timeout: float | None
+    ) -> tuple[list[Any], RerankInfo | None]:
+        docs = await self._aretrieve(question, **self._first_stage(params, timeout))
+        if timeout is None:
+            return docs, None
+        return await self._arerank(question, docs, params["k"], timeout)
+
     def _to_hits(self, docs: list[Any]) -> list[RAGHit]:
         return [{"content": d.page_content, "metadata": d.metadata} for d in docs]
 
@@ -47,18 +274,217 @@ class QueryRAGUseCase:
         generate: bool = False,
         k: int | None = None,
         search_type: str | None = None,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: float | None = None,
     ) -> RAGResult:
-        # Permite overrides por requisição
-        if k is not None:
-            self.settings.retriever_k = k
-        if search_type:
-            self.settings.retriever_search_type = search_type
-
-        docs = self._retrieve(question)
+        docs, rerank_info = self._retrieve_ranked(
+            question,
+            self._params(k, search_type, fetch_k, lambda_mult),
+            self._rerank_timeout(rerank, rerank_budget_ms),
+        )
         hits = self._to_hits(docs)
 
         answer: str | None = None
         if generate:
             answer = self.llm.generate(question, context_snippets=self._to_context(docs))
 
-        return {"answer": answer, "hits": hits}
+        return {"answer": answer, "hits": hits, "rerank": rerank_info}
+
+    def stream(
+        self,
+        question: str,
+        *,
+        k: int | None = None,
+        search_type: str | None = None,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: float | None = None,
+    ) -> Iterator[RAGStreamEvent]:
+        """Hits primeiro; depois os tokens do LLM à medida que chegam; por fim a resposta.
+
+        O `done` leva a resposta completa e o tempo do rerank (None sem o 2º estágio):
+        o primeiro evento é sempre `hits`.
+        """
+        docs, rerank_info = self._retrieve_ranked(
+            question,
+            self._params(k, search_type, fetch_k, lambda_mult),
+            self._rerank_timeout(rerank, rerank_budget_ms),
+        )
+        yield {"event": "hits", "data": self._to_hits(docs)}
+
+        parts: list[str] = []
+        for token in self.llm.stream(question, context_snippets=self._to_context(docs)):
+            parts.append(token)
+            yield {"event": "token", "data": token}
+        yield {"event": "done", "data": {"answer": "".join(parts), "rerank": rerank_info}}
+
+    async def aexecute(
+        self,
+        question: str,
+        *,
+        generate: bool = False,
+        k: int | None = None,
+        search_type: str | None = None,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: float | None = None,
+    ) -> RAGResult:
+        """Variante async de `execute`: não ocupa o threadpool do servidor."""
+        docs, rerank_info = await self._aretrieve_ranked(
+            question,
+            self._params(k, search_type, fetch_k, lambda_mult),
+            self._rerank_timeout(rerank, rerank_budget_ms),
+        )
+        hits = self._to_hits(docs)
+
+        answer: str | None = None
+        if generate:
+            answer = await self.llm.agenerate(question, context_snippets=self._to_context(docs))
+
+        return {"answer": answer, "hits": hits, "rerank": rerank_info}
+
+    async def astream(
+        self,
+        question: str,
+        *,
+        k: int | None = None,
+        search_type: str | None = None,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+        rerank: bool | None = None,
+        rerank_budget_ms: float | None = None,
+    ) -> AsyncIterator[RAGStreamEvent]:
+        docs, rerank_info = await self._aretrieve_ranked(
+            question,
+            self._params(k, search_type, fetch_k, lambda_mult),
+            self._rerank_timeout(rerank, rerank_budget_ms),
+        )
+        yield {"event": "hits", "data": self._to_hits(docs)}
+
+        parts: list[str] = []
+        async for token in self.llm.astream(question, context_snippets=self._to_context(docs)):
+            parts.append(token)
+            yield {"event": "token", "data": token}
+        yield {"event": "done", "data": {"answer": "".join(parts), "rerank": rerank_info}}
+
+    def _retrieve_many(self, questions: list[str], params: list[dict[str, Any]]) -> list[Any]:
+        """
+        Retrieval em lote (bloqueante): um único embedding para todas as perguntas e
+        uma única query do Chroma para as de similaridade; MMR reaproveita o vetor.
+        """
+        vectors = self.store.embed_queries(questions)
+        out: list[Any] = [None] * len(questions)
+
+        # Híbrido usa a mesma busca densa em lote (com fetch_k) + BM25 por item
+        fetch_k = self.settings.hybrid_fetch_k
+        dense_k = {
+            i: p["k"] if p["search_type"] == "similarity" else max(p["k"], fetch_k)
+            for i, p in enumerate(params)
+            if p["search_type"] in {"similarity", "hybrid"}
+        }
+        if dense_k:
+            idx = list(dense_k)
+            found = self.store.similarity_search_by_vectors(
+                [vectors[i] for i in idx], max(dense_k.values())
+            )
+            for i, docs in zip(idx, found, strict=True):
+                docs = docs[: dense_k[i]]
+                if params[i]["search_type"] == "hybrid":
+                    docs = self._fuse(docs, self._lexical(questions[i], dense_k[i]), params[i]["k"])
+                out[i] = docs
+
+        for i, p in enumerate(params):
+            if p["search_type"] == "mmr":
+                out[i] = self.store.mmr_search_by_vector(
+                    vectors[i], k=p["k"], fetch_k=p["fetch_k"], lambda_mult=p["lambda_mult"]
+                )
+            elif out[i] is None:  # outros tipos (ex.: score threshold): caminho normal
+                out[i] = self._retriever(**p).invoke(questions[i])
+        return out
+
+    async def aexecute_batch(self, items: list[RAGBatchItem]) -> list[RAGResult]:
+        """
+        Várias perguntas de uma vez: cache por item, embedding e busca em lote para
+        as que faltam e geração com no máximo `batch_generate_concurrency` em paralelo.
+        """
+        requested = [
+            self._params(
+                it.get("k"), it.get("search_type"), it.get("fetch_k"), it.get("lambda_mult")
+            )
+            for it in items
+        ]
+        timeouts = [
+            self._rerank_timeout(it.get("rerank"), it.get("rerank_budget_ms")) for it in items
+        ]
+        params = [self._first_stage(p, t) for p, t in zip(requested, timeouts, strict=True)]
+        docs_per_item: list[Any] = [None] * len(items)
+        keys: list[Any] = [None] * len(items)
+
+        cache = self.retrieval_cache
+        if cache is not None:
+            for i, (it, p) in enumerate(zip(items, params, strict=True)):
+                keys[i] = self._cache_key(it["question"], p)
+                docs_per_item[i] = cache.get(keys[i])
+
+        pending = [i for i, d in enumerate(docs_per_item) if d is None]
+        if pending:
+            found = await self._in_executor(
+                self.executor,
+                self._retrieve_many,
+                [items[i]["question"] for i in pending],
+                [params[i] for i in pending],
+            )
+            for i, docs in zip(pending, found, strict=True):
+                docs_per_item[i] = docs
+                if cache is not None:
+                    cache.put(keys[i], docs)
+
+        async def _ranked(i: int) -> tuple[list[Any], RerankInfo | None]:
+            timeout = timeouts[i]
+            if timeout is None:
+                return docs_per_item[i], None
+            return await self._arerank(
+                items[i]["question"], docs_per_item[i], requested[i]["k"], timeout
+            )
+
+        ranked = await asyncio.gather(*(_ranked(i) for i in range(len(items))))
+        docs_per_item = [docs for docs, _ in ranked]
+
+        sem = asyncio.Semaphore(max(1, self.settings.batch_generate_concurrency))
+
+        async def _answer(it: RAGBatchItem, docs: list[Any]) -> str | None:
+            if not it.get("generate"):
+                return None
+            async with sem:
+                return await self.llm.agenerate(
+                    it["question"], context_snippets=self._to_context(docs)
+                )
+
+        answers = await asyncio.gather(
+            *(_answer(it, docs) for it, docs in zip(items, docs_per_item, strict=True))
+        )
+        return [
+            {"answer": answer, "hits": self._to_hits(docs), "rerank": info}
+            for answer, (docs, info) in zip(answers, ranked, strict=True)
+        ]
+
+    def _params(
+        self,
+        k: int | None,
+        search_type: str | None,
+        fetch_k: int | None = None,
+        lambda_mult: float | None = None,
+    ) -> dict[str, Any]:
+        # Overrides por requisição: locais, sem mutar o Settings compartilhado
+        return {
+            "k": k if k is not None else self.settings.retriever_k,
+            "search_type": search_type or self.settings.retriever_search_type,
+            "fetch_k": fetch_k if fetch_k is not None else self.settings.retriever_fetch_k,
+            "lambda_mult": (
+                lambda_mult if lambda_mult is not None else self.settings.retriever_lambda_mult
+            ),
+        }